@@ -0,0 +1,27 @@
+"""Per-user cache directory and private files shared by the on-disk caches."""
+
+import os
+from pathlib import Path
+from typing import TextIO
+
+
+def cache_dir(name: str) -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "catalyst-sdwan-lab" / name
+
+
+def open_private(path: Path) -> TextIO:
+    """Open path for writing, readable by the current user only (a new parent too)."""
+    path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    # O_CREAT's mode only applies to a new file
+    os.fchmod(fd, 0o600)
+    return os.fdopen(fd, "w", encoding="utf-8")
+
+
+def write_private(path: Path, text: str) -> None:
+    """Atomically write text readable by the current user only (entries hold credentials)."""
+    tmp = path.with_suffix(".tmp")
+    with open_private(tmp) as f:
+        f.write(text)
+    tmp.replace(path)
@@ -0,0 +1,175 @@
+import json
+import re
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+from requests import Response
+from rich.console import Console
+from rich.table import Table
+
+_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I)
+_IP_RE = re.compile(r"^(\d{1,3}(\.\d{1,3}){3}|[0-9a-f:]*:[0-9a-f:]+)$", re.I)
+_ID_RE = re.compile(r"^(\d+|[0-9a-f]{16,})$", re.I)
+_NUMERIC_COLUMNS = (
+    "Calls", "Errors", "Retries", "Total s", "Mean s", "Max s", "Sent", "Received"
+)
+
+
+def normalize_path(url: str) -> str:
+    """Reduce a request URL to its endpoint template: host dropped, IDs and query values stripped.
+
+    ``https://m:443/dataservice/system/device/bootstrap/device/<uuid>?wanif=ge1``
+    becomes ``/dataservice/system/device/bootstrap/device/{id}?wanif``.
+    """
+    parts = urlsplit(url)
+    segments = [
+        "{id}" if _UUID_RE.search(s) or _IP_RE.match(s) or _ID_RE.match(s) else s
+        for s in parts.path.split("/")
+    ]
+    path = "/".join(segments)
+    keys = sorted({k for k, _ in parse_qsl(parts.query, keep_blank_values=True)})
+    return f"{path}?{'&'.join(keys)}" if keys else path
+
+
+@dataclass
+class EndpointStats:
+    method: str
+    path: str
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    sent_bytes: int = 0
+    received_bytes: int = 0
+    last_status: int = 0
+
+    @property
+    def mean_s(self) -> float:
+        return self.total_s / self.calls if self.calls else 0.0
+
+
+class ApiStats:
+    """Thread-safe per-endpoint request metrics. Recording is a no-op until enabled."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._endpoints: dict[tuple[str, str], EndpointStats] = {}
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        status: int,
+        elapsed_s: float,
+        sent_bytes: int = 0,
+        received_bytes: int = 0,
+    ) -> None:
+        """Record one HTTP exchange; status 0 means no response (connection error/timeout)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._entry(method, url)
+            entry.calls += 1
+            entry.errors += int(status == 0 or status >= 400)
+            entry.total_s += elapsed_s
+            entry.max_s = max(entry.max_s, elapsed_s)
+            entry.sent_bytes += sent_bytes
+            entry.received_bytes += received_bytes
+            entry.last_status = status
+
+    def record_retry(self, method: str, url: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entry(method, url).retries += 1
+
+    def record_response(
+        self, response: Response, *_: Any, stream: bool = False, **__: Any
+    ) -> None:
+        """requests ``response`` hook; latency is ``response.elapsed`` (time to headers).
+
+        Streamed bodies are not read here; their size is taken from Content-Length.
+        """
+        if not self.enabled:
+            return
+        request = response.request
+        self.record(
+            request.method or "GET",
+            request.url or response.url,
+            response.status_code,
+            response.elapsed.total_seconds(),
+            _body_size(request.body, request.headers.get("Content-Length")),
+            _body_size(
+                None if stream else response.content, response.headers.get("Content-Length")
+            ),
+        )
+
+    def snapshot(self) -> list[EndpointStats]:
+        """Endpoints sorted by total time spent, slowest first."""
+        with self._lock:
+            return sorted(
+                (EndpointStats(**asdict(e)) for e in self._endpoints.values()),
+                key=lambda e: e.total_s,
+                reverse=True,
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+    def render(self, console: Console) -> None:
+        rows = self.snapshot()
+        if not rows:
+            return
+        table = Table(title="SD-WAN Manager API calls")
+        table.add_column("Method", style="cyan")
+        table.add_column("Endpoint")
+        for column in _NUMERIC_COLUMNS:
+            table.add_column(column, justify="right")
+        for e in rows:
+            table.add_row(
+                e.method, e.path, str(e.calls), str(e.errors), str(e.retries),
+                f"{e.total_s:.2f}", f"{e.mean_s:.3f}", f"{e.max_s:.3f}",
+                _human_bytes(e.sent_bytes), _human_bytes(e.received_bytes),
+            )
+        console.print(table)
+
+    def write_json(self, path: Path) -> None:
+        path.write_text(json.dumps(
+            [{**asdict(e), "mean_s": e.mean_s} for e in self.snapshot()], indent=2
+        ))
+
+    def _entry(self, method: str, url: str) -> EndpointStats:
+        key = (method.upper(), normalize_path(url))
+        entry = self._endpoints.get(key)
+        if entry is None:
+            entry = self._endpoints[key] = EndpointStats(*key)
+        return entry
+
+
+def _body_size(body: Any, content_length: str | None) -> int:
+    if isinstance(body, (bytes, str)):
+        return len(body)
+    return int(content_length) if content_length and content_length.isdigit() else 0
+
+
+def _human_bytes(n: int) -> str:
+    if n < 1024:
+        return f"{n} B"
+    size = n / 1024
+    for unit in ("KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+recorder = ApiStats()
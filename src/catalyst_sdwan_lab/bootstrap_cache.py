@@ -0,0 +1,53 @@
+"""On-disk cache of generated edge bootstrap configs.
+
+Generating a cloud-init bootstrap takes the Manager seconds per device, so a retried
+``add edges`` reuses what the failed attempt already fetched. Entries are keyed by device
+UUID, WAN interface and a version string naming the config group state they were rendered
+from; callers change the version whenever the rendered config could differ. Bootstraps
+embed one-time onboarding tokens, so files are private to the user and expire after a day.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+
+from catalyst_sdwan_lab._cache_files import cache_dir, write_private
+
+log = logging.getLogger(__name__)
+
+MAX_AGE = 24 * 3600
+
+
+class BootstrapCache:
+    def __init__(self, directory: Path | None = None, *, max_age: float = MAX_AGE) -> None:
+        self.directory = directory or cache_dir("bootstrap")
+        self.max_age = max_age
+
+    def get(self, uuid: str, wanif: str | None, version: str) -> str | None:
+        key = _key(uuid, wanif, version)
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key or time.time() - entry.get("created", 0) > self.max_age:
+            return None
+        return entry.get("config")
+
+    def put(self, uuid: str, wanif: str | None, version: str, config: str) -> None:
+        key = _key(uuid, wanif, version)
+        path = self._path(key)
+        try:
+            write_private(path, json.dumps({"key": key, "created": time.time(), "config": config}))
+        except OSError as e:
+            # a cache that can't be written only costs a refetch next time
+            log.debug("Could not cache bootstrap config for %s: %s", uuid, e)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.json"
+
+
+def _key(uuid: str, wanif: str | None, version: str) -> str:
+    return f"{uuid}|{wanif or ''}|{version}"
@@ -0,0 +1,219 @@
+"""Record and replay all HTTP traffic of a run (SD-WAN Manager via requests, CML via httpx).
+
+Recording patches the requests and httpx transports process-wide and appends every
+exchange to ``<dir>/cassette.jsonl``. Replaying serves those responses back in recorded
+order without touching the network, matched by method and URL (host ignored) and falling
+back to the path alone when the query differs. The last response for a path repeats once
+the others are used up, so pollers keep working. Request bodies are not matched — they
+carry salts, timestamps and other per-run values.
+"""
+
+import base64
+import http.client
+import io
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Literal, TextIO
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+import requests.adapters
+from urllib3 import HTTPResponse
+
+from catalyst_sdwan_lab._cache_files import open_private
+
+log = logging.getLogger(__name__)
+
+CASSETTE_FILE = "cassette.jsonl"
+
+# decoded by the client before we see the body, so they no longer describe it
+_DROPPED_HEADERS = frozenset({"content-encoding", "transfer-encoding", "content-length"})
+
+_original_requests_send = requests.adapters.HTTPAdapter.send
+_original_httpx_handle = httpx.HTTPTransport.handle_request
+_active: "Cassette | None" = None
+
+
+@dataclass
+class Exchange:
+    method: str
+    url: str
+    status: int
+    headers: list[tuple[str, str]]
+    body: str
+    base64: bool
+    elapsed: float
+
+    @property
+    def content(self) -> bytes:
+        return base64.b64decode(self.body) if self.base64 else self.body.encode()
+
+
+class Cassette:
+    def __init__(
+        self, directory: Path, mode: Literal["record", "replay"], *, speed: float = 1.0
+    ) -> None:
+        """speed divides recorded latencies on replay; 0 replays without any delay."""
+        self.path = directory / CASSETTE_FILE
+        self.mode = mode
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._file: TextIO | None = None
+        self._recorded: dict[tuple[str, str], list[Exchange]] = defaultdict(list)
+
+    def install(self) -> None:
+        global _active
+        if _active is not None:
+            raise RuntimeError("A cassette is already installed")
+        if self.mode == "record":
+            # exchanges carry session cookies, tokens and OTPs
+            self._file = open_private(self.path)
+        else:
+            self._load()
+        _active = self
+        requests.adapters.HTTPAdapter.send = _requests_send  # type: ignore[method-assign]
+        httpx.HTTPTransport.handle_request = _httpx_handle  # type: ignore[method-assign]
+        log.info("HTTP %s: %s", "recording" if self.mode == "record" else "replay", self.path)
+
+    def uninstall(self) -> None:
+        global _active
+        if _active is not self:
+            return
+        requests.adapters.HTTPAdapter.send = _original_requests_send  # type: ignore[method-assign]
+        httpx.HTTPTransport.handle_request = _original_httpx_handle  # type: ignore[method-assign]
+        _active = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "Cassette":
+        self.install()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.uninstall()
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        status: int,
+        headers: list[tuple[str, str]],
+        content: bytes,
+        elapsed: float,
+    ) -> None:
+        try:
+            body, is_base64 = content.decode("utf-8"), False
+        except UnicodeDecodeError:
+            body, is_base64 = base64.b64encode(content).decode(), True
+        exchange = Exchange(
+            method, _strip_host(url), status,
+            [(k, v) for k, v in headers if k.lower() not in _DROPPED_HEADERS],
+            body, is_base64, elapsed,
+        )
+        with self._lock:
+            assert self._file is not None
+            self._file.write(json.dumps(asdict(exchange)) + "\n")
+            self._file.flush()
+
+    def replay(self, method: str, url: str) -> Exchange | None:
+        url = _strip_host(url)
+        with self._lock:
+            candidates = self._recorded.get((method, urlsplit(url).path))
+            if not candidates:
+                return None
+            index = next((i for i, e in enumerate(candidates) if e.url == url), 0)
+            exchange = candidates[index]
+            if len(candidates) > 1:
+                del candidates[index]
+        if self.speed > 0:
+            time.sleep(exchange.elapsed / self.speed)
+        return exchange
+
+    def _load(self) -> None:
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                exchange = Exchange(**json.loads(line))
+                exchange.headers = [tuple(h) for h in exchange.headers]  # type: ignore[misc]
+                self._recorded[(exchange.method, urlsplit(exchange.url).path)].append(exchange)
+
+
+def _strip_host(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+
+def _requests_send(
+    self: requests.adapters.HTTPAdapter, request: requests.PreparedRequest, *args: Any,
+    **kwargs: Any,
+) -> requests.Response:
+    cassette = _active
+    method, url = request.method or "GET", request.url or ""
+    if cassette is None:
+        return _original_requests_send(self, request, *args, **kwargs)
+    if cassette.mode == "record":
+        response = _original_requests_send(self, request, *args, **kwargs)
+        cassette.record(
+            method, url, response.status_code, list(response.raw.headers.items()),
+            response.content, response.elapsed.total_seconds(),
+        )
+        return response
+
+    exchange = cassette.replay(method, url)
+    if exchange is None:
+        raise requests.exceptions.ConnectionError(
+            f"No recorded response for {method} {_strip_host(url)}", request=request
+        )
+    header_block = "".join(f"{k}: {v}\r\n" for k, v in exchange.headers) + "\r\n"
+    raw = HTTPResponse(
+        body=io.BytesIO(exchange.content),
+        headers=exchange.headers,
+        status=exchange.status,
+        preload_content=False,
+        original_response=_OriginalResponse(header_block),  # type: ignore[arg-type]
+    )
+    return self.build_response(request, raw)
+
+
+class _OriginalResponse:
+    """Just enough of http.client.HTTPResponse for requests to extract Set-Cookie."""
+
+    def __init__(self, header_block: str) -> None:
+        self.msg = http.client.parse_headers(io.BytesIO(header_block.encode("latin-1")))
+
+    def isclosed(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+def _httpx_handle(self: httpx.HTTPTransport, request: httpx.Request) -> httpx.Response:
+    cassette = _active
+    method, url = request.method, str(request.url)
+    if cassette is None:
+        return _original_httpx_handle(self, request)
+    if cassette.mode == "record":
+        started = time.monotonic()
+        response = _original_httpx_handle(self, request)
+        content = response.read()
+        cassette.record(
+            method, url, response.status_code, response.headers.multi_items(), content,
+            time.monotonic() - started,
+        )
+        return response
+
+    exchange = cassette.replay(method, url)
+    if exchange is None:
+        raise httpx.ConnectError(
+            f"No recorded response for {method} {_strip_host(url)}", request=request
+        )
+    return httpx.Response(
+        exchange.status, headers=exchange.headers, content=exchange.content, request=request
+    )
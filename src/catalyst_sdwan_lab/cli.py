@@ -8,7 +8,8 @@ from typing import Annotated, Optional
 import typer
 from rich.logging import RichHandler
 
-from catalyst_sdwan_lab import __version__
+from catalyst_sdwan_lab import __version__, api_stats, polling, session_cache
+from catalyst_sdwan_lab.cassette import CASSETTE_FILE, Cassette
 from catalyst_sdwan_lab.tasks import add as _add
 from catalyst_sdwan_lab.tasks import backup as _backup
 from catalyst_sdwan_lab.tasks import delete as _delete
@@ -115,8 +116,17 @@ def _version_callback(value: bool) -> None:
         raise typer.Exit()
 
 
+def _report_api_stats(json_path: Path | None) -> None:
+    api_stats.recorder.render(console)
+    polling.recorder.render(console)
+    if json_path is not None:
+        api_stats.recorder.write_json(json_path)
+        console.print(f"API stats written to {json_path}")
+
+
 @app.callback()
 def _main(
+    ctx: typer.Context,
     cml_host: Annotated[
         Optional[str], typer.Option("--cml", "-c", envvar="CML_IP", help="CML hostname or IP")
     ] = None,
@@ -135,6 +145,46 @@ def _main(
     debug: Annotated[
         bool, typer.Option("--debug", help="Show DEBUG level output including HTTP requests")
     ] = False,
+    show_api_stats: Annotated[
+        bool,
+        typer.Option(
+            "--api-stats", help="Print per-endpoint SD-WAN Manager API call statistics at exit"
+        ),
+    ] = False,
+    api_stats_json: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--api-stats-json", help="Also write API call statistics as JSON to this file"
+        ),
+    ] = None,
+    reuse_session: Annotated[
+        bool,
+        typer.Option(
+            "--session-cache", envvar="MANAGER_SESSION_CACHE",
+            help="Keep the SD-WAN Manager session on disk and reuse it in later runs",
+        ),
+    ] = False,
+    record: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--record", metavar="DIR",
+            help="Record all Manager and CML HTTP traffic of this run to DIR",
+        ),
+    ] = None,
+    replay: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--replay", metavar="DIR",
+            help="Serve Manager and CML HTTP traffic from a recording in DIR, offline",
+        ),
+    ] = None,
+    replay_speed: Annotated[
+        float,
+        typer.Option(
+            "--replay-speed", min=0,
+            help="Divide recorded response times by this factor on replay (0: no delay)",
+        ),
+    ] = 1.0,
     _version: Annotated[
         Optional[bool],
         typer.Option(
@@ -149,6 +199,25 @@ def _main(
     _state.verbose = verbose
     _state.debug = debug
     _configure_logging(verbose, debug)
+    if record and replay:
+        log.error("--record and --replay cannot be combined.")
+        raise typer.Exit(1)
+    cassette: Cassette | None = None
+    if record is not None:
+        cassette = Cassette(record, "record")
+    elif replay is not None:
+        if not (replay / CASSETTE_FILE).exists():
+            log.error("No recording found in %s.", replay)
+            raise typer.Exit(1)
+        cassette = Cassette(replay, "replay", speed=replay_speed)
+    if cassette is not None:
+        cassette.install()
+        ctx.call_on_close(cassette.uninstall)
+    if reuse_session:
+        session_cache.store.enable()
+    if show_api_stats or api_stats_json:
+        api_stats.recorder.enable()
+        ctx.call_on_close(lambda: _report_api_stats(api_stats_json))
 
 
 @app.command()
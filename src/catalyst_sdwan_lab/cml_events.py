@@ -0,0 +1,84 @@
+"""CML websocket event feed turned into per-node boot futures.
+
+Waiting for nodes to boot used to mean asking CML about every pending node every few
+seconds, which adds up on a shared controller. With the listener running, CML pushes each
+node state change over its websocket and booted(node) resolves as soon as the node reports
+BOOTED. The listener comes with virl2-client's events extra; if it cannot connect, or the
+websocket drops, waits fall back to polling.
+"""
+
+import logging
+import threading
+from collections.abc import Iterator
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from virl2_client import ClientLibrary
+from virl2_client.event_handling import Event, EventHandler
+from virl2_client.event_listening import EventListener
+from virl2_client.models.node import Node
+
+log = logging.getLogger(__name__)
+
+BOOTED = "BOOTED"
+
+
+class CmlEvents:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._booted: dict[str, Future[None]] = {}
+
+    def booted(self, node: Node) -> Future[None]:
+        """Resolves once CML reports node BOOTED after this call."""
+        with self._lock:
+            return self._booted.setdefault(node.id, Future())
+
+    def node_state(self, node_id: str, state: str | None) -> None:
+        if state != BOOTED:
+            return
+        with self._lock:
+            future = self._booted.setdefault(node_id, Future())
+        if not future.done():
+            future.set_result(None)
+
+
+class _NodeStateHandler(EventHandler):
+    def __init__(self, cml: ClientLibrary, events: CmlEvents) -> None:
+        super().__init__(cml)
+        self._events = events
+
+    def handle_event(self, event: Event) -> None:
+        # an event this client can't apply must not end the listener's parser task
+        try:
+            super().handle_event(event)
+        except Exception as e:
+            log.debug("Ignoring CML event %s: %s", event, e)
+
+    def _handle_state_change(self, event: Event) -> None:
+        super()._handle_state_change(event)
+        if event.element_type == "node":
+            self._events.node_state(event.element_id, event.subtype_original)
+
+
+class _NodeStateListener(EventListener):
+    # virl2_client has no setter for the handler; it documents replacing this attribute
+    def __init__(self, cml: ClientLibrary, events: CmlEvents) -> None:
+        super().__init__(cml)
+        self._event_handler = _NodeStateHandler(cml, events)
+
+
+@contextmanager
+def cml_events(cml: ClientLibrary) -> Iterator[CmlEvents | None]:
+    """Listen to CML events for the duration of the block; None when the feed is unavailable."""
+    events = CmlEvents()
+    try:
+        cml.event_listener = _NodeStateListener(cml, events)
+        cml.start_event_listening()
+    except Exception as e:
+        log.debug("CML event listener unavailable, polling for node state: %s", e)
+        yield None
+        return
+    try:
+        yield events
+    finally:
+        cml.stop_event_listening()
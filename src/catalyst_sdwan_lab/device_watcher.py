@@ -0,0 +1,312 @@
+"""One shared poller per Manager device inventory, feeding every concurrent waiter.
+
+Certificate signing threads, the CSR and reconnect waits and edge onboarding subscribe
+here instead of each polling ``/system/device/controllers`` or ``/vedges`` on their own
+schedule. A background thread per inventory fetches it, diffs the snapshot against the
+previous one by uuid and deviceIP, and re-evaluates only the subscriptions whose device
+changed (plus new ones). The thread stops as soon as nobody is waiting.
+
+Edges are keyed by uuid only: each edge round streams the inventory in one request,
+narrowed by the Manager to the certificate states the waiters care about, and keeps just
+the subscribed UUIDs, rather than materializing the whole serial file.
+
+Between inventory reads the thread follows the Manager event feed (see event_feed) every
+backoff floor and re-reads the inventory as soon as a relevant event arrives. While the
+feed works, the inventory itself is only re-read at a few times the backoff interval, as
+a fallback for changes that log no event.
+"""
+
+import concurrent.futures
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future
+from typing import Any, Literal
+
+import requests
+
+from catalyst_sdwan_lab import polling
+from catalyst_sdwan_lab.event_feed import EventFeed
+from catalyst_sdwan_lab.manager_client import ManagerAPIError, ManagerClient
+from catalyst_sdwan_lab.polling import Backoff, PollStats
+
+log = logging.getLogger(__name__)
+
+Inventory = Literal["controllers", "vedges"]
+Device = dict[str, Any]
+# what cut an inventory wait short: a new subscription or a Manager event
+_Wake = Literal["waiter", "event"]
+
+_WATCH_BACKOFF = Backoff(floor=2, ceiling=10)
+# inventory reads are this much further apart while the event feed is answering
+_FEED_STRETCH = 3
+# how long past its deadline a waiter still waits for the first check of its keys
+_LATE_CHECK_GRACE = 10
+
+
+class _Subscription:
+    def __init__(
+        self, key: str, predicate: Callable[[Device], bool], states: frozenset[str] | None
+    ) -> None:
+        self.key = key
+        self.predicate = predicate
+        self.states = states
+        self.future: Future[Device] = Future()
+        self.checked = False
+        # set after the first poll following subscription, even a failed one
+        self.evaluated = threading.Event()
+        self.last_miss = time.monotonic()
+        self.resolved_at = 0.0
+
+
+class DeviceStateWatcher:
+    def __init__(
+        self, client: ManagerClient, *, backoff: Backoff = _WATCH_BACKOFF, events: bool = True
+    ) -> None:
+        self._client = client
+        self._backoff = backoff
+        self._events = events
+        self._lock = threading.Lock()
+        self._subs: dict[Inventory, list[_Subscription]] = {"controllers": [], "vedges": []}
+        self._threads: dict[Inventory, threading.Thread] = {}
+        self._wake = {inventory: threading.Event() for inventory in self._subs}
+        self._rounds = dict.fromkeys(self._subs, 0)
+
+    def wait_all(
+        self,
+        inventory: Inventory,
+        keys: Iterable[str],
+        predicate: Callable[[Device], bool],
+        *,
+        timeout: float,
+        label: str,
+        on_ready: Callable[[str, Device], None] | None = None,
+        states: Iterable[str] | None = None,
+    ) -> set[str]:
+        """Block until predicate holds for the device behind every key.
+
+        Keys are uuids or deviceIPs for controllers, and uuids for vedges. For vedges,
+        states (vedgeCertificateState values) lets the Manager leave out devices in any
+        other state; predicate must not hold for those.
+
+        Every key is checked against at least one fresh snapshot, even when timeout has
+        already passed, for up to _LATE_CHECK_GRACE seconds past the deadline. Returns the
+        keys still pending at the deadline (empty on success).
+        """
+        started = time.monotonic()
+        rounds = self._rounds[inventory]
+        subs = self._subscribe(
+            inventory, keys, predicate, None if states is None else frozenset(states)
+        )
+        by_future = {s.future: s for s in subs}
+        pending: set[Future[Device]] = set(by_future)
+        deadline = started + timeout
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                last = remaining <= 0
+                # the poller needs a worker session while callers block holding theirs
+                with self._client.idle_worker():
+                    if last:
+                        grace_end = deadline + _LATE_CHECK_GRACE
+                        for f in pending:
+                            by_future[f].evaluated.wait(max(0.0, grace_end - time.monotonic()))
+                        remaining = 0
+                    done, pending = concurrent.futures.wait(
+                        pending, timeout=remaining, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                for f in done:
+                    device = f.result()
+                    if on_ready:
+                        on_ready(by_future[f].key, device)
+                if last:
+                    break
+        finally:
+            self._unsubscribe(inventory, [by_future[f] for f in pending])
+        resolved = [s for s in subs if s.future.done() and not s.future.cancelled()]
+        polling.recorder.add(PollStats(
+            label,
+            self._rounds[inventory] - rounds,
+            time.monotonic() - started,
+            not pending,
+            max((s.resolved_at - s.last_miss for s in resolved), default=0.0),
+        ))
+        return {by_future[f].key for f in pending}
+
+    def _subscribe(
+        self,
+        inventory: Inventory,
+        keys: Iterable[str],
+        predicate: Callable[[Device], bool],
+        states: frozenset[str] | None,
+    ) -> list[_Subscription]:
+        subs = [_Subscription(k, predicate, states) for k in keys]
+        with self._lock:
+            self._subs[inventory].extend(subs)
+            if inventory not in self._threads:
+                thread = threading.Thread(
+                    target=self._run, args=(inventory,), name=f"watch-{inventory}", daemon=True
+                )
+                self._threads[inventory] = thread
+                thread.start()
+        self._wake[inventory].set()
+        return subs
+
+    def _unsubscribe(self, inventory: Inventory, subs: list[_Subscription]) -> None:
+        with self._lock:
+            for sub in subs:
+                if sub in self._subs[inventory]:
+                    self._subs[inventory].remove(sub)
+                sub.future.cancel()
+                sub.evaluated.set()
+
+    def _run(self, inventory: Inventory) -> None:
+        error = ManagerAPIError(f"Polling {inventory} stopped")
+        try:
+            self._watch(inventory)
+        except Exception as e:
+            log.debug("Polling %s failed unexpectedly", inventory, exc_info=True)
+            error = ManagerAPIError(f"Polling {inventory} failed: {e}")
+            error.__cause__ = e
+        finally:
+            self._abandon(inventory, error)
+
+    def _watch(self, inventory: Inventory) -> None:
+        previous: dict[str, Device] = {}
+        attempt = 0
+        fresh = False
+        # runs beside the signing workers, so it needs a session of its own too
+        with self._client.worker_session():
+            feed = EventFeed(self._client) if self._events else None
+            while True:
+                self._wake[inventory].clear()
+                with self._lock:
+                    subs = list(self._subs[inventory])
+                    if not subs:
+                        del self._threads[inventory]
+                        return
+                try:
+                    devices = self._fetch(inventory, subs, fresh=fresh)
+                except (ManagerAPIError, requests.exceptions.RequestException) as e:
+                    log.debug("Polling %s failed: %s", inventory, e)
+                    # counts as a negative check, so timed-out waiters are not held up
+                    for sub in subs:
+                        sub.evaluated.set()
+                    attempt += 1
+                else:
+                    snapshot = _index(devices)
+                    changed = {k for k, d in snapshot.items() if previous.get(k) != d}
+                    previous = snapshot
+                    self._rounds[inventory] += 1
+                    if self._dispatch(inventory, subs, snapshot, changed):
+                        attempt = 0
+                    else:
+                        attempt += 1
+                woke = self._sleep(inventory, attempt, feed)
+                if woke:
+                    attempt = 0
+                fresh = woke == "event"
+
+    def _abandon(self, inventory: Inventory, error: ManagerAPIError) -> None:
+        """Fail the waiters of a poller that died; no-op after a normal stop."""
+        with self._lock:
+            if self._threads.get(inventory) is not threading.current_thread():
+                return
+            del self._threads[inventory]
+            subs, self._subs[inventory] = self._subs[inventory], []
+            for sub in subs:
+                sub.future.set_exception(error)
+        for sub in subs:
+            sub.evaluated.set()
+
+    def _sleep(
+        self, inventory: Inventory, attempt: int, feed: EventFeed | None
+    ) -> _Wake | None:
+        """Wait for the next inventory read; says whether a new waiter or an event cut it short."""
+        interval = self._backoff.interval(attempt)
+        if feed is None or not feed.available:
+            return "waiter" if self._wake[inventory].wait(interval) else None
+        started = time.monotonic()
+        deadline = started + interval * _FEED_STRETCH
+        while feed.available and (remaining := deadline - time.monotonic()) > 0:
+            if self._wake[inventory].wait(min(self._backoff.floor, remaining)):
+                return "waiter"
+            events = feed.poll()
+            if events:
+                log.debug("%d Manager event(s), re-reading %s", len(events), inventory)
+                return "event"
+        # the feed went away mid-wait: finish the plain interval
+        remaining = started + interval - time.monotonic()
+        return "waiter" if remaining > 0 and self._wake[inventory].wait(remaining) else None
+
+    def _fetch(
+        self, inventory: Inventory, subs: list[_Subscription], *, fresh: bool = False
+    ) -> list[Device]:
+        # after an event the cached inventory predates the change it reports
+        if inventory == "controllers":
+            return self._client.get_controllers(fresh=fresh)
+        # one query serves every waiter, so it asks for the union of their states
+        states: set[str] | None = set()
+        for s in subs:
+            if s.states is None:
+                states = None
+                break
+            states |= s.states
+        return list(self._client.iter_vedges(uuids={s.key for s in subs}, states=states))
+
+    def _dispatch(
+        self,
+        inventory: Inventory,
+        subs: list[_Subscription],
+        snapshot: dict[str, Device],
+        changed: set[str],
+    ) -> bool:
+        """Resolve the subscriptions now satisfied; True if any did."""
+        now = time.monotonic()
+        resolved = False
+        for sub in subs:
+            if sub.checked and sub.key not in changed:
+                continue
+            sub.checked = True
+            device = snapshot.get(sub.key)
+            try:
+                ready = device is not None and sub.predicate(device)
+            except Exception as e:
+                self._finish(inventory, sub, error=e)
+                continue
+            if ready:
+                sub.resolved_at = now
+                self._finish(inventory, sub, device=device)
+                resolved = True
+            else:
+                sub.last_miss = now
+                sub.evaluated.set()
+        return resolved
+
+    def _finish(
+        self,
+        inventory: Inventory,
+        sub: _Subscription,
+        *,
+        device: Device | None = None,
+        error: Exception | None = None,
+    ) -> None:
+        with self._lock:
+            if sub not in self._subs[inventory]:
+                return
+            self._subs[inventory].remove(sub)
+            if error is not None:
+                sub.future.set_exception(error)
+            else:
+                sub.future.set_result(device or {})
+        sub.evaluated.set()
+
+
+def _index(devices: list[Device]) -> dict[str, Device]:
+    snapshot: dict[str, Device] = {}
+    for d in devices:
+        for key in (d.get("uuid"), d.get("deviceIP")):
+            if key:
+                snapshot[key] = d
+    return snapshot
@@ -0,0 +1,80 @@
+"""Cursor over the SD-WAN Manager event log, used as a wake-up signal for device waits.
+
+Certificate installs, control connections coming up and devices turning reachable are all
+logged as Manager events. Asking for the events newer than a cursor returns a handful of
+small records, where re-reading an inventory returns every device. DeviceStateWatcher
+polls the feed between inventory reads and re-reads the inventory as soon as a relevant
+event shows up; the inventory stays the source of truth, so an event name this Manager
+release doesn't log only costs the fast path. A Manager that rejects the event query
+turns the feed off and leaves plain inventory polling.
+"""
+
+import logging
+import time
+from collections.abc import Iterable
+from typing import Any
+
+import requests
+
+from catalyst_sdwan_lab.manager_client import ManagerAPIError, ManagerClient
+
+log = logging.getLogger(__name__)
+
+WAKE_EVENTS = frozenset({
+    "certificate-installed",
+    "control-connection-state-change",
+    "device-reachability-change",
+    "system-reboot-complete",
+})
+
+# covers clock skew between this host and the Manager on the first query
+_LOOKBACK_S = 300
+# the event query has second resolution, so consecutive windows overlap by a second
+_OVERLAP_S = 1.0
+
+
+class EventFeed:
+    def __init__(self, client: ManagerClient, names: Iterable[str] = WAKE_EVENTS) -> None:
+        self._client = client
+        self._names = frozenset(names)
+        self.available = True
+        self._cursor: float | None = None
+        self._seen: dict[str, float] = {}
+
+    def poll(self) -> list[dict[str, Any]]:
+        """Events logged since the previous call.
+
+        The first call only positions the cursor: whatever happened before it is already
+        reflected in the inventory read that starts a wait.
+        """
+        if not self.available:
+            return []
+        first = self._cursor is None
+        since = time.time() - _LOOKBACK_S if self._cursor is None else self._cursor
+        try:
+            events = self._client.get_events(since - _OVERLAP_S, self._names)
+        except ManagerAPIError as e:
+            log.debug("Manager event feed unavailable, polling inventories only: %s", e)
+            self.available = False
+            return []
+        except requests.exceptions.RequestException as e:
+            log.debug("Reading Manager events failed: %s", e)
+            return []
+        new = [e for e in events if _event_id(e) not in self._seen]
+        for event in new:
+            self._seen[_event_id(event)] = _entry_time(event)
+        self._cursor = max([since, *(_entry_time(e) for e in new)])
+        # ids only matter while their events can still fall into the overlap
+        horizon = self._cursor - 2 * _OVERLAP_S
+        self._seen = {k: t for k, t in self._seen.items() if t >= horizon}
+        return [] if first else new
+
+
+def _entry_time(event: dict[str, Any]) -> float:
+    return float(event.get("entry_time", 0)) / 1000
+
+
+def _event_id(event: dict[str, Any]) -> str:
+    return str(event.get("id") or (
+        event.get("eventname"), event.get("entry_time"), event.get("system_ip")
+    ))
@@ -0,0 +1,660 @@
+"""In-process stand-in for SD-WAN Manager, for offline testing and benchmarking of the tasks.
+
+Implements the subset of the REST API that ManagerClient uses, over TLS with a throwaway
+self-signed certificate. Devices move through the same states a real Manager reports
+(CSR generated -> certificate installed -> reachable) on configurable timers, and every
+endpoint can be given an artificial latency::
+
+    with FakeManager(edge_count=200, latency={"*": 0.05}) as fake:
+        client = ManagerClient("127.0.0.1", fake.port, "admin", fake.password)
+
+Run ``python -m catalyst_sdwan_lab.fake_manager --port 8443`` to serve it standalone.
+"""
+
+import datetime
+import heapq
+import itertools
+import json
+import logging
+import re
+import secrets
+import ssl
+import tempfile
+import threading
+import time
+import uuid as uuidlib
+from collections.abc import Callable, Mapping
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Annotated, Any
+from urllib.parse import parse_qs, urlsplit
+
+import typer
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from catalyst_sdwan_lab.api_stats import normalize_path
+
+log = logging.getLogger(__name__)
+
+_LOGIN_PAGE = "<html><head><title>Cisco SD-WAN</title></head><body>login</body></html>"
+
+# variable names the bundled edge_basic / sdrouting_basic config groups define
+_CONFIG_GROUP_VARIABLES = (
+    "system_ip", "host_name", "site_id", "pseudo_commit_timer", "ipv6_strict_control",
+    "aaa_password", "vpn0_gi1_inet_ip", "vpn0_gi1_inet_mask", "vpn0_gi2_mpls_ip",
+    "vpn0_gi2_mpls_mask", "vpn1_gi3_lan_ip", "vpn1_gi3_lan_mask", "vpn1_gi3_dhcp_network",
+    "vpn1_gi3_dhcp_address_exclude", "vpn1_gi3_dhcp_default_gateway", "vpn0_gi1_inet_ipv6",
+    "vpn0_gi2_mpls_ipv6", "vpn1_gi3_lan_ipv6",
+)
+
+_Handler = Callable[["_Request"], Any]
+
+
+class _Request:
+    def __init__(self, path: str, query: dict[str, list[str]], body: bytes, session_id: str,
+                 match: re.Match[str]) -> None:
+        self.path = path
+        self.query = query
+        self.body = body
+        self.session_id = session_id
+        self.match = match
+
+    def json(self) -> Any:
+        return json.loads(self.body) if self.body else None
+
+    def param(self, name: str) -> str | None:
+        values = self.query.get(name)
+        return values[-1] if values else None
+
+
+class _Reply:
+    def __init__(self, status: int, body: Any = None, *, text: str | None = None,
+                 headers: dict[str, str] | None = None) -> None:
+        self.status = status
+        self.body = body
+        self.text = text
+        self.headers = headers or {}
+
+
+class FakeManager:
+    def __init__(
+        self,
+        *,
+        username: str = "admin",
+        password: str = "fake-password",
+        edge_count: int = 20,
+        latency: Mapping[str, float] | None = None,
+        task_duration: float = 0.0,
+        reachable_delay: float = 0.0,
+        onboard_delay: float = 0.0,
+        restart_duration: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """
+        latency maps ``"METHOD /path/template"``, ``"/path/template"`` (IDs written as
+        ``{id}``, see api_stats.normalize_path) or ``"*"`` to seconds added to each response.
+        task_duration is how long action tasks stay in progress, reachable_delay how long a
+        device takes to become reachable after its certificate is installed, and
+        onboard_delay how long an edge takes to onboard once its bootstrap config was fetched.
+        restart_duration is how long the NMS restart after a cluster change takes; zero
+        means no restart at all.
+        """
+        self.username = username
+        self.password = password
+        self.latency = dict(latency or {})
+        self.task_duration = task_duration
+        self.reachable_delay = reachable_delay
+        self.onboard_delay = onboard_delay
+        self.restart_duration = restart_duration
+        self._restarting_until = 0.0
+        self._address = (host, port)
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._sessions: dict[str, str] = {}  # JSESSIONID -> XSRF token
+        self._timers: list[tuple[float, int, Callable[[], None]]] = []
+        self._timer_seq = itertools.count()
+        self._tasks: dict[str, float] = {}
+        self._csr_key = ec.generate_private_key(ec.SECP256R1())
+        self.settings: dict[str, dict[str, Any]] = {
+            "certificate": {"certificateSigning": "enterprise"},
+        }
+        self.workflows: list[dict[str, Any]] = []
+        self.feature_templates: list[dict[str, Any]] = []
+        self.device_templates: list[dict[str, Any]] = []
+        self.config_groups: list[dict[str, Any]] = []
+        self.network_hierarchy: list[dict[str, Any]] = [
+            {"id": str(uuidlib.uuid4()), "name": "Global", "data": {"label": "GLOBAL"}}
+        ]
+        self.cluster: dict[str, Any] = {"isIPConfigured": False, "data": []}
+        self.events: list[dict[str, Any]] = []
+        self.controllers: list[dict[str, Any]] = [
+            _device("vmanage", "172.16.0.1", "100.0.0.1")
+        ]
+        self.vedges: list[dict[str, Any]] = [
+            {"uuid": f"C8K-{uuidlib.uuid4()}", "deviceModel": "vedge-C8000V",
+             "serialNumber": secrets.token_hex(4).upper(), "reachability": "unreachable",
+             "vedgeCertificateState": "tokengenerated"}
+            for _ in range(edge_count)
+        ]
+        self._routes: list[tuple[str, re.Pattern[str], _Handler]] = [
+            (method, re.compile(f"^{pattern}$"), handler)
+            for method, pattern, handler in self._route_table()
+        ]
+
+    @property
+    def port(self) -> int:
+        assert self._server is not None, "FakeManager not started"
+        return self._server.server_address[1]
+
+    def start(self) -> "FakeManager":
+        self._server = ThreadingHTTPServer(self._address, _make_handler(self))
+        self._server.daemon_threads = True
+        with tempfile.TemporaryDirectory() as tmp:
+            cert, key = _write_self_signed(Path(tmp))
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(cert, key)
+        self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        log.info("Fake SD-WAN Manager listening on https://%s:%s", self._address[0], self.port)
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeManager":
+        return self.start()
+
+    def __exit__(self, *_: object) -> None:
+        self.stop()
+
+    def expire_sessions(self) -> None:
+        """Drop all logged-in sessions, as a Manager does on idle timeout or NMS restart."""
+        with self._lock:
+            self._sessions.clear()
+
+    def restart(self, duration: float) -> None:
+        """Stop serving for duration seconds, as the NMS restart after a cluster change."""
+        self._restarting_until = time.monotonic() + duration
+        self._sessions.clear()
+
+    # request dispatch -----------------------------------------------------------------
+
+    def handle(self, method: str, raw_path: str, headers: Mapping[str, str],
+               body: bytes) -> _Reply:
+        parts = urlsplit(raw_path)
+        path = parts.path
+        delay = self._latency_for(method, raw_path)
+        if delay:
+            time.sleep(delay)
+        if time.monotonic() < self._restarting_until:
+            if path == "/diagnostic/api/v1/boot":
+                return _Reply(200, {"activeServices": 12, "totalServices": 40})
+            return _Reply(503, text="Service Unavailable")
+        session_id = _cookie(headers, "JSESSIONID") or ""
+        if path.startswith("/dataservice/") and path != "/dataservice/client/token":
+            token = self._sessions.get(session_id)
+            if token is None:
+                return _Reply(200, text=_LOGIN_PAGE)
+            if method != "GET" and headers.get("x-xsrf-token") != token:
+                return _Reply(403, {"error": {"message": "Invalid XSRF token"}})
+        query = parse_qs(parts.query)
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(path)
+            if route_method == method and match:
+                with self._lock:
+                    self._run_due_timers()
+                    result = handler(_Request(path, query, body, session_id, match))
+                return result if isinstance(result, _Reply) else _Reply(200, result)
+        return _Reply(404, {"error": {"message": f"No fake for {method} {path}"}})
+
+    def _latency_for(self, method: str, raw_path: str) -> float:
+        template = normalize_path(raw_path)
+        for key in (f"{method} {template}", template, "*"):
+            if key in self.latency:
+                return self.latency[key]
+        return 0.0
+
+    def _route_table(self) -> list[tuple[str, str, _Handler]]:
+        ds = "/dataservice"
+        return [
+            ("POST", "/j_security_check", self._login),
+            ("GET", f"{ds}/client/token", self._token),
+            ("GET", "/logout", self._logout),
+            ("GET", "/diagnostic/api/v1/boot",
+             lambda r: {"activeServices": 40, "totalServices": 40}),
+            ("GET", f"{ds}/settings/configuration/ciscoservices", lambda r: {"data": []}),
+            ("GET", f"{ds}/settings/configuration/([\\w/]+)", self._get_setting),
+            ("PUT", f"{ds}/settings/configuration/([\\w/]+)", self._set_setting),
+            ("POST", f"{ds}/settings/configuration/([\\w/]+)", self._set_setting),
+            ("POST", f"{ds}/settings/services/.*", lambda r: {}),
+            ("GET", f"{ds}/workflow", self._get_workflows),
+            ("POST", f"{ds}/workflow", self._create_workflow),
+            ("PUT", f"{ds}/workflow", self._update_workflow),
+            ("GET", f"{ds}/template/device", lambda r: {"data": self.device_templates}),
+            ("GET", f"{ds}/template/feature", lambda r: {"data": self.feature_templates}),
+            ("POST", f"{ds}/template/feature", self._create_feature_template),
+            ("POST", f"{ds}/template/device/feature", self._create_device_template),
+            ("POST", f"{ds}/template/device/config/attachfeature",
+             lambda r: {"id": self._new_task()}),
+            ("GET", f"{ds}/v1/config-group", lambda r: self.config_groups),
+            ("GET", f"{ds}/v1/config-group/[^/]+/device/variables/schema",
+             self._config_group_schema),
+            ("PUT", f"{ds}/v1/config-group/[^/]+/device/(associate|variables)", lambda r: None),
+            ("POST", f"{ds}/v1/config-group/[^/]+/device/deploy",
+             lambda r: {"parentTaskId": self._new_task()}),
+            ("POST", f"{ds}/v1/packages/import", self._import_package),
+            ("POST", f"{ds}/v1/control-component/network-settings", lambda r: None),
+            ("POST", f"{ds}/v1/control-component/devices/[^/]+/settings/config-to-settings",
+             lambda r: None),
+            ("POST", f"{ds}/v1/control-component/devices/settings/deploy",
+             lambda r: {"id": self._new_task()}),
+            ("GET", f"{ds}/v1/network-hierarchy", lambda r: self.network_hierarchy),
+            ("POST", f"{ds}/v1/network-hierarchy", self._create_hierarchy_entry),
+            ("POST", f"{ds}/v1/network-hierarchy/[^/]+/network-settings/mrf", lambda r: None),
+            ("GET", f"{ds}/system/device/controllers", lambda r: {"data": self.controllers}),
+            ("GET", f"{ds}/system/device/vedges", self._vedge_inventory),
+            ("GET", f"{ds}/system/device/bootstrap/device/([^/]+)", self._bootstrap_config),
+            ("POST", f"{ds}/system/device", self._add_controller),
+            ("POST", f"{ds}/system/device/fileupload", lambda r: {}),
+            ("PUT", f"{ds}/system/device/([^/]+)", self._update_device),
+            ("GET", f"{ds}/certificate/vedge/list", self._vedge_list),
+            ("POST", f"{ds}/certificate/generate/csr", self._generate_csr),
+            ("POST", f"{ds}/certificate/install/signedCert", self._install_cert),
+            ("POST", f"{ds}/event", self._query_events),
+            ("GET", f"{ds}/device/action/status/([^/]+)", self._task_status),
+            ("POST", f"{ds}/device/action/rediscover", lambda r: {"id": self._new_task()}),
+            ("GET", f"{ds}/device/sync_status", self._sync_status),
+            ("GET", f"{ds}/device/vmanage", lambda r: {"data": {"ipAddress": "100.0.0.1"}}),
+            ("GET", f"{ds}/device/interface", self._interfaces),
+            ("GET", f"{ds}/clusterManagement/list", lambda r: {"data": [self.cluster]}),
+            ("PUT", f"{ds}/clusterManagement/setup/", self._setup_cluster_ip),
+            ("POST", f"{ds}/clusterManagement/setup/", self._add_cluster_node),
+        ]
+
+    # timers and tasks -----------------------------------------------------------------
+
+    def _after(self, delay: float, action: Callable[[], None]) -> None:
+        if delay <= 0:
+            action()
+            return
+        heapq.heappush(self._timers, (time.monotonic() + delay, next(self._timer_seq), action))
+
+    def _run_due_timers(self) -> None:
+        now = time.monotonic()
+        while self._timers and self._timers[0][0] <= now:
+            heapq.heappop(self._timers)[2]()
+
+    def _new_task(self, on_done: Callable[[], None] | None = None) -> str:
+        task_id = f"fake_task-{uuidlib.uuid4()}"
+        self._tasks[task_id] = time.monotonic() + self.task_duration
+        if on_done is not None:
+            self._after(self.task_duration, on_done)
+        return task_id
+
+    def _task_status(self, r: _Request) -> Any:
+        done_at = self._tasks.get(r.match.group(1))
+        if done_at is None:
+            return _Reply(404, {"error": {"message": "Task not found"}})
+        if time.monotonic() < done_at:
+            return {"summary": {"status": "in_progress", "count": {}}, "data": []}
+        return {"summary": {"status": "done", "count": {"Success": 1}}, "data": []}
+
+    # auth -----------------------------------------------------------------------------
+
+    def _login(self, r: _Request) -> _Reply:
+        form = {k: v[-1] for k, v in parse_qs(r.body.decode()).items()}
+        if (form.get("j_username"), form.get("j_password")) != (self.username, self.password):
+            return _Reply(200, text=_LOGIN_PAGE)
+        session_id = secrets.token_hex(16)
+        self._sessions[session_id] = secrets.token_hex(32)
+        return _Reply(200, text="", headers={"Set-Cookie": f"JSESSIONID={session_id}; Path=/"})
+
+    def _token(self, r: _Request) -> _Reply:
+        token = self._sessions.get(r.session_id)
+        return _Reply(200, text=token) if token else _Reply(200, text=_LOGIN_PAGE)
+
+    def _logout(self, r: _Request) -> _Reply:
+        self._sessions.pop(r.session_id, None)
+        return _Reply(200, text="")
+
+    # settings, workflows, templates ---------------------------------------------------
+
+    def _get_setting(self, r: _Request) -> Any:
+        value = self.settings.get(r.match.group(1))
+        return {"data": [value] if value else []}
+
+    def _set_setting(self, r: _Request) -> Any:
+        self.settings.setdefault(r.match.group(1), {}).update(r.json() or {})
+        return None
+
+    def _get_workflows(self, r: _Request) -> Any:
+        return {"workflows": [w for w in self.workflows if w["type"] == r.param("type")]}
+
+    def _create_workflow(self, r: _Request) -> Any:
+        workflow = {"id": _new_id(), **r.json()}
+        self.workflows.append(workflow)
+        return {"id": workflow["id"]}
+
+    def _update_workflow(self, r: _Request) -> Any:
+        body = r.json()
+        for w in self.workflows:
+            if w["id"] == body["id"]:
+                w["userContext"] = body["userContext"]
+        return None
+
+    def _create_feature_template(self, r: _Request) -> Any:
+        name = r.json().get("templateName")
+        if any(t["templateName"] == name for t in self.feature_templates):
+            return _Reply(400, {"error": {"message": f"Template {name} already exists"}})
+        template = {"templateId": _new_id(), "templateName": name}
+        self.feature_templates.append(template)
+        return {"templateId": template["templateId"]}
+
+    def _create_device_template(self, r: _Request) -> Any:
+        template = {"templateId": _new_id(), "templateName": r.json().get("templateName")}
+        self.device_templates.append(template)
+        return {"templateId": template["templateId"]}
+
+    def _import_package(self, r: _Request) -> Any:
+        def create_groups() -> None:
+            existing = {g["name"] for g in self.config_groups}
+            for name in ("edge_basic", "sdrouting_basic"):
+                if name not in existing:
+                    self.config_groups.append({"id": _new_id(), "name": name, "solution": "sdwan"})
+
+        return {"taskId": self._new_task(create_groups)}
+
+    def _config_group_schema(self, r: _Request) -> Any:
+        properties = {name: {} for name in _CONFIG_GROUP_VARIABLES}
+        return [{"variables": [{"schema": {"properties": properties}}]}]
+
+    def _create_hierarchy_entry(self, r: _Request) -> Any:
+        entry = {"id": _new_id(), **r.json()}
+        self.network_hierarchy.append(entry)
+        return {"id": entry["id"]}
+
+    # devices and certificates ---------------------------------------------------------
+
+    def _add_controller(self, r: _Request) -> Any:
+        body = r.json()
+        if any(d["deviceIP"] == body["deviceIP"] for d in self.controllers):
+            return _Reply(400, {"error": {"message": f"Device {body['deviceIP']} already exists"}})
+        octet = re.split(r"[.:]", body["deviceIP"])[-1]
+        self.controllers.append(_device(body["personality"], body["deviceIP"], f"100.0.0.{octet}"))
+        return None
+
+    def _update_device(self, r: _Request) -> Any:
+        device = self._find_device(r.match.group(1))
+        if device is None:
+            return _Reply(404, {"error": {"message": "Device not found"}})
+        device["deviceIP"] = r.json().get("deviceIP", device["deviceIP"])
+        return None
+
+    def _generate_csr(self, r: _Request) -> Any:
+        ip = r.json()["deviceIP"]
+        device = next((d for d in self.controllers if d["deviceIP"] == ip), None)
+        if device is None:
+            return _Reply(400, {"error": {"message": f"No device with IP {ip}"}})
+        device["certInstallStatus"] = "CSR Generated"
+        if self.settings["certificate"].get("certificateSigning") == "cisco":
+            # Cisco PKI: the Manager has the CSR signed and installs the certificate itself
+            serial = secrets.randbits(64)
+            self._after(self.task_duration, lambda: self._cert_installed(device, serial))
+        return {"data": [{"deviceCSR": self._csr_pem(device["uuid"]), "uuid": device["uuid"]}]}
+
+    def _install_cert(self, r: _Request) -> Any:
+        cert = x509.load_pem_x509_certificate(r.body)
+        common_names = cert.subject.get_attributes_for_oid(NameOID.COMMON_NAME)
+        device = self._find_device(str(common_names[0].value)) if common_names else None
+        if device is None:
+            return _Reply(400, {"error": {"message": "Certificate does not match any CSR"}})
+        return {"id": self._new_task(lambda: self._cert_installed(device, cert.serial_number))}
+
+    def _cert_installed(self, device: dict[str, Any], serial: int) -> None:
+        device["certInstallStatus"] = "Installed"
+        device["serialNumber"] = f"{serial:X}"
+        self._log_event("certificate-installed", device)
+        self._after(self.reachable_delay, lambda: self._set_reachable(device))
+
+    def _bootstrap_config(self, r: _Request) -> Any:
+        device = self._find_device(r.match.group(1))
+        if device is None:
+            return _Reply(400, {"error": {"message": "Device not found"}})
+        if "certInstallStatus" not in device:
+            device["vedgeCertificateState"] = "bootstrapconfiggenerated"
+
+            # the edge boots with this config and onboards on its own
+            def onboarded() -> None:
+                device["certInstallStatus"] = "Installed"
+                device["vedgeCertificateState"] = "certinstalled"
+                self._set_reachable(device)
+
+            self._after(self.onboard_delay, onboarded)
+        return {"bootstrapConfig": f"#cloud-config\n# uuid: {device['uuid']}\n"}
+
+    def _set_reachable(self, device: dict[str, Any]) -> None:
+        device["reachability"] = "reachable"
+        self._log_event("control-connection-state-change", device, "new-state=up")
+
+    def _log_event(self, name: str, device: dict[str, Any], details: str = "") -> None:
+        self.events.append({
+            "id": _new_id(),
+            "eventname": name,
+            "entry_time": int(time.time() * 1000),
+            "system_ip": device.get("system-ip", ""),
+            "host_name": device["uuid"],
+            "details": details,
+        })
+
+    def _query_events(self, r: _Request) -> Any:
+        """Supports the two rules EventFeed sends: entry_time greater, eventname in."""
+        events = self.events
+        for rule in r.json()["query"]["rules"]:
+            if rule["field"] == "entry_time":
+                since = datetime.datetime.strptime(
+                    rule["value"][0], "%Y-%m-%dT%H:%M:%S UTC"
+                ).replace(tzinfo=datetime.UTC)
+                events = [e for e in events if e["entry_time"] > since.timestamp() * 1000]
+            elif rule["field"] == "eventname":
+                events = [e for e in events if e["eventname"] in rule["value"]]
+        return {"data": events}
+
+    def _vedge_inventory(self, r: _Request) -> Any:
+        model, states = r.param("model"), r.query.get("state")
+        return {
+            "header": {"generatedOn": int(time.time() * 1000)},
+            "data": [
+                v for v in self.vedges
+                if (model is None or v["deviceModel"] == model)
+                and (states is None or v["vedgeCertificateState"] in states)
+            ],
+        }
+
+    def _vedge_list(self, r: _Request) -> Any:
+        return {"data": [
+            {"uuid": v["uuid"], "serialNumber": v["serialNumber"],
+             "vedgeCertificateState": "tokengenerated"}
+            for v in self.vedges
+            if v.get("certInstallStatus") != "Installed"
+        ]}
+
+    def _sync_status(self, r: _Request) -> Any:
+        return {"data": [
+            {"uuid": d["uuid"], "local-system-ip": d["system-ip"], "reachability": "reachable"}
+            for d in self.controllers
+            if d.get("reachability") == "reachable"
+        ]}
+
+    def _interfaces(self, r: _Request) -> Any:
+        return {"data": [
+            {"ifname": "eth2", "af-type": "ipv4", "ip-address": "172.16.254.1/24"},
+        ]}
+
+    def _setup_cluster_ip(self, r: _Request) -> Any:
+        body = r.json()
+        self.cluster["isIPConfigured"] = True
+        self.cluster["data"] = [_cluster_node(body["deviceIP"], body["persona"])]
+        if self.restart_duration:
+            self.restart(self.restart_duration)
+        return None
+
+    def _add_cluster_node(self, r: _Request) -> Any:
+        body = r.json()
+        node = _cluster_node(body["deviceIP"], body["persona"], state="pending")
+        self.cluster["data"].append(node)
+
+        def ready() -> None:
+            node["configJson"]["state"] = "ready"
+            octet = body["deviceIP"].split(".")[-1]
+            self.controllers.append(_device(
+                "vmanage", body["deviceIP"], f"100.0.0.{octet}", uuid=node["configJson"]["uuid"]
+            ))
+
+        self._after(self.task_duration, ready)
+        if self.restart_duration:
+            self.restart(self.restart_duration)
+        return None
+
+    def _find_device(self, uuid: str) -> dict[str, Any] | None:
+        return next((d for d in self.controllers + self.vedges if d["uuid"] == uuid), None)
+
+    def _csr_pem(self, common_name: str) -> str:
+        csr = (
+            x509.CertificateSigningRequestBuilder()
+            .subject_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)]))
+            .sign(self._csr_key, hashes.SHA256())
+        )
+        return csr.public_bytes(serialization.Encoding.PEM).decode()
+
+
+def _new_id() -> str:
+    return str(uuidlib.uuid4())
+
+
+def _device(
+    personality: str, device_ip: str, system_ip: str, *, uuid: str | None = None
+) -> dict[str, Any]:
+    return {
+        "uuid": uuid or _new_id(),
+        "deviceIP": device_ip,
+        "system-ip": system_ip,
+        "personality": personality,
+        "deviceType": personality,
+        "serialNumber": "No certificate installed",
+        "certInstallStatus": "Not-Installed",
+        "reachability": "unreachable",
+    }
+
+
+def _cluster_node(device_ip: str, persona: str, state: str = "ready") -> dict[str, Any]:
+    return {"configJson": {"uuid": _new_id(), "deviceIP": device_ip, "persona": persona,
+                           "state": state}}
+
+
+def _cookie(headers: Mapping[str, str], name: str) -> str | None:
+    for part in (headers.get("Cookie") or "").split(";"):
+        key, _, value = part.strip().partition("=")
+        if key == name:
+            return value
+    return None
+
+
+def _write_self_signed(directory: Path) -> tuple[Path, Path]:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "fake-manager.local")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=30))
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "cert.pem", directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    return cert_path, key_path
+
+
+def _make_handler(manager: FakeManager) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            self._dispatch()
+
+        def do_POST(self) -> None:
+            self._dispatch()
+
+        def do_PUT(self) -> None:
+            self._dispatch()
+
+        def _dispatch(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            try:
+                reply = manager.handle(self.command, self.path, self.headers, body)
+            except Exception as e:
+                log.exception("Fake Manager handler failed for %s %s", self.command, self.path)
+                reply = _Reply(500, {"error": {"message": str(e)}})
+            if reply.text is not None:
+                payload, content_type = reply.text.encode(), "text/html"
+            elif reply.body is not None:
+                payload, content_type = json.dumps(reply.body).encode(), "application/json"
+            else:
+                payload, content_type = b"", "application/json"
+            self.send_response(reply.status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            for key, value in reply.headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            log.debug("fake manager: " + format, *args)
+
+    return Handler
+
+
+def main(
+    port: Annotated[int, typer.Option(help="Port to listen on")] = 8443,
+    host: Annotated[str, typer.Option(help="Address to bind")] = "127.0.0.1",
+    password: Annotated[str, typer.Option(help="Password for the admin user")] = "fake-password",
+    edges: Annotated[int, typer.Option(help="Number of C8000V UUIDs to pre-load")] = 20,
+    latency: Annotated[float, typer.Option(help="Seconds added to every response")] = 0.0,
+    task_duration: Annotated[float, typer.Option(help="Seconds each action task runs")] = 0.0,
+) -> None:
+    """Serve a fake SD-WAN Manager until interrupted."""
+    fake = FakeManager(
+        password=password, edge_count=edges, latency={"*": latency},
+        task_duration=task_duration, host=host, port=port,
+    )
+    with fake:
+        typer.echo(f"Fake SD-WAN Manager on https://{host}:{fake.port} (admin / {password})")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,137 @@
+"""Lookup of CML labs by title and Manager address from one lab listing.
+
+Finding the lab of a Manager used to join every lab on the controller and read its notes,
+a couple of requests per lab on a shared CML. The lab tiles listing returns the title
+(and, on current releases, the notes) of every lab in one response. A LabIndex maps titles
+and manager_external_ip markers to lab IDs from it, and is kept per CML host and user for
+MAX_AGE seconds so lookups close together share one listing. A lookup that comes up empty,
+or names a lab that is gone, on a cached index re-reads the listing before giving up.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from virl2_client import ClientLibrary
+from virl2_client.exceptions import LabNotFound
+from virl2_client.models.lab import Lab
+
+log = logging.getLogger(__name__)
+
+MANAGER_NOTE_RE = re.compile(r"manager_external_ip\s*=\s*(.+):(\d+)")
+
+MAX_AGE = 30
+
+_lock = threading.Lock()
+_cached: dict[tuple[str, str], "LabIndex"] = {}
+
+
+@dataclass(frozen=True)
+class LabEntry:
+    id: str
+    title: str
+    # None when the listing doesn't include notes (older CML releases)
+    notes: str | None
+
+
+class LabIndex:
+    def __init__(self, cml: ClientLibrary, entries: list[LabEntry]) -> None:
+        self._cml = cml
+        self.loaded = time.monotonic()
+        self._by_title: dict[str, list[str]] = {}
+        for entry in entries:
+            self._by_title.setdefault(entry.title, []).append(entry.id)
+        self._entries = {entry.id: entry for entry in entries}
+        self._managers: dict[str, tuple[str, int]] | None = None
+
+    @classmethod
+    def load(cls, cml: ClientLibrary) -> "LabIndex":
+        return cls(cml, [
+            LabEntry(lab_id, tile.get("lab_title", ""), tile.get("lab_notes"))
+            for lab_id, tile in _lab_tiles(cml).items()
+        ])
+
+    def ids_by_title(self, title: str) -> list[str]:
+        return list(self._by_title.get(title, []))
+
+    def ids_by_manager(self, ip: str, port: int | None = None) -> list[str]:
+        """Labs whose notes name Manager ip (and port, if given)."""
+        if self._managers is None:
+            self._managers = {}
+            for entry in self._entries.values():
+                if m := MANAGER_NOTE_RE.search(self._notes(entry)):
+                    self._managers[entry.id] = (m.group(1), int(m.group(2)))
+        return [
+            lab_id for lab_id, (lab_ip, lab_port) in self._managers.items()
+            if lab_ip == ip and port in (None, lab_port)
+        ]
+
+    def title(self, lab_id: str) -> str:
+        return self._entries[lab_id].title
+
+    def _notes(self, entry: LabEntry) -> str:
+        if entry.notes is not None:
+            return entry.notes
+        try:
+            return self._cml.join_existing_lab(entry.id).notes or ""
+        except LabNotFound:
+            return ""
+
+
+def labs_by_title(cml: ClientLibrary, title: str) -> list[Lab]:
+    return _lookup(cml, lambda index: index.ids_by_title(title))
+
+
+def labs_by_manager(cml: ClientLibrary, ip: str, port: int | None = None) -> list[Lab]:
+    return _lookup(cml, lambda index: index.ids_by_manager(ip, port))
+
+
+def invalidate(cml: ClientLibrary) -> None:
+    """Drop the cached listing after creating or removing a lab."""
+    with _lock:
+        _cached.pop(_key(cml), None)
+
+
+def _lookup(cml: ClientLibrary, find: Callable[[LabIndex], list[str]]) -> list[Lab]:
+    index, cached = _index(cml)
+    ids = find(index)
+    if cached:
+        try:
+            if ids:
+                return [cml.join_existing_lab(lab_id) for lab_id in ids]
+        except LabNotFound:
+            pass
+        log.debug("Cached CML lab listing out of date, reloading")
+        index = _reload(cml)
+        ids = find(index)
+    return [cml.join_existing_lab(lab_id) for lab_id in ids]
+
+
+def _index(cml: ClientLibrary) -> tuple[LabIndex, bool]:
+    with _lock:
+        index = _cached.get(_key(cml))
+    if index is not None and time.monotonic() - index.loaded <= MAX_AGE:
+        return index, True
+    return _reload(cml), False
+
+
+def _reload(cml: ClientLibrary) -> LabIndex:
+    index = LabIndex.load(cml)
+    with _lock:
+        _cached[_key(cml)] = index
+    return index
+
+
+def _key(cml: ClientLibrary) -> tuple[str, str]:
+    return str(cml.url), str(cml.username)
+
+
+def _lab_tiles(cml: ClientLibrary) -> dict[str, dict[str, Any]]:
+    # virl2_client has no public call for the tiles listing; keep its internals to this one place
+    resp = cml._session.get(cml._url_for("populate_lab_tiles")).json()
+    # CML before 2.1 returns the tiles without the wrapping key
+    return resp.get("lab_tiles", resp)
@@ -0,0 +1,69 @@
+"""One read of a CML lab's nodes, indexed for the lookups the add commands make.
+
+Every ``lab.nodes()`` call can make virl2 sync the topology, and the add flows used to
+scan it for each label lookup, placement and numbering decision, once per new node.
+A LabSnapshot reads the node list and each node's label, definition and position once,
+and nodes created during the operation are recorded with add() so the indexes stay
+current without another scan.
+"""
+
+import re
+
+from virl2_client.models.lab import Lab
+from virl2_client.models.node import Node
+
+
+class LabSnapshot:
+    def __init__(self, lab: Lab) -> None:
+        self.lab = lab
+        self._by_label: dict[str, Node] = {}
+        self._by_definition: dict[str, list[Node]] = {}
+        self._positions: list[tuple[str, float, float]] = []
+        self._row_ends: dict[float, float | None] = {}
+        self._max_nums: dict[re.Pattern[str], int] = {}
+        for node in lab.nodes():
+            self._index(node, node.x, node.y)
+
+    def add(self, node: Node, *, x: float, y: float) -> None:
+        """Record a node created with lab.create_node at x, y."""
+        self._index(node, x, y)
+
+    def node(self, label: str, definition: str | None = None) -> Node | None:
+        node = self._by_label.get(label)
+        if node is None or definition is None:
+            return node
+        return node if any(n is node for n in self._by_definition.get(definition, [])) else None
+
+    def nodes(self, *definitions: str) -> list[Node]:
+        return [n for d in definitions for n in self._by_definition.get(d, [])]
+
+    def positions(self, *definitions: str) -> list[tuple[float, float]]:
+        return [(x, y) for d, x, y in self._positions if d in definitions]
+
+    def row_end(self, y: float) -> float | None:
+        """Largest x of the nodes in row y."""
+        if y not in self._row_ends:
+            self._row_ends[y] = max((nx for _, nx, ny in self._positions if ny == y), default=None)
+        return self._row_ends[y]
+
+    def max_num(self, num_re: re.Pattern[str]) -> int:
+        """Largest number captured by num_re's first group from a node label, or 0."""
+        if num_re not in self._max_nums:
+            self._max_nums[num_re] = max(
+                (int(m.group(1)) for label in self._by_label if (m := num_re.match(label))),
+                default=0,
+            )
+        return self._max_nums[num_re]
+
+    def _index(self, node: Node, x: float, y: float) -> None:
+        label = node.label
+        self._by_label.setdefault(label, node)
+        definition = node.node_definition
+        self._by_definition.setdefault(definition, []).append(node)
+        self._positions.append((definition, x, y))
+        if y in self._row_ends:
+            end = self._row_ends[y]
+            self._row_ends[y] = x if end is None else max(end, x)
+        for num_re in self._max_nums:
+            if m := num_re.match(label):
+                self._max_nums[num_re] = max(self._max_nums[num_re], int(m.group(1)))
@@ -1,12 +1,31 @@
+import codecs
+import json
 import logging
+import queue
+import re
+import secrets
+import threading
 import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Literal
+from typing import Any, Literal, TypeVar
 
 import requests
 import urllib3
 from requests import Response, Session
 
+from catalyst_sdwan_lab import api_stats, session_cache
+from catalyst_sdwan_lab.bootstrap_cache import BootstrapCache
+from catalyst_sdwan_lab.polling import Backoff, poll
+from catalyst_sdwan_lab.rate_limit import (
+    DEFAULT_LIMITS,
+    OVERLOAD_STATUSES,
+    Limits,
+    RequestGovernor,
+)
+
 urllib3.disable_warnings()
 
 log = logging.getLogger(__name__)
@@ -16,17 +35,173 @@ class ManagerAPIError(Exception):
     pass
 
 
+class FanOutError(ManagerAPIError):
+    """Some calls of a ManagerClient.fan_out failed; errors maps each failed item to why."""
+
+    def __init__(self, errors: dict[str, Exception], total: int) -> None:
+        super().__init__(
+            f"{len(errors)} of {total} failed: "
+            + "; ".join(f"{item}: {e}" for item, e in errors.items())
+        )
+        self.errors = errors
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+_CONTROLLERS = "/dataservice/system/device/controllers"
+_VEDGES = "/dataservice/system/device/vedges"
+_CONFIG_GROUPS = "/dataservice/v1/config-group"
+_EVENTS = "/dataservice/event"
+
+_STREAM_CHUNK = 64 * 1024
+_UPLOAD_CHUNK = 256 * 1024
+# the Manager parses an upload before answering; allow it this rate, and at least
+# _UPLOAD_MIN_TIMEOUT_S, between the last byte sent and the response
+_UPLOAD_PROCESS_RATE = 256 * 1024
+_UPLOAD_MIN_TIMEOUT_S = 60
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Read-mostly inventory endpoints and how long (s) a response may be reused.
+# Device inventories are polled by the device watcher no faster than its 2 s backoff
+# floor; their TTL stays below that so every poll round reaches the Manager, while
+# back-to-back reads and parallel signing threads still share one response. Config
+# groups are never polled.
+INVENTORY_CACHE_TTLS: dict[str, float] = {
+    _CONTROLLERS: 1,
+    _VEDGES: 1,
+    _CONFIG_GROUPS: 30,
+}
+
+# Path prefix of a mutating call -> cached endpoints whose content it changes
+_CACHE_INVALIDATIONS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("/dataservice/system/device", (_CONTROLLERS, _VEDGES)),
+    ("/dataservice/certificate/", (_CONTROLLERS, _VEDGES)),
+    ("/dataservice/v1/config-group", (_CONFIG_GROUPS, _VEDGES)),
+    ("/dataservice/v1/packages/import", (_CONFIG_GROUPS,)),
+    ("/dataservice/v1/control-component", (_CONTROLLERS,)),
+    ("/dataservice/template/device", (_CONTROLLERS,)),
+    ("/dataservice/clusterManagement", (_CONTROLLERS,)),
+)
+
+
+class _InFlight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+_TASK_BACKOFF = Backoff(floor=1, ceiling=5)
+# bootstrap generation is CPU-heavy on the Manager; keep concurrent requests modest
+_BOOTSTRAP_WORKERS = 4
+_TEMPLATE_WORKERS = 4
+_FAN_OUT_WORKERS = 8
+_BOOTSTRAP_RETRIES = 3
+_BOOTSTRAP_BACKOFF = Backoff(floor=2, ceiling=10)
+# 429/503 replays; without Retry-After the budget pauses for the backoff interval
+_OVERLOAD_RETRIES = 3
+_OVERLOAD_BACKOFF = Backoff(floor=1, ceiling=10)
+_MAX_RETRY_AFTER_S = 60
+
+
+class _WorkerSession:
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        # login epoch the cookies/token were copied from; -1 forces a sync on first use
+        self.epoch = -1
+
+
+def _new_session() -> Session:
+    session = requests.Session()
+    session.verify = False
+    session.hooks["response"].append(api_stats.recorder.record_response)
+    return session
+
+
 class ManagerClient:
     _TIMEOUT = 30
+    _MAX_WORKER_SESSIONS = 8
 
-    def __init__(self, host: str, port: int, username: str, password: str) -> None:
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        *,
+        cache_ttls: Mapping[str, float] | None = None,
+        max_worker_sessions: int = _MAX_WORKER_SESSIONS,
+        limits: Mapping[str, Limits] = DEFAULT_LIMITS,
+    ) -> None:
         self._base = f"https://{host}:{port}"
+        self._governor = RequestGovernor(limits)
+        self._session_key = (host, port, username)
         self._username = username
         self._password = password
-        self._session: Session = requests.Session()
-        self._session.verify = False
+        self._session: Session = _new_session()
+        self._cache_ttls: Mapping[str, float] = cache_ttls or {}
+        self._cache: dict[str, tuple[float, Any]] = {}
+        self._cache_generation = 0
+        self._inflight: dict[str, _InFlight] = {}
+        self._cache_lock = threading.Lock()
+        self._session_epoch = 0
+        self._login_lock = threading.Lock()
+        self._local = threading.local()
+        self._worker_slots = threading.BoundedSemaphore(max_worker_sessions)
+        self._idle_workers: queue.LifoQueue[_WorkerSession] = queue.LifoQueue()
+
+    @property
+    def base_url(self) -> str:
+        return self._base
+
+    @contextmanager
+    def worker_session(self) -> Iterator[None]:
+        """Send this thread's requests over a private session cloned from the login session.
+
+        requests.Session is not thread-safe, so threads fanning out Manager calls should each
+        hold one. At most max_worker_sessions are checked out at once; further callers block.
+        """
+        if getattr(self._local, "worker", None) is not None:
+            yield
+            return
+        with self._worker_slots:
+            try:
+                worker = self._idle_workers.get_nowait()
+            except queue.Empty:
+                worker = _WorkerSession(_new_session())
+            self._local.worker = worker
+            try:
+                yield
+            finally:
+                self._local.worker = None
+                self._idle_workers.put(worker)
+
+    @contextmanager
+    def idle_worker(self) -> Iterator[None]:
+        """Give this thread's worker slot back while it blocks without calling the Manager.
+
+        The thread keeps its session and takes a slot again before the block ends, so
+        threads waiting on one another don't starve the thread doing the requests.
+        """
+        worker = getattr(self._local, "worker", None)
+        if worker is None:
+            yield
+            return
+        self._local.worker = None
+        self._worker_slots.release()
+        try:
+            yield
+        finally:
+            self._worker_slots.acquire()
+            self._local.worker = worker
 
     def login(self) -> None:
+        """Log in, or resume the cached session for this host and user if the cache is enabled."""
+        if self._resume_cached_session():
+            self._session_epoch += 1
+            return
         response = self._session.post(
             f"{self._base}/j_security_check",
             data={"j_username": self._username, "j_password": self._password},
@@ -40,6 +215,30 @@ class ManagerClient:
         if token.status_code != 200 or "<html>" in token.text:
             raise ManagerAPIError("Failed to obtain XSRF token")
         self._session.headers["x-xsrf-token"] = token.text
+        self._session_epoch += 1
+        self._save_session()
+
+    def _resume_cached_session(self) -> bool:
+        cached = session_cache.store.load(*self._session_key)
+        if cached is None:
+            return False
+        for name, value in cached.cookies.items():
+            self._session.cookies.set(name, value)
+        # an expired session gets the login page instead of a token
+        token = self._session.get(f"{self._base}/dataservice/client/token", timeout=self._TIMEOUT)
+        if token.status_code != 200 or "<html" in token.text.lower():
+            log.debug("Cached SD-WAN Manager session rejected — logging in")
+            session_cache.store.discard(*self._session_key)
+            self._session.cookies.clear()
+            return False
+        log.debug("Resumed cached SD-WAN Manager session")
+        self._session.headers["x-xsrf-token"] = token.text
+        return True
+
+    def _save_session(self) -> None:
+        token = self._session.headers.get("x-xsrf-token")
+        if token:
+            session_cache.store.save(*self._session_key, self._session.cookies.get_dict(), token)
 
     def get_organization(self) -> str | None:
         data = self._get("/dataservice/settings/configuration/organization").get("data", [])
@@ -111,10 +310,10 @@ class ManagerClient:
         return self._post("/dataservice/settings/services/account/register", {})
 
     def poll_cisco_account_token(self, user_code: str) -> bool:
-        response = self._session.post(
-            f"{self._base}/dataservice/settings/services/account/register/token?userCode={user_code}",
+        response = self._request(
+            "POST",
+            f"/dataservice/settings/services/account/register/token?userCode={user_code}",
             json=["pnp"],
-            timeout=self._TIMEOUT,
         )
         return response.ok
 
@@ -169,10 +368,20 @@ class ManagerClient:
     def get_device_templates(self) -> list[dict[str, Any]]:
         return self._get("/dataservice/template/device").get("data", [])
 
+    def get_feature_templates(self) -> list[dict[str, Any]]:
+        return self._get("/dataservice/template/feature").get("data", [])
+
     def create_feature_template(self, data: dict[str, Any]) -> str:
         result = self._post("/dataservice/template/feature", data)
         return result["templateId"]
 
+    def create_feature_templates(self, bodies: list[dict[str, Any]]) -> list[str]:
+        """Create independent feature templates several at a time; IDs in input order."""
+        return fan_out(
+            self, self.create_feature_template, bodies, workers=_TEMPLATE_WORKERS,
+            key=lambda body: str(body.get("templateName")),
+        )
+
     def create_device_template(self, data: dict[str, Any]) -> str:
         result = self._post("/dataservice/template/device/feature", data)
         return result["templateId"]
@@ -191,10 +400,41 @@ class ManagerClient:
         return self._post("/dataservice/template/device/config/attachfeature", payload)["id"]
 
     def get_config_groups(self) -> list[dict[str, Any]]:
-        return self._get("/dataservice/v1/config-group")
+        return self._get(_CONFIG_GROUPS)
 
     def get_vedges(self) -> list[dict[str, Any]]:
-        return self._get("/dataservice/system/device/vedges").get("data", [])
+        return self._get(_VEDGES).get("data", [])
+
+    def iter_vedges(
+        self,
+        *,
+        model: str | None = None,
+        uuids: Iterable[str] | None = None,
+        states: Iterable[str] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream the edge inventory in one request, letting the Manager filter by model and state.
+
+        Devices are parsed one at a time off the response, so memory follows what matches
+        rather than the size of the serial file. states are vedgeCertificateState values
+        (tokengenerated, bootstrapconfiggenerated, certinstalled, ...). The endpoint takes
+        no UUID set, so uuids are only filtered here; model and states are re-applied
+        locally because releases that don't know a query parameter ignore it.
+        """
+        wanted = None if uuids is None else set(uuids)
+        in_states = None if states is None else set(states)
+        params: dict[str, str | list[str]] = {}
+        if model:
+            params["model"] = model
+        if in_states is not None:
+            params["state"] = sorted(in_states)
+        for v in self._stream(_VEDGES, params):
+            if model and v.get("deviceModel") != model:
+                continue
+            if wanted is not None and v.get("uuid") not in wanted:
+                continue
+            if in_states is not None and v.get("vedgeCertificateState") not in in_states:
+                continue
+            yield v
 
     def get_vedge_otps(self) -> dict[str, str]:
         data = self._get("/dataservice/certificate/vedge/list").get("data", [])
@@ -205,13 +445,52 @@ class ManagerClient:
         }
 
     def get_bootstrap_config(self, uuid: str, *, wanif: str | None = None) -> str:
-        url = (
-            f"/dataservice/system/device/bootstrap/device/{uuid}"
-            "?configtype=cloudinit&inclDefRootCert=false&version=v1"
-        )
-        if wanif:
-            url += f"&wanif={wanif}"
-        return self._get(url)["bootstrapConfig"]
+        return self._get(_bootstrap_config_path(uuid, wanif))["bootstrapConfig"]
+
+    def get_bootstrap_configs(
+        self,
+        uuids: list[str],
+        *,
+        wanif: str | None = None,
+        cache: BootstrapCache | None = None,
+        version: str = "",
+    ) -> dict[str, str]:
+        """Fetch bootstrap configs for a batch of devices, several at a time.
+
+        Each device is retried on its own. With a cache, configs rendered from the same
+        config group version are reused instead of generated again.
+        """
+        configs: dict[str, str] = {}
+        missing: list[str] = []
+        for uuid in uuids:
+            cached = cache.get(uuid, wanif, version) if cache else None
+            if cached is None:
+                missing.append(uuid)
+            else:
+                configs[uuid] = cached
+        if configs:
+            log.info("Reusing %d cached bootstrap config(s)", len(configs))
+
+        def fetch(uuid: str) -> str:
+            config = self._get_bootstrap_config_retrying(uuid, wanif)
+            if cache:
+                cache.put(uuid, wanif, version, config)
+            return config
+
+        configs.update(zip(missing, fan_out(self, fetch, missing, workers=_BOOTSTRAP_WORKERS)))
+        return {uuid: configs[uuid] for uuid in uuids}
+
+    def _get_bootstrap_config_retrying(self, uuid: str, wanif: str | None) -> str:
+        attempt = 0
+        while True:
+            try:
+                return self.get_bootstrap_config(uuid, wanif=wanif)
+            except (ManagerAPIError, requests.exceptions.RequestException) as e:
+                attempt += 1
+                if attempt >= _BOOTSTRAP_RETRIES:
+                    raise ManagerAPIError(f"Bootstrap config for {uuid} failed: {e}") from e
+                log.debug("Bootstrap config for %s failed, retrying: %s", uuid, e)
+                time.sleep(_BOOTSTRAP_BACKOFF.interval(attempt - 1))
 
     def associate_config_group(self, config_group_id: str, uuids: list[str]) -> None:
         self._put(
@@ -245,18 +524,31 @@ class ManagerClient:
             raise ManagerAPIError("deploy_config_group: missing parentTaskId in response")
         return data["parentTaskId"]
 
-    def import_configuration(self, path: Path) -> str:
-        with open(path, "rb") as f:
-            response = self._session.post(
-                f"{self._base}/dataservice/v1/packages/import",
-                files={"file": (path.name, f, "application/octet-stream")},
-                timeout=60,
-            )
+    def import_configuration(
+        self, path: Path, *, on_progress: Callable[[int, int], None] | None = None
+    ) -> str:
+        """on_progress(sent, total) is called with the file bytes sent so far."""
+        response = self._upload(
+            "/dataservice/v1/packages/import", _MultipartFile(path, on_progress=on_progress)
+        )
         self._raise_for_status(response)
         return response.json()["taskId"]
 
-    def get_controllers(self) -> list[dict[str, Any]]:
-        return self._get("/dataservice/system/device/controllers").get("data", [])
+    def get_controllers(self, *, fresh: bool = False) -> list[dict[str, Any]]:
+        """fresh skips the inventory cache, for reads prompted by a change the Manager made."""
+        return self._get(_CONTROLLERS, fresh=fresh).get("data", [])
+
+    def get_events(self, since: float, names: Iterable[str]) -> list[dict[str, Any]]:
+        """Events logged after since (epoch seconds, second resolution) named in names."""
+        query = {"query": {"condition": "AND", "rules": [
+            {"field": "entry_time", "type": "date", "operator": "greater",
+             "value": [time.strftime("%Y-%m-%dT%H:%M:%S UTC", time.gmtime(since))]},
+            {"field": "eventname", "type": "string", "operator": "in", "value": sorted(names)},
+        ]}}
+        # a query, not a write: skip _post so the GET cache is not invalidated
+        response = self._request("POST", _EVENTS, json=query)
+        self._raise_for_status(response)
+        return response.json().get("data", [])
 
     def configure_control_component_network_settings(self, payload: dict[str, Any]) -> None:
         self._post("/dataservice/v1/control-component/network-settings", payload)
@@ -331,9 +623,11 @@ class ManagerClient:
         retries: int = 120, interval: int = 30,
     ) -> None:
         """Blocks until the POST succeeds (200 OK), retrying on VCC0001 (node API not yet ready)."""
-        for _ in range(retries):
-            response = self._session.post(
-                f"{self._base}/dataservice/clusterManagement/setup/",
+
+        def added() -> bool:
+            response = self._request(
+                "POST",
+                "/dataservice/clusterManagement/setup/",
                 json={
                     "persona": persona,
                     "deviceIP": cluster_ip,
@@ -342,21 +636,24 @@ class ManagerClient:
                     "genCSR": False,
                     "services": {"sd-avc": {"server": False}},
                 },
-                timeout=self._TIMEOUT,
             )
             if response.ok:
-                return
+                self._invalidate("/dataservice/clusterManagement/setup/")
+                return True
             try:
                 code = response.json().get("error", {}).get("code", "")
             except Exception:
                 code = ""
             if response.status_code == 400 and code == "VCC0001":
-                time.sleep(interval)
-                continue
+                return False
             raise ManagerAPIError(f"HTTP {response.status_code}: {response.text[:200]}")
-        raise ManagerAPIError(
-            f"Cluster node {cluster_ip} did not become reachable after {retries * interval}s."
-        )
+
+        timeout = retries * interval
+        backoff = Backoff(floor=min(5, interval), ceiling=interval)
+        if not poll(added, timeout=timeout, backoff=backoff, label="Cluster node API"):
+            raise ManagerAPIError(
+                f"Cluster node {cluster_ip} did not become reachable after {timeout}s."
+            )
 
     def rediscover_devices(self, devices: list[dict[str, Any]]) -> None:
         self._post(
@@ -385,63 +682,407 @@ class ManagerClient:
         return entry["deviceCSR"], entry["uuid"]
 
     def install_signed_cert(self, cert_pem: str) -> str:
-        response = self._session.post(
-            f"{self._base}/dataservice/certificate/install/signedCert",
-            data=cert_pem,
-            timeout=120,
+        response = self._request(
+            "POST", "/dataservice/certificate/install/signedCert", data=cert_pem, timeout=120
         )
+        self._invalidate("/dataservice/certificate/install/signedCert")
         self._raise_for_status(response)
         return response.json()["id"]
 
     def wait_for_task(self, task_id: str, timeout: int = 300) -> None:
-        deadline = time.time() + timeout
-        while time.time() < deadline:
-            data = self._get(f"/dataservice/device/action/status/{task_id}")
-            status = data.get("summary", {}).get("status", "")
-            if status == "done":
-                count = data.get("summary", {}).get("count", {})
-                log.debug("Task %s done: %s", task_id, count)
-                if count.get("Failure", 0) > 0:
-                    raise ManagerAPIError(f"Task {task_id} completed with failures")
-                return
-            time.sleep(5)
-        raise ManagerAPIError(f"Task {task_id} timed out after {timeout}s")
-
-    def upload_serial_file(self, path: Path) -> None:
-        with open(path, "rb") as f:
-            response = self._session.post(
-                f"{self._base}/dataservice/system/device/fileupload",
-                files={"file": (path.name, f)},
-                data={"validity": "valid", "upload": True},
-                timeout=60,
-            )
-        self._raise_for_status(response)
+        def done() -> bool:
+            return _task_done(task_id, self._get(f"/dataservice/device/action/status/{task_id}"))
+
+        if not poll(done, timeout=timeout, backoff=_TASK_BACKOFF, label="Manager task"):
+            raise ManagerAPIError(f"Task {task_id} timed out after {timeout}s")
+
+    def upload_serial_file(
+        self, path: Path, *, on_progress: Callable[[int, int], None] | None = None
+    ) -> None:
+        body = _MultipartFile(
+            path, fields={"validity": "valid", "upload": "True"}, on_progress=on_progress
+        )
+        self._raise_for_status(self._upload("/dataservice/system/device/fileupload", body))
 
     def logout(self) -> None:
+        """End the session, or with the session cache enabled, keep it for the next run."""
         try:
-            self._session.get(f"{self._base}/logout", timeout=self._TIMEOUT)
+            if session_cache.store.enabled:
+                self._save_session()
+            else:
+                self._session.get(f"{self._base}/logout", timeout=self._TIMEOUT)
         except requests.exceptions.RequestException:
             pass
         finally:
             self._session.close()
+            while not self._idle_workers.empty():
+                self._idle_workers.get_nowait().session.close()
+
+    def _get(self, path: str, *, fresh: bool = False) -> Any:
+        ttl = self._cache_ttls.get(path)
+        if ttl is None or fresh:
+            return self._fetch(path)
+        return self._get_cached(path, ttl)
+
+    def _get_cached(self, path: str, ttl: float) -> Any:
+        """Serve path from the TTL cache, sharing one request between concurrent callers.
+
+        Cached responses are shared between callers and must be treated as read-only.
+        """
+        with self._cache_lock:
+            entry = self._cache.get(path)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            generation = self._cache_generation
+            pending = self._inflight.get(path)
+            owner = pending is None
+            if pending is None:
+                pending = self._inflight[path] = _InFlight()
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
 
-    def _get(self, path: str) -> Any:
-        response = self._session.get(f"{self._base}{path}", timeout=self._TIMEOUT)
+        try:
+            pending.result = self._fetch(path)
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._cache_lock:
+                del self._inflight[path]
+                # a write that landed while we were fetching makes this response stale
+                if pending.error is None and generation == self._cache_generation:
+                    self._cache[path] = (time.monotonic() + ttl, pending.result)
+            pending.done.set()
+        return pending.result
+
+    def _invalidate(self, mutated_path: str) -> None:
+        if not self._cache_ttls:
+            return
+        with self._cache_lock:
+            self._cache_generation += 1
+            for prefix, paths in _CACHE_INVALIDATIONS:
+                if mutated_path.startswith(prefix):
+                    for cached in paths:
+                        self._cache.pop(cached, None)
+
+    def _fetch(self, path: str) -> Any:
+        response = self._request("GET", path)
         self._raise_for_status(response)
         return response.json()
 
+    def _stream(self, path: str, params: Mapping[str, str | list[str]]) -> Iterator[Any]:
+        """GET path and yield the items of its top-level ``data`` array as they arrive."""
+        with self._request("GET", path, params=params, stream=True) as response:
+            self._raise_for_status(response)
+            yield from _iter_data(response.iter_content(_STREAM_CHUNK))
+
     def _post(self, path: str, body: Any = None, *, timeout: int | None = None) -> Any:
-        response = self._session.post(
-            f"{self._base}{path}", json=body, timeout=timeout or self._TIMEOUT
-        )
+        response = self._request("POST", path, json=body, timeout=timeout or self._TIMEOUT)
+        self._invalidate(path)
         self._raise_for_status(response)
         return response.json() if response.text else None
 
+    def _upload(self, path: str, body: "_MultipartFile") -> Response:
+        """POST body streamed from disk, with a read timeout that grows with the file."""
+        response = self._request(
+            "POST",
+            path,
+            data=body,
+            headers={"Content-Type": body.content_type},
+            timeout=(self._TIMEOUT, max(_UPLOAD_MIN_TIMEOUT_S, body.size / _UPLOAD_PROCESS_RATE)),
+        )
+        self._invalidate(path)
+        return response
+
     def _put(self, path: str, body: Any) -> Any:
-        response = self._session.put(f"{self._base}{path}", json=body, timeout=self._TIMEOUT)
+        response = self._request("PUT", path, json=body)
+        self._invalidate(path)
         self._raise_for_status(response)
         return response.json() if response.text else None
 
+    def _request(self, method: str, path: str, **kwargs: Any) -> Response:
+        """Send a request, logging in again and replaying it once if the session expired."""
+        kwargs.setdefault("timeout", self._TIMEOUT)
+        epoch = self._session_epoch
+        response = self._send(method, path, **kwargs)
+        streamed = kwargs.get("stream", False)
+        if not _session_expired(response, streamed=streamed):
+            return response
+        if streamed:
+            response.close()
+        log.info("SD-WAN Manager session expired — logging in again")
+        api_stats.recorder.record_retry(method, path)
+        self._renew_session(epoch)
+        return self._send(method, path, **kwargs)
+
+    def _send(self, method: str, path: str, **kwargs: Any) -> Response:
+        """Send within the request budgets, waiting out and replaying 429/503 responses."""
+        attempt = 0
+        while True:
+            budgets = self._governor.acquire(path)
+            started = time.monotonic()
+            try:
+                response = self._thread_session().request(
+                    method, f"{self._base}{path}", **kwargs
+                )
+            except requests.exceptions.RequestException:
+                elapsed = time.monotonic() - started
+                self._governor.release(budgets, path, 0, elapsed)
+                # responses are recorded by the session hook; failed exchanges have none
+                api_stats.recorder.record(method, path, 0, elapsed)
+                raise
+            self._governor.release(
+                budgets, path, response.status_code, time.monotonic() - started
+            )
+            if response.status_code not in OVERLOAD_STATUSES or attempt == _OVERLOAD_RETRIES:
+                return response
+            delay = _retry_after(response)
+            if delay is None:
+                delay = _OVERLOAD_BACKOFF.interval(attempt)
+            log.info(
+                "SD-WAN Manager busy (HTTP %d) — retrying %s in %.0fs",
+                response.status_code, path, delay,
+            )
+            api_stats.recorder.record_retry(method, path)
+            for budget in budgets:
+                budget.pause(delay)
+            if kwargs.get("stream"):
+                response.close()
+            attempt += 1
+
+    def _thread_session(self) -> Session:
+        worker: _WorkerSession | None = getattr(self._local, "worker", None)
+        if worker is None:
+            return self._session
+        if worker.epoch != self._session_epoch:
+            with self._login_lock:
+                worker.session.cookies = self._session.cookies.copy()
+                worker.session.headers.pop("x-xsrf-token", None)
+                token = self._session.headers.get("x-xsrf-token")
+                if token:
+                    worker.session.headers["x-xsrf-token"] = token
+                worker.epoch = self._session_epoch
+        return worker.session
+
+    def _renew_session(self, epoch: int) -> None:
+        with self._login_lock:
+            # another thread already logged in again since this request was sent
+            if epoch != self._session_epoch:
+                return
+            self._session.cookies.clear()
+            self._session.headers.pop("x-xsrf-token", None)
+            session_cache.store.discard(*self._session_key)
+            self.login()
+
     def _raise_for_status(self, response: Response) -> None:
         if not response.ok:
             raise ManagerAPIError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+
+def _session_expired(response: Response, *, streamed: bool = False) -> bool:
+    if response.status_code in (401, 403):
+        return True
+    if not response.ok:
+        return False
+    # an expired JSESSIONID is redirected to the login page, which comes back as 200 text/html
+    if streamed:
+        # reading the body here would defeat streaming it
+        return response.headers.get("Content-Type", "").startswith("text/html")
+    return response.text.lstrip()[:15].lower().startswith(("<html", "<!doctype html"))
+
+
+def _iter_data(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the items of the top-level ``data`` array of a JSON object read in chunks.
+
+    Other top-level keys (``header``) are parsed and dropped; only one item and one chunk
+    are held in memory at a time.
+    """
+    reader = _JsonReader(chunks)
+    reader.expect("{")
+    while not reader.accept("}"):
+        key = reader.value()
+        reader.expect(":")
+        if key == "data":
+            reader.expect("[")
+            while not reader.accept("]"):
+                yield reader.value()
+                reader.accept(",")
+        else:
+            reader.value()
+        reader.accept(",")
+
+
+class _JsonReader:
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def accept(self, token: str) -> bool:
+        self._skip_whitespace()
+        if self._buf.startswith(token, self._pos):
+            self._pos += len(token)
+            return True
+        return False
+
+    def expect(self, token: str) -> None:
+        if not self.accept(token):
+            raise ManagerAPIError(
+                f"Malformed JSON from SD-WAN Manager: expected {token!r} "
+                f"at {self._buf[self._pos:self._pos + 40]!r}"
+            )
+
+    def value(self) -> Any:
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if not self._fill():
+                    raise ManagerAPIError(f"Malformed JSON from SD-WAN Manager: {e}") from e
+                continue
+            # a number or literal that ends the buffer may continue in the next chunk
+            if end < len(self._buf) or not self._fill():
+                self._pos = end
+                return value
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            self._pos = _JSON_WHITESPACE.match(self._buf, self._pos).end()  # type: ignore[union-attr]
+            if self._pos < len(self._buf) or not self._fill():
+                return
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        # drop what has been consumed so the buffer stays about one chunk long
+        self._buf, self._pos = self._buf[self._pos:], 0
+        for chunk in self._chunks:
+            if chunk:
+                self._buf += self._utf8.decode(chunk)
+                return True
+        self._buf += self._utf8.decode(b"", final=True)
+        self._eof = True
+        return False
+
+
+def _retry_after(response: Response) -> float | None:
+    value = response.headers.get("Retry-After", "")
+    return min(float(value), _MAX_RETRY_AFTER_S) if value.isdigit() else None
+
+
+class _MultipartFile:
+    """A one-file multipart/form-data body read from disk in chunks as it is sent.
+
+    Every iteration starts again from the top of the file, so a replayed request (session
+    renewal, 429/503 retry) re-sends the whole body.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        fields: Mapping[str, str] | None = None,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> None:
+        self._path = path
+        self._on_progress = on_progress
+        self.size = path.stat().st_size
+        boundary = secrets.token_hex(16)
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        head = "".join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{k}"\r\n\r\n{v}\r\n'
+            for k, v in (fields or {}).items()
+        )
+        head += (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{path.name}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        )
+        self._head = head.encode()
+        self._tail = f"\r\n--{boundary}--\r\n".encode()
+
+    def __len__(self) -> int:
+        # lets requests send a Content-Length instead of a chunked body
+        return len(self._head) + self.size + len(self._tail)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self._head
+        sent = 0
+        with open(self._path, "rb") as f:
+            while chunk := f.read(_UPLOAD_CHUNK):
+                yield chunk
+                sent += len(chunk)
+                if self._on_progress:
+                    self._on_progress(sent, self.size)
+        yield self._tail
+
+
+def fan_out(
+    client: "ManagerClient",
+    call: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    workers: int = _FAN_OUT_WORKERS,
+    key: Callable[[T], str] = str,
+    on_done: Callable[[T], None] | None = None,
+) -> list[R]:
+    """Run call(item) for every item concurrently, each call on a client worker session.
+
+    Every item runs even when others fail; Manager and transport errors are raised
+    together afterwards as FanOutError, keyed by key(item); other exceptions propagate
+    as they are. on_done(item) is called from the worker thread after each successful
+    call. Results keep input order.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def run(item: T) -> R:
+        with client.worker_session():
+            result = call(item)
+        if on_done:
+            on_done(item)
+        return result
+
+    with ThreadPoolExecutor(min(len(items), workers)) as pool:
+        futures = [pool.submit(run, item) for item in items]
+    errors: dict[str, Exception] = {}
+    for item, future in zip(items, futures):
+        error = future.exception()
+        if error is None:
+            continue
+        if not isinstance(error, (ManagerAPIError, requests.exceptions.RequestException)):
+            raise error
+        errors[key(item)] = error
+    if errors:
+        raise FanOutError(errors, len(items))
+    return [f.result() for f in futures]
+
+
+def _bootstrap_config_path(uuid: str, wanif: str | None) -> str:
+    url = (
+        f"/dataservice/system/device/bootstrap/device/{uuid}"
+        "?configtype=cloudinit&inclDefRootCert=false&version=v1"
+    )
+    if wanif:
+        url += f"&wanif={wanif}"
+    return url
+
+
+def _task_done(task_id: str, data: dict[str, Any]) -> bool:
+    summary = data.get("summary", {})
+    if summary.get("status", "") != "done":
+        return False
+    count = summary.get("count", {})
+    log.debug("Task %s done: %s", task_id, count)
+    if count.get("Failure", 0) > 0:
+        raise ManagerAPIError(f"Task {task_id} completed with failures")
+    return True
@@ -0,0 +1,133 @@
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+from rich.console import Console
+from rich.table import Table
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Backoff:
+    """Poll interval schedule: start at floor, grow by factor per poll, cap at ceiling.
+
+    jitter spreads each interval by ±fraction so parallel waiters don't poll in lockstep.
+    """
+
+    floor: float
+    ceiling: float
+    factor: float = 1.5
+    jitter: float = 0.1
+
+    def interval(self, attempt: int) -> float:
+        base = min(self.ceiling, self.floor * self.factor**attempt)
+        return base * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+@dataclass
+class PollStats:
+    label: str
+    polls: int
+    waited_s: float
+    ready: bool
+    # time between the last negative poll and the positive one: the condition turned true
+    # somewhere in this window, so it bounds how late we noticed
+    overshoot_s: float
+
+
+class PollRecorder:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._waits: list[PollStats] = []
+
+    def add(self, stats: PollStats) -> None:
+        with self._lock:
+            self._waits.append(stats)
+
+    def snapshot(self) -> list[PollStats]:
+        with self._lock:
+            return list(self._waits)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._waits.clear()
+
+    def render(self, console: Console) -> None:
+        waits = self.snapshot()
+        if not waits:
+            return
+        by_label: dict[str, list[PollStats]] = {}
+        for w in waits:
+            by_label.setdefault(w.label, []).append(w)
+        table = Table(title="Polling waits")
+        table.add_column("Wait", style="cyan")
+        for column in ("Waits", "Timeouts", "Polls", "Waited s", "Max overshoot s"):
+            table.add_column(column, justify="right")
+        for label, group in sorted(
+            by_label.items(), key=lambda kv: sum(w.waited_s for w in kv[1]), reverse=True
+        ):
+            table.add_row(
+                label,
+                str(len(group)),
+                str(sum(not w.ready for w in group)),
+                str(sum(w.polls for w in group)),
+                f"{sum(w.waited_s for w in group):.1f}",
+                f"{max(w.overshoot_s for w in group):.1f}",
+            )
+        console.print(table)
+
+
+recorder = PollRecorder()
+
+
+def poll(
+    check: Callable[[], T | None],
+    *,
+    timeout: float,
+    backoff: Backoff | Callable[[int], float],
+    label: str,
+    retry_on: tuple[type[Exception], ...] = (),
+) -> T | None:
+    """Call check until it returns a truthy value or timeout seconds pass.
+
+    check always runs at least once, and once more at the deadline. Exceptions listed in
+    retry_on count as "not ready yet". backoff may also be a function of the attempt number
+    for schedules that adapt to what check observed. Returns check's value, or None on
+    timeout.
+    """
+    interval = backoff.interval if isinstance(backoff, Backoff) else backoff
+    started = time.monotonic()
+    deadline = started + timeout
+    last_miss = started
+    polls = 0
+    while True:
+        polls += 1
+        try:
+            result = check()
+        except retry_on as e:
+            log.debug("%s: not ready (%s)", label, e)
+            result = None
+        now = time.monotonic()
+        if result:
+            _record(label, polls, now - started, True, now - last_miss)
+            return result
+        last_miss = now
+        remaining = deadline - now
+        if remaining <= 0:
+            _record(label, polls, now - started, False, 0.0)
+            return None
+        time.sleep(min(interval(polls - 1), remaining))
+
+
+def _record(label: str, polls: int, waited: float, ready: bool, overshoot: float) -> None:
+    log.debug(
+        "%s: %s after %d poll(s), %.1fs", label, "ready" if ready else "timed out", polls, waited
+    )
+    recorder.add(PollStats(label, polls, waited, ready, overshoot if polls > 1 else 0.0))
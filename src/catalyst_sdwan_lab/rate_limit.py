@@ -0,0 +1,154 @@
+"""Client-side request budgets that keep parallel automation from overloading the Manager.
+
+Every Manager request takes a slot from the ``default`` budget, and heavy endpoints (CSR
+generation, config group deploy, package import) also from a budget of their own. A
+budget caps requests in flight and requests per second (token bucket). The in-flight cap
+adapts AIMD-style: it grows by one per window of successful responses and halves when the
+Manager answers 429/503 or responds much slower than its recent average for the same endpoint.
+Uploads take as long as their file does, so their reply time is not judged. A 429/503 with
+Retry-After also holds back new requests on that budget for the advertised time.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from catalyst_sdwan_lab.api_stats import normalize_path
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Limits:
+    max_in_flight: int
+    rate: float
+    burst: int = 1
+
+
+DEFAULT_LIMITS: Mapping[str, Limits] = {
+    "default": Limits(max_in_flight=8, rate=20, burst=8),
+    "csr": Limits(max_in_flight=2, rate=2),
+    "deploy": Limits(max_in_flight=1, rate=0.5),
+    "import": Limits(max_in_flight=1, rate=0.2),
+}
+
+HEAVY_ROUTES: tuple[tuple[re.Pattern[str], str], ...] = (
+    (re.compile(r"^/dataservice/certificate/generate/csr"), "csr"),
+    (re.compile(r"^/dataservice/v1/config-group/[^/]+/device/deploy"), "deploy"),
+    (re.compile(r"^/dataservice/v1/packages/import"), "import"),
+)
+
+# reply time scales with the uploaded file rather than with Manager load
+SIZE_BOUND_ROUTES = re.compile(r"^/dataservice/(system/device/fileupload|v1/packages/import)")
+
+OVERLOAD_STATUSES = frozenset({429, 503})
+# a response this many times slower than the running average of its endpoint (and at least
+# _SLOW_FLOOR_S) counts as a congestion signal
+_SLOW_FACTOR = 4.0
+_SLOW_FLOOR_S = 2.0
+_LATENCY_WEIGHT = 0.2
+# one multiplicative decrease per interval, so a burst of slow replies to requests that
+# were all sent before the first cut doesn't collapse the limit to 1
+_DECREASE_INTERVAL_S = 1.0
+
+
+class Budget:
+    def __init__(self, name: str, limits: Limits) -> None:
+        self.name = name
+        self.limits = limits
+        self.limit = float(limits.max_in_flight)
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._tokens = float(limits.burst)
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+        self._latency: dict[str, float] = {}
+        self._last_decrease = 0.0
+
+    def acquire(self) -> None:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    self._cond.wait(self._paused_until - now)
+                elif self._in_flight >= max(1, int(self.limit)):
+                    self._cond.wait()
+                elif self._tokens < 1:
+                    self._cond.wait((1 - self._tokens) / self.limits.rate)
+                else:
+                    self._tokens -= 1
+                    self._in_flight += 1
+                    return
+
+    def release(self, status: int, elapsed_s: float, route: str | None = "") -> None:
+        """status 0 means the request failed without a response.
+
+        elapsed_s is compared with the running average of route; None skips the comparison.
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if status in OVERLOAD_STATUSES or self._slow(route, elapsed_s):
+                self._decrease()
+            elif status:
+                self.limit = min(self.limits.max_in_flight, self.limit + 1 / self.limit)
+            if route is not None and status and status not in OVERLOAD_STATUSES:
+                latency = self._latency.get(route)
+                self._latency[route] = (
+                    elapsed_s if latency is None
+                    else (1 - _LATENCY_WEIGHT) * latency + _LATENCY_WEIGHT * elapsed_s
+                )
+            self._cond.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.limits.burst, self._tokens + (now - self._refilled) * self.limits.rate
+        )
+        self._refilled = now
+
+    def _slow(self, route: str | None, elapsed_s: float) -> bool:
+        latency = None if route is None else self._latency.get(route)
+        return latency is not None and elapsed_s > max(_SLOW_FLOOR_S, _SLOW_FACTOR * latency)
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < _DECREASE_INTERVAL_S:
+            return
+        self._last_decrease = now
+        self.limit = max(1.0, self.limit / 2)
+        log.info("SD-WAN Manager overloaded — %s requests in flight capped at %d",
+                 self.name, int(self.limit))
+
+
+class RequestGovernor:
+    def __init__(self, limits: Mapping[str, Limits] = DEFAULT_LIMITS) -> None:
+        self.budgets = {name: Budget(name, lim) for name, lim in limits.items()}
+
+    def budgets_for(self, path: str) -> list[Budget]:
+        """The budgets a request to path draws from, heavy budget first (fixed lock order)."""
+        heavy = [
+            self.budgets[name]
+            for pattern, name in HEAVY_ROUTES
+            if name in self.budgets and pattern.match(path)
+        ]
+        default = self.budgets.get("default")
+        return heavy + ([default] if default else [])
+
+    def acquire(self, path: str) -> list[Budget]:
+        budgets = self.budgets_for(path)
+        for budget in budgets:
+            budget.acquire()
+        return budgets
+
+    @staticmethod
+    def release(budgets: list[Budget], path: str, status: int, elapsed_s: float) -> None:
+        route = None if SIZE_BOUND_ROUTES.match(path) else normalize_path(path)
+        for budget in budgets:
+            budget.release(status, elapsed_s, route)
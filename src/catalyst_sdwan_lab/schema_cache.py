@@ -0,0 +1,54 @@
+"""On-disk cache of config group variable schemas.
+
+``add edges`` and ``add sdrouting`` only need the variable names a config group defines,
+but the Manager renders the whole per-device schema to answer that. The names only change
+when the group does, so they are cached per Manager, config group ID and the group's
+revision (its version and last update time). Groups without a revision are not cached.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from catalyst_sdwan_lab._cache_files import cache_dir, write_private
+
+log = logging.getLogger(__name__)
+
+MAX_AGE = 7 * 24 * 3600
+
+
+class SchemaCache:
+    def __init__(self, directory: Path | None = None, *, max_age: float = MAX_AGE) -> None:
+        self.directory = directory or cache_dir("schemas")
+        self.max_age = max_age
+
+    def get(self, manager: str, config_group_id: str, revision: str) -> frozenset[str] | None:
+        key = _key(manager, config_group_id, revision)
+        try:
+            entry = json.loads(self._path(key).read_text())
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key or time.time() - entry.get("created", 0) > self.max_age:
+            return None
+        return frozenset(entry.get("variables", []))
+
+    def put(
+        self, manager: str, config_group_id: str, revision: str, variables: Iterable[str]
+    ) -> None:
+        key = _key(manager, config_group_id, revision)
+        try:
+            write_private(self._path(key), json.dumps(
+                {"key": key, "created": time.time(), "variables": sorted(variables)}
+            ))
+        except OSError as e:
+            log.debug("Could not cache variable schema of %s: %s", config_group_id, e)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.json"
+
+
+def _key(manager: str, config_group_id: str, revision: str) -> str:
+    return f"{manager}|{config_group_id}|{revision}"
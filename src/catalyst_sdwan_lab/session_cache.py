@@ -0,0 +1,80 @@
+"""Opt-in on-disk cache of SD-WAN Manager login sessions, shared across CLI invocations.
+
+A login costs a j_security_check POST and a token GET, several seconds on a busy Manager.
+With the cache enabled, ManagerClient stores the session cookies and XSRF token per host,
+port and user, and the next invocation resumes that session after one validating call.
+Commands then leave the session open on exit instead of logging out. Entries are private
+to the user and are dropped as soon as the Manager rejects them.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from catalyst_sdwan_lab._cache_files import cache_dir, write_private
+
+log = logging.getLogger(__name__)
+
+# Manager's default idle timeout is 30 min; don't bother validating anything older
+MAX_AGE = 30 * 60
+
+
+@dataclass
+class CachedSession:
+    cookies: dict[str, str]
+    token: str
+    saved: float
+
+
+class SessionCache:
+    """Lookups and stores are no-ops until enabled."""
+
+    def __init__(self, directory: Path | None = None, *, max_age: float = MAX_AGE) -> None:
+        self.enabled = False
+        self.directory = directory or cache_dir("sessions")
+        self.max_age = max_age
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def load(self, host: str, port: int, username: str) -> CachedSession | None:
+        if not self.enabled:
+            return None
+        try:
+            entry = CachedSession(**json.loads(self._path(host, port, username).read_text()))
+        except (OSError, ValueError, TypeError):
+            return None
+        if time.time() - entry.saved > self.max_age:
+            return None
+        return entry
+
+    def save(
+        self, host: str, port: int, username: str, cookies: dict[str, str], token: str
+    ) -> None:
+        if not self.enabled:
+            return
+        try:
+            write_private(
+                self._path(host, port, username),
+                json.dumps(asdict(CachedSession(cookies, token, time.time()))),
+            )
+        except OSError as e:
+            log.debug("Could not cache Manager session: %s", e)
+
+    def discard(self, host: str, port: int, username: str) -> None:
+        if not self.enabled:
+            return
+        try:
+            self._path(host, port, username).unlink(missing_ok=True)
+        except OSError as e:
+            log.debug("Could not drop cached Manager session: %s", e)
+
+    def _path(self, host: str, port: int, username: str) -> Path:
+        key = f"{host}:{port}:{username}"
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.json"
+
+
+store = SessionCache()
@@ -1,8 +1,11 @@
 import datetime
+import hashlib
+import itertools
+import json
 import logging
 import re
 import time
-from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Callable, Set
 from typing import Any, Literal
 
 import requests
@@ -15,7 +18,13 @@ from virl2_client.models.interface import Interface
 from virl2_client.models.lab import Lab
 from virl2_client.models.node import Node
 
-from catalyst_sdwan_lab.manager_client import ManagerAPIError, ManagerClient
+from catalyst_sdwan_lab.bootstrap_cache import BootstrapCache
+from catalyst_sdwan_lab.cml_events import cml_events
+from catalyst_sdwan_lab.device_watcher import DeviceStateWatcher
+from catalyst_sdwan_lab.lab_snapshot import LabSnapshot
+from catalyst_sdwan_lab.manager_client import ManagerAPIError, ManagerClient, fan_out
+from catalyst_sdwan_lab.polling import Backoff, poll
+from catalyst_sdwan_lab.schema_cache import SchemaCache
 from catalyst_sdwan_lab.ssh_client import (
     cml_shell,
     fix_sdrouting_default_route,
@@ -30,6 +39,7 @@ from .deploy import (
 from .utils import (
     CML_DEPLOY_TEMPLATES_DIR,
     SDWAN_CTRL_NODE_DEFS,
+    SIGN_WORKERS,
     VALIDATOR_FQDN,
     configure_controller_network_settings,
     connect_cml,
@@ -46,6 +56,7 @@ from .utils import (
     sign_device_cert,
     task_progress,
     trigger_rediscovery,
+    wait_all_converged,
     wait_for_edges_onboarded,
     wait_for_manager,
 )
@@ -62,11 +73,18 @@ _EDGE_NUM_RE = re.compile(r"^Edge(\d+)$")
 _SDROUTING_NUM_RE = re.compile(r"^SD-Edge(\d+)$")
 _IP_HOST_RE = re.compile(r"^ip host vrf (\S+) validator\.sdwan\.local (.+)$")
 
-_CSR_POLL_INTERVAL = 15
 _CSR_POLL_TIMEOUT = 600
 _BOOT_TIMEOUT = 600
 _BOOT_INTERVAL = 10
+_BOOT_BACKOFF = Backoff(floor=2, ceiling=_BOOT_INTERVAL)
+_INTERFACE_BACKOFF = Backoff(floor=0.5, ceiling=2)
 _GATEWAY_VRF_NAMES = ("inet", "mpls", "vpn0")
+# vedgeCertificateState of edges no lab has taken yet, and of edges given a bootstrap
+# config, which is when an edge gets its system IP
+_UNCLAIMED_STATES = ("tokengenerated", "bootstrapconfiggenerated")
+_CLAIMED_STATES = (
+    "bootstrapconfiggenerated", "csrgenerated", "csrfailed", "certinstalled", "certinstallfailed"
+)
 
 
 def run_control_component(
@@ -93,7 +111,8 @@ def run_control_component(
         cml = connect_cml(cml_host, cml_user, cml_password)
         update("Checking lab and images...")
         lab, manager_ip, manager_port = find_lab(cml, lab_name)
-        ip_type = detect_ip_type(lab)
+        snapshot = LabSnapshot(lab)
+        ip_type = detect_ip_type(snapshot)
         image_id = resolve_image(cml, node_def, version)
 
         update("Connecting to SD-WAN Manager...")
@@ -115,7 +134,7 @@ def run_control_component(
             nodes: list[Node] = []
             device_ips: list[str] = []
             for i in range(count):
-                num = _next_device_num(lab, num_re)
+                num = _next_device_num(snapshot, num_re)
                 update(f"Adding {label_prefix}{num} to CML ({i + 1}/{count})...")
                 extra = (
                     {"controller_num": num, "validator_fqdn": VALIDATOR_FQDN}
@@ -130,7 +149,8 @@ def run_control_component(
                     **extra,
                 )
                 node = _add_sdwan_node(
-                    lab, f"{label_prefix}{num}", node_def, image_id, cloud_init, iface, cpus, ram,
+                    snapshot, f"{label_prefix}{num}", node_def, image_id, cloud_init, iface,
+                    cpus, ram,
                 )
                 node.start()
                 nodes.append(node)
@@ -140,23 +160,36 @@ def run_control_component(
                     else f"172.16.0.{ip_offset}{num}"
                 )
 
-            for i, (node, ip) in enumerate(zip(nodes, device_ips), 1):
-                update(f"Waiting for {device_type}s to boot...")
-                node.wait_until_converged()
-                update(f"Waiting for {device_type} to be reachable ({i}/{count})...")
-                _add_to_manager_retrying(client, ip, personality, timeout=_BOOT_TIMEOUT)
+            node_ips = dict(zip(nodes, device_ips))
+
+            def reachable(node: Node) -> None:
+                update(f"Waiting for {node.label} to be reachable...")
+                _add_to_manager_retrying(
+                    client, node_ips[node], personality, timeout=_BOOT_TIMEOUT
+                )
 
+            update(f"Waiting for {device_type}s to boot (0/{count})...")
+            with cml_events(cml) as events:
+                wait_all_converged(
+                    nodes,
+                    on_progress=lambda done, total: update(
+                        f"Waiting for {device_type}s to boot ({done}/{total})..."
+                    ),
+                    on_ready=reachable,
+                    events=events,
+                )
+
+            # one inventory poller shared by the CSR wait, signing workers and reconnect wait
+            watcher = DeviceStateWatcher(client)
             update(f"Waiting for {device_type} CSRs...")
-            _wait_for_csrs(client, device_ips, timeout=_CSR_POLL_TIMEOUT)
+            _wait_for_csrs(client, device_ips, timeout=_CSR_POLL_TIMEOUT, watcher=watcher)
 
             update(f"Signing {device_type} certificates...")
-            with ThreadPoolExecutor() as pool:
-                futures = [
-                    pool.submit(sign_device_cert, client, certs, ip, pki=pki)
-                    for ip in device_ips
-                ]
-                for f in futures:
-                    f.result()
+            fan_out(
+                client,
+                lambda ip: sign_device_cert(client, certs, ip, pki=pki, watcher=watcher),
+                device_ips, workers=SIGN_WORKERS,
+            )
 
             if is_ctrl:
                 system_ips = {
@@ -164,7 +197,9 @@ def run_control_component(
                     for ip in device_ips
                 }
                 update("Waiting for controllers to reconnect...")
-                _wait_for_controllers_ready(client, system_ips, timeout=_CSR_POLL_TIMEOUT)
+                _wait_for_controllers_ready(
+                    client, system_ips, timeout=_CSR_POLL_TIMEOUT, watcher=watcher
+                )
                 if use_network_settings:
                     update("Configuring controller network settings...")
                     configure_controller_network_settings(client, system_ips)
@@ -175,7 +210,7 @@ def run_control_component(
             else:
                 update("Updating Gateway DNS entries...")
                 _update_gateway_dns(
-                    cml_host, cml_user, cml_password, lab, lab_name, device_ips,
+                    cml_host, cml_user, cml_password, snapshot, lab_name, device_ips,
                 )
             update("Triggering network rediscovery...")
             trigger_rediscovery(client)
@@ -209,19 +244,15 @@ def run_edge(
         cml = connect_cml(cml_host, cml_user, cml_password)
         update("Checking lab and images...")
         lab, manager_ip, manager_port = find_lab(cml, lab_name)
-        ip_type = detect_ip_type(lab)
+        snapshot = LabSnapshot(lab)
+        ip_type = detect_ip_type(snapshot)
         image_id = resolve_image(cml, "cat-sdwan-edge", version)
 
         update("Connecting to SD-WAN Manager...")
         client = connect_manager(manager_ip, manager_port, manager_user, manager_password)
         try:
             update("Checking available edge devices...")
-            vedges = client.get_vedges()
-            free_uuids = [
-                v["uuid"]
-                for v in vedges
-                if v.get("deviceModel") == "vedge-C8000V" and v.get("certInstallStatus") is None
-            ]
+            free_uuids, addressed = _scan_vedges(client, "vedge-C8000V", count)
             if count > len(free_uuids):
                 log.error(
                     "Not enough free C8000V UUIDs: need %d, have %d.", count, len(free_uuids)
@@ -229,10 +260,11 @@ def run_edge(
                 raise typer.Exit(1)
 
             update("Looking up edge config group...")
-            config_group_id = _get_config_group_id(client, "edge_basic")
-            allowed_vars = client.get_config_group_variable_names(config_group_id)
+            config_group_id, allowed_vars = _config_group_schema(
+                client, "edge_basic", SchemaCache()
+            )
 
-            start = _next_system_ip_num(lab, vedges)
+            start = _next_system_ip_num(snapshot, addressed)
             nums = [f"{start + i:02d}" for i in range(count)]
             uuids = free_uuids[:count]
 
@@ -265,8 +297,8 @@ def run_edge(
                         {"name": "vpn0_gi2_mpls_ipv6", "value": f"fc00:172:16:2::{n}/64"},
                         {"name": "vpn1_gi3_lan_ipv6", "value": f"fc00:192:168:{n}::1/64"},
                     ]
-                variables = _drop_unsupported_variables(variables, allowed_vars)
                 devices_vars.append({"device-id": uuid, "variables": variables})
+            devices_vars = _filter_device_variables(devices_vars, allowed_vars)
 
             update("Associating config group...")
             client.associate_config_group(config_group_id, uuids)
@@ -277,20 +309,30 @@ def run_edge(
             client.wait_for_task(task_id)
 
             update("Fetching bootstrap configs...")
-            bootstrap_configs = {uuid: client.get_bootstrap_config(uuid) for uuid in uuids}
+            bootstrap_configs = client.get_bootstrap_configs(
+                uuids,
+                cache=BootstrapCache(),
+                version=_bootstrap_version(client, config_group_id, devices_vars),
+            )
 
-            nodes: list[Node] = []
-            for i, (num, uuid) in enumerate(zip(nums, uuids), 1):
-                update(f"Adding Edge{num} to CML ({i}/{count})...")
-                node = _add_wan_edge_node(
-                    lab, f"Edge{num}", image_id, bootstrap_configs[uuid], True, cpus, ram,
-                )
+            nodes = _add_wan_edge_nodes(
+                snapshot,
+                [(f"Edge{num}", bootstrap_configs[uuid]) for num, uuid in zip(nums, uuids)],
+                image_id, True, cpus, ram,
+                on_progress=lambda done, total: update(f"Adding edges to CML ({done}/{total})..."),
+            )
+            for node in nodes:
                 node.start()
-                nodes.append(node)
 
-            for node in nodes:
-                update(f"Waiting for {'edges' if count > 1 else 'edge'} to boot...")
-                node.wait_until_converged()
+            update(f"Waiting for edges to boot (0/{count})...")
+            with cml_events(cml) as events:
+                wait_all_converged(
+                    nodes,
+                    on_progress=lambda done, total: update(
+                        f"Waiting for edges to boot ({done}/{total})..."
+                    ),
+                    events=events,
+                )
 
             update(f"Waiting for edges to onboard (0/{count})...")
             wait_for_edges_onboarded(
@@ -328,33 +370,29 @@ def run_sdrouting(
         cml = connect_cml(cml_host, cml_user, cml_password)
         update("Checking lab and images...")
         lab, manager_ip, manager_port = find_lab(cml, lab_name)
-        ip_type = detect_ip_type(lab)
+        snapshot = LabSnapshot(lab)
+        ip_type = detect_ip_type(snapshot)
         image_id = resolve_image(cml, "cat-sdwan-edge", version)
 
         update("Connecting to SD-WAN Manager...")
         client = connect_manager(manager_ip, manager_port, manager_user, manager_password)
         try:
             update("Checking available SD-Routing devices...")
-            vedges = client.get_vedges()
-            free_uuids = [
-                v["uuid"]
-                for v in vedges
-                if v.get("deviceModel") == "vedge-C8000V-SD-ROUTING"
-                and v.get("certInstallStatus") is None
-            ]
+            free_uuids, addressed = _scan_vedges(client, "vedge-C8000V-SD-ROUTING", count)
             if count > len(free_uuids):
                 log.error(
                     "Not enough free SD-Routing UUIDs: need %d, have %d.", count, len(free_uuids)
                 )
                 raise typer.Exit(1)
 
-            start = _next_system_ip_num(lab, vedges)
+            start = _next_system_ip_num(snapshot, addressed)
             nums = [str(start + i) for i in range(count)]
             uuids = free_uuids[:count]
 
             update("Looking up SD-Routing config group...")
-            config_group_id = _get_config_group_id(client, "sdrouting_basic")
-            allowed_vars = client.get_config_group_variable_names(config_group_id)
+            config_group_id, allowed_vars = _config_group_schema(
+                client, "sdrouting_basic", SchemaCache()
+            )
 
             devices_vars: list[dict[str, Any]] = []
             for num, uuid in zip(nums, uuids):
@@ -381,8 +419,8 @@ def run_sdrouting(
                         {"name": "global_vrf_gi1_inet_ipv6", "value": f"fc00:172:16:1::{n}/64"},
                         {"name": "vrf1_gi3_lan_ipv6", "value": f"fc00:192:168:{n}::1/64"},
                     ]
-                variables = _drop_unsupported_variables(variables, allowed_vars)
                 devices_vars.append({"device-id": uuid, "variables": variables})
+            devices_vars = _filter_device_variables(devices_vars, allowed_vars)
 
             update("Associating config group...")
             client.associate_config_group(config_group_id, uuids)
@@ -395,23 +433,25 @@ def run_sdrouting(
             client.wait_for_task(task_id)
 
             update("Fetching bootstrap configs...")
-            bootstrap_configs = {
-                uuid: client.get_bootstrap_config(uuid, wanif="GigabitEthernet1")
-                for uuid in uuids
-            }
+            bootstrap_configs = client.get_bootstrap_configs(
+                uuids,
+                wanif="GigabitEthernet1",
+                cache=BootstrapCache(),
+                version=_bootstrap_version(client, config_group_id, devices_vars),
+            )
 
-            nodes: list[Node] = []
-            for i, (num, uuid) in enumerate(zip(nums, uuids), 1):
-                update(f"Adding SD-Edge{num} to CML ({i}/{count})...")
-                node = _add_wan_edge_node(
-                    lab, f"SD-Edge{num}", image_id, bootstrap_configs[uuid], False, cpus, ram,
-                )
+            nodes = _add_wan_edge_nodes(
+                snapshot,
+                [(f"SD-Edge{num}", bootstrap_configs[uuid]) for num, uuid in zip(nums, uuids)],
+                image_id, False, cpus, ram,
+                on_progress=lambda done, total: update(
+                    f"Adding SD-Routing edges to CML ({done}/{total})..."
+                ),
+            )
+            for node in nodes:
                 node.start()
-                nodes.append(node)
 
-            for node in nodes:
-                update("Waiting for SD-Routing edges to boot...")
-                node.wait_until_converged()
+            def check_default_route(node: Node) -> None:
                 update(f"Checking default route on {node.label}...")
                 if fix_sdrouting_default_route(
                     cml_host, cml_user, cml_password, lab.title or lab_name, node.label,
@@ -419,6 +459,17 @@ def run_sdrouting(
                 ):
                     node.wait_until_converged()
 
+            update(f"Waiting for SD-Routing edges to boot (0/{count})...")
+            with cml_events(cml) as events:
+                wait_all_converged(
+                    nodes,
+                    on_progress=lambda done, total: update(
+                        f"Waiting for SD-Routing edges to boot ({done}/{total})..."
+                    ),
+                    on_ready=check_default_route,
+                    events=events,
+                )
+
             update(f"Waiting for SD-Routing edges to onboard (0/{count})...")
             wait_for_edges_onboarded(
                 client,
@@ -440,12 +491,28 @@ def run_sdrouting(
     console.print(f"[green]Added.[/green] {label} added to lab '{escape(lab_name)}'.")
 
 
-def _next_device_num(lab: Lab, num_re: re.Pattern[str]) -> str:
-    nums = [int(m.group(1)) for node in lab.nodes() if (m := num_re.match(node.label))]
-    return f"{(max(nums) + 1) if nums else 1:02d}"
+def _next_device_num(snapshot: LabSnapshot, num_re: re.Pattern[str]) -> str:
+    return f"{snapshot.max_num(num_re) + 1:02d}"
+
+
+def _scan_vedges(
+    client: ManagerClient, model: str, count: int
+) -> tuple[list[str], list[dict[str, Any]]]:
+    # up to count free UUIDs of model, and edges holding a system IP
+    # stop reading the unclaimed part of the serial file once there are enough
+    free = list(itertools.islice(
+        (
+            v["uuid"]
+            for v in client.iter_vedges(model=model, states=_UNCLAIMED_STATES)
+            if v.get("certInstallStatus") is None
+        ),
+        count,
+    ))
+    addressed = [v for v in client.iter_vedges(states=_CLAIMED_STATES) if v.get("system-ip")]
+    return free, addressed
 
 
-def _next_system_ip_num(lab: Lab, vedges: list[dict[str, Any]]) -> int:
+def _next_system_ip_num(snapshot: LabSnapshot, vedges: list[dict[str, Any]]) -> int:
     from_manager = max(
         (
             int(sip.split(".")[-1])
@@ -454,14 +521,7 @@ def _next_system_ip_num(lab: Lab, vedges: list[dict[str, Any]]) -> int:
         ),
         default=0,
     )
-    from_cml = max(
-        (
-            int(m.group(1))
-            for n in lab.nodes()
-            if (m := _EDGE_NUM_RE.match(n.label) or _SDROUTING_NUM_RE.match(n.label))
-        ),
-        default=0,
-    )
+    from_cml = max(snapshot.max_num(_EDGE_NUM_RE), snapshot.max_num(_SDROUTING_NUM_RE))
     return max(from_manager, from_cml) + 1
 
 
@@ -474,7 +534,7 @@ def _render_device_cloud_init(
 
 
 def _add_sdwan_node(
-    lab: Lab,
+    snapshot: LabSnapshot,
     label: str,
     node_def: str,
     image_id: str,
@@ -483,9 +543,10 @@ def _add_sdwan_node(
     cpus: int | None = None,
     ram: int | None = None,
 ) -> Node:
-    sdwan_nodes = [n for n in lab.nodes() if n.node_definition in SDWAN_CTRL_NODE_DEFS]
-    x = max((n.x for n in sdwan_nodes), default=0) + 120
-    y = max((n.y for n in sdwan_nodes), default=0)
+    placed = snapshot.positions(*SDWAN_CTRL_NODE_DEFS)
+    x = max((px for px, _ in placed), default=0) + 120
+    y = max((py for _, py in placed), default=0)
+    lab = snapshot.lab
     node = lab.create_node(
         label=label,
         node_definition=node_def,
@@ -498,7 +559,8 @@ def _add_sdwan_node(
         cpus=cpus,
         ram=ram,
     )
-    vpn0 = next((n for n in lab.nodes() if n.label == "VPN0"), None)
+    snapshot.add(node, x=x, y=y)
+    vpn0 = snapshot.node("VPN0")
     if vpn0 is None:
         log.error("VPN0 switch not found in lab.")
         raise typer.Exit(1)
@@ -511,113 +573,139 @@ def _add_sdwan_node(
     return node
 
 
-def _add_wan_edge_node(
-    lab: Lab,
-    label: str,
+def _add_wan_edge_nodes(
+    snapshot: LabSnapshot,
+    devices: list[tuple[str, str]],
     image_id: str,
-    configuration: str,
     connect_mpls: bool,
     cpus: int | None = None,
     ram: int | None = None,
-) -> Node:
-    x = max((n.x for n in lab.nodes() if n.y == 400), default=-400) + 120
-    node = lab.create_node(
-        label=label,
-        node_definition="cat-sdwan-edge",
-        image_definition=image_id,
-        configuration=configuration,
-        x=x,
-        y=400,
-        populate_interfaces=True,
-        wait=False,
-        cpus=cpus,
-        ram=ram,
-    )
-    inet = next((n for n in lab.nodes() if n.label == "INET"), None)
+    *,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> list[Node]:
+    # create every node first so one lab sync picks up all of their interfaces
+    inet = snapshot.node("INET")
     if inet is None:
         log.error("INET switch not found in lab.")
         raise typer.Exit(1)
-    gi1 = _sync_until_interface(lab, node, "GigabitEthernet1")
-    inet_free = inet.next_available_interface()
-    if inet_free is None:
-        log.error("INET switch has no free ports.")
+    mpls = snapshot.node("MPLS") if connect_mpls else None
+    if connect_mpls and mpls is None:
+        log.error("MPLS switch not found in lab.")
         raise typer.Exit(1)
-    lab.create_link(gi1, inet_free, wait=False)
-    if connect_mpls:
-        mpls = next((n for n in lab.nodes() if n.label == "MPLS"), None)
-        if mpls is None:
-            log.error("MPLS switch not found in lab.")
-            raise typer.Exit(1)
-        gi2 = _sync_until_interface(lab, node, "GigabitEthernet2")
-        mpls_free = mpls.next_available_interface()
-        if mpls_free is None:
-            log.error("MPLS switch has no free ports.")
-            raise typer.Exit(1)
-        lab.create_link(gi2, mpls_free, wait=False)
-    return node
+
+    lab = snapshot.lab
+    nodes: list[Node] = []
+    for i, (label, configuration) in enumerate(devices):
+        row_end = snapshot.row_end(400)
+        x = (-400 if row_end is None else row_end) + 120
+        node = lab.create_node(
+            label=label,
+            node_definition="cat-sdwan-edge",
+            image_definition=image_id,
+            configuration=configuration,
+            x=x,
+            y=400,
+            populate_interfaces=True,
+            wait=False,
+            cpus=cpus,
+            ram=ram,
+        )
+        snapshot.add(node, x=x, y=400)
+        nodes.append(node)
+        if on_progress:
+            on_progress(i + 1, len(devices))
+
+    ports = ["GigabitEthernet1", "GigabitEthernet2"] if mpls else ["GigabitEthernet1"]
+    found = _sync_until_interfaces(lab, [(node, port) for node in nodes for port in ports])
+    for switch, name in ((inet, "INET"), (mpls, "MPLS")):
+        if switch is None:
+            continue
+        for node in nodes:
+            free = switch.next_available_interface()
+            if free is None:
+                log.error("%s switch has no free ports.", name)
+                raise typer.Exit(1)
+            port = "GigabitEthernet1" if switch is inet else "GigabitEthernet2"
+            lab.create_link(found[(node, port)], free, wait=False)
+    return nodes
 
 
 def _sync_until_interface(
     lab: Lab, node: Node, label: str, *, timeout: int = 30
 ) -> Interface:
-    deadline = time.time() + timeout
-    while True:
+    return _sync_until_interfaces(lab, [(node, label)], timeout=timeout)[(node, label)]
+
+
+def _sync_until_interfaces(
+    lab: Lab, wanted: list[tuple[Node, str]], *, timeout: int = 30
+) -> dict[tuple[Node, str], Interface]:
+    # sync the lab until every (node, interface label) in wanted exists, one sync per try
+    found: dict[tuple[Node, str], Interface] = {}
+    if not wanted:
+        return found
+
+    def interfaces() -> dict[tuple[Node, str], Interface]:
         lab.sync()
-        try:
-            return node.get_interface_by_label(label)
-        except InterfaceNotFound:
-            if time.time() >= deadline:
-                log.error(
-                    "Interface %s not available on %s after %ds.", label, node.label, timeout
-                )
-                raise typer.Exit(1)
-            time.sleep(2)
+        for node, label in wanted:
+            if (node, label) not in found:
+                found[(node, label)] = node.get_interface_by_label(label)
+        return found
+
+    if poll(
+        interfaces, timeout=timeout, backoff=_INTERFACE_BACKOFF, label="CML interface",
+        retry_on=(InterfaceNotFound,),
+    ) is None:
+        node, label = next(w for w in wanted if w not in found)
+        log.error("Interface %s not available on %s after %ds.", label, node.label, timeout)
+        raise typer.Exit(1)
+    return found
 
 
 def _add_to_manager_retrying(
     client: ManagerClient, ip: str, personality: str, *, timeout: int
 ) -> None:
-    deadline = time.time() + timeout
-    while True:
-        try:
-            client.add_controller(ip, personality, "admin", "admin")
-            return
-        except (ManagerAPIError, requests.exceptions.RequestException):
-            remaining = deadline - time.time()
-            if remaining <= 0:
-                log.error("Timed out waiting for %s %s to become reachable.", personality, ip)
-                raise typer.Exit(1)
-            time.sleep(min(_BOOT_INTERVAL, remaining))
-
-
-def _wait_for_csrs(client: ManagerClient, device_ips: list[str], *, timeout: int) -> None:
-    pending = set(device_ips)
-    deadline = time.time() + timeout
-    while pending and time.time() < deadline:
-        for d in client.get_controllers():
-            ip = d.get("deviceIP", "")
-            if ip in pending and d.get("serialNumber") == "No certificate installed":
-                pending.discard(ip)
-        if pending:
-            time.sleep(_CSR_POLL_INTERVAL)
+    def added() -> bool:
+        client.add_controller(ip, personality, "admin", "admin")
+        return True
+
+    if not poll(
+        added, timeout=timeout, backoff=_BOOT_BACKOFF, label="Controller reachable",
+        retry_on=(ManagerAPIError, requests.exceptions.RequestException),
+    ):
+        log.error("Timed out waiting for %s %s to become reachable.", personality, ip)
+        raise typer.Exit(1)
+
+
+def _wait_for_csrs(
+    client: ManagerClient,
+    device_ips: list[str],
+    *,
+    timeout: int,
+    watcher: DeviceStateWatcher | None = None,
+) -> None:
+    pending = (watcher or DeviceStateWatcher(client)).wait_all(
+        "controllers", device_ips, lambda d: d.get("serialNumber") == "No certificate installed",
+        timeout=timeout, label="Controller CSR",
+    )
     if pending:
         log.error("Timed out waiting for CSRs: %s", ", ".join(sorted(pending)))
         raise typer.Exit(1)
 
 
 def _wait_for_controllers_ready(
-    client: ManagerClient, system_ips: set[str], *, timeout: int
+    client: ManagerClient,
+    system_ips: set[str],
+    *,
+    timeout: int,
+    watcher: DeviceStateWatcher | None = None,
 ) -> None:
-    pending = set(system_ips)
-    deadline = time.time() + timeout
-    while pending and time.time() < deadline:
-        for d in client.get_controllers():
-            ip = d.get("deviceIP", "")
-            sn = d.get("serialNumber", "")
-            if ip in pending and sn and sn != "No certificate installed":
-                pending.discard(ip)
-        if pending:
-            time.sleep(_CSR_POLL_INTERVAL)
+    pending = (watcher or DeviceStateWatcher(client)).wait_all(
+        "controllers",
+        system_ips,
+        lambda d: d.get("serialNumber", "") not in ("", "No certificate installed"),
+        timeout=timeout,
+        label="Controller reconnect",
+    )
     if pending:
         log.error(
             "Timed out waiting for controllers to reconnect: %s", ", ".join(sorted(pending))
@@ -627,9 +715,9 @@ def _wait_for_controllers_ready(
 
 def _update_gateway_dns(
     cml_host: str, cml_user: str, cml_password: str,
-    lab: Lab, lab_name: str, new_ips: list[str],
+    snapshot: LabSnapshot, lab_name: str, new_ips: list[str],
 ) -> None:
-    gateway = next((n for n in lab.nodes() if n.label == "Gateway"), None)
+    gateway = snapshot.node("Gateway")
     if gateway is None:
         log.warning("Gateway node not found in lab; skipping DNS update.")
         return
@@ -678,20 +766,60 @@ def _update_gateway_dns(
         log.info("Gateway DNS updated for validators: %s", ", ".join(new_ips))
 
 
-def _get_config_group_id(client: ManagerClient, name: str) -> str:
+def _config_group_schema(
+    client: ManagerClient, name: str, cache: SchemaCache | None = None
+) -> tuple[str, frozenset[str]]:
+    # ID of the named config group and the variable names its schema defines
     cg = next((g for g in client.get_config_groups() if g.get("name") == name), None)
     if cg is None:
         log.error("Config group '%s' not found in Manager.", name)
         raise typer.Exit(1)
-    return cg["id"]
+    # without a revision there is no telling whether a cached schema is stale
+    revision = _config_group_revision(cg)
+    if cache and revision:
+        cached = cache.get(client.base_url, cg["id"], revision)
+        if cached is not None:
+            log.debug("Using cached variable schema of %s", name)
+            return cg["id"], cached
+    allowed = frozenset(client.get_config_group_variable_names(cg["id"]))
+    if cache and revision:
+        cache.put(client.base_url, cg["id"], revision, allowed)
+    return cg["id"], allowed
+
+
+def _config_group_revision(cg: dict[str, Any]) -> str:
+    version, updated = cg.get("version"), cg.get("lastUpdatedOn")
+    if version is None and updated is None:
+        return ""
+    return f"{version}@{updated}"
+
+
+def _bootstrap_version(
+    client: ManagerClient, config_group_id: str, devices_vars: list[dict[str, Any]]
+) -> str:
+    # identify what the Manager renders bootstraps from: config group revision and variables
+    cg = next((g for g in client.get_config_groups() if g.get("id") == config_group_id), {})
+    state = [config_group_id, cg.get("version"), devices_vars]
+    return hashlib.sha256(json.dumps(state, sort_keys=True).encode()).hexdigest()[:16]
 
 
-def _drop_unsupported_variables(
-    variables: list[dict[str, Any]], allowed: set[str]
+def _filter_device_variables(
+    devices_vars: list[dict[str, Any]], allowed: frozenset[str]
 ) -> list[dict[str, Any]]:
-    dropped = [v["name"] for v in variables if v["name"] not in allowed]
+    dropped = {
+        v["name"] for d in devices_vars for v in d["variables"] if v["name"] not in allowed
+    }
     if dropped:
-        log.debug("Config group schema doesn't define %s — skipping", ", ".join(dropped))
+        log.debug("Config group schema doesn't define %s — skipping", ", ".join(sorted(dropped)))
+    return [
+        {**d, "variables": _drop_unsupported_variables(d["variables"], allowed)}
+        for d in devices_vars
+    ]
+
+
+def _drop_unsupported_variables(
+    variables: list[dict[str, Any]], allowed: Set[str]
+) -> list[dict[str, Any]]:
     return [v for v in variables if v["name"] in allowed]
 
 
@@ -710,17 +838,18 @@ def run_managers(
 ) -> None:
     cml = connect_cml(cml_host, cml_user, cml_password)
     lab, manager_host, manager_port = find_lab(cml, lab_name)
+    snapshot = LabSnapshot(lab)
 
     with task_progress(console, initial="Setting up Cluster switch...") as update:
-        cluster = _ensure_cluster_switch(lab)
+        cluster = _ensure_cluster_switch(snapshot)
         update("Connecting existing managers to Cluster switch...")
-        _connect_managers_to_cluster(lab, cluster)
+        _connect_managers_to_cluster(snapshot, cluster)
 
         update("Checking cluster IP configuration...")
         client = connect_manager(manager_host, manager_port, manager_user, manager_password)
         try:
             org_name = client.get_organization() or ""
-            ip_type = detect_ip_type(lab)
+            ip_type = detect_ip_type(snapshot)
             pki = client.get_certificate_signing()
             ensure_cluster_ip_configured(
                 client, manager_user, manager_password, persona=persona,
@@ -734,13 +863,19 @@ def run_managers(
 
         update(f"Adding {count} manager node(s) to CML...")
         new_nodes = _create_manager_nodes(
-            lab, cluster, cml, count, version,
+            snapshot, cluster, cml, count, version,
             manager_user, manager_password, org_name, ip_type, persona, cpus, ram,
         )
 
-        update("Waiting for managers to boot...")
-        for node, _ in new_nodes:
-            node.wait_until_converged()
+        update(f"Waiting for managers to boot (0/{count})...")
+        with cml_events(cml) as events:
+            wait_all_converged(
+                [node for node, _ in new_nodes],
+                on_progress=lambda done, total: update(
+                    f"Waiting for managers to boot ({done}/{total})..."
+                ),
+                events=events,
+            )
 
         update("Waiting for primary Manager...")
         client = wait_for_manager(
@@ -766,7 +901,7 @@ def run_managers(
     console.print(f"[green]Added.[/green] {label} added to lab '{escape(lab_name)}'.")
 
 def _create_manager_nodes(
-    lab: Lab,
+    snapshot: LabSnapshot,
     cluster: Node,
     cml: ClientLibrary,
     count: int,
@@ -786,20 +921,18 @@ def _create_manager_nodes(
         datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]
         + "+00:00"
     )
-    vpn0 = next(
-        (n for n in lab.nodes() if n.label == "VPN0" and n.node_definition == "unmanaged_switch"),
-        None,
-    )
+    lab = snapshot.lab
+    vpn0 = snapshot.node("VPN0", "unmanaged_switch")
     if vpn0 is None:
         log.error("VPN0 switch not found in lab.")
         raise typer.Exit(1)
 
     template = _CLOUD_INIT_ENV.get_template("manager-cloud-init.j2")
-    existing_managers = [n for n in lab.nodes() if n.node_definition == "cat-sdwan-manager"]
-    base_num = len(existing_managers)
-    ref = min(existing_managers, key=lambda n: n.y, default=None)
-    base_x = ref.x if ref else -280
-    base_y = (ref.y if ref else -80) - 80
+    existing = snapshot.positions("cat-sdwan-manager")
+    base_num = len(existing)
+    ref = min(existing, key=lambda p: p[1], default=None)
+    base_x = ref[0] if ref else -280
+    base_y = (ref[1] if ref else -80) - 80
     nodes: list[tuple[Node, str]] = []
 
     for i in range(count):
@@ -831,6 +964,7 @@ def _create_manager_nodes(
             cpus=cpus,
             ram=ram,
         )
+        snapshot.add(node, x=base_x, y=base_y - 80 * i)
         eth1 = _sync_until_interface(lab, node, "eth1")
         free_vpn0 = vpn0.next_available_interface()
         if free_vpn0 is None:
@@ -853,21 +987,15 @@ def _create_manager_nodes(
     return nodes
 
 
-def _ensure_cluster_switch(lab: Lab) -> Node:
-    existing = next(
-        (
-            n for n in lab.nodes()
-            if n.label == "Cluster" and n.node_definition == "unmanaged_switch"
-        ),
-        None,
-    )
+def _ensure_cluster_switch(snapshot: LabSnapshot) -> Node:
+    existing = snapshot.node("Cluster", "unmanaged_switch")
     if existing is not None:
         if not existing.is_active():
             existing.start()
             existing.wait_until_converged()
             log.info("Started stopped Cluster switch.")
         return existing
-    node = lab.create_node(
+    node = snapshot.lab.create_node(
         label="Cluster",
         node_definition="unmanaged_switch",
         x=-400,
@@ -875,15 +1003,15 @@ def _ensure_cluster_switch(lab: Lab) -> Node:
         populate_interfaces=True,
         wait=True,
     )
+    snapshot.add(node, x=-400, y=-160)
     node.start()
     node.wait_until_converged()
     log.info("Created Cluster switch.")
     return node
 
 
-def _connect_managers_to_cluster(lab: Lab, cluster: Node) -> None:
-    managers = [n for n in lab.nodes() if n.node_definition == "cat-sdwan-manager"]
-    for manager in managers:
+def _connect_managers_to_cluster(snapshot: LabSnapshot, cluster: Node) -> None:
+    for manager in snapshot.nodes("cat-sdwan-manager"):
         eth2 = manager.get_interface_by_label("eth2")
         if eth2.connected:
             log.info("%s eth2 already connected, skipping.", manager.label)
@@ -892,7 +1020,7 @@ def _connect_managers_to_cluster(lab: Lab, cluster: Node) -> None:
         if free is None:
             log.error("Cluster switch has no free ports.")
             raise typer.Exit(1)
-        lab.create_link(eth2, free)
+        snapshot.lab.create_link(eth2, free)
         eth2.bring_up()
         log.info("Linked %s eth2 to Cluster switch.", manager.label)
 
@@ -3,6 +3,8 @@ import logging
 import typer
 from rich.markup import escape
 
+from catalyst_sdwan_lab import lab_index
+
 from .utils import connect_cml, console, task_progress
 
 log = logging.getLogger(__name__)
@@ -20,7 +22,7 @@ def run(cml_host: str, cml_user: str, cml_password: str, lab_name: str, *, force
         cml = connect_cml(cml_host, cml_user, cml_password)
         try:
             update("Finding lab...")
-            labs = cml.find_labs_by_title(lab_name)
+            labs = lab_index.labs_by_title(cml, lab_name)
             if not labs:
                 log.error("No lab found with name '%s'.", lab_name)
                 raise typer.Exit(1)
@@ -37,6 +39,7 @@ def run(cml_host: str, cml_user: str, cml_password: str, lab_name: str, *, force
             lab.wipe()
             update("Removing lab...")
             lab.remove()
+            lab_index.invalidate(cml)
         finally:
             cml.logout()
 
@@ -4,6 +4,7 @@ import logging
 import platform
 import re
 import subprocess
+from collections.abc import Callable
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Literal
@@ -13,6 +14,7 @@ from jinja2 import Environment, FileSystemLoader
 from rich.markup import escape
 from virl2_client import ClientLibrary
 
+from catalyst_sdwan_lab import lab_index
 from catalyst_sdwan_lab.manager_client import ManagerAPIError, ManagerClient
 
 from .utils import (
@@ -34,6 +36,7 @@ from .utils import (
     sha512_crypt,
     task_progress,
     trigger_rediscovery,
+    upload_progress,
     wait_for_manager,
 )
 
@@ -153,10 +156,12 @@ def run(
                 )
 
                 update("Uploading serial file...")
-                client.upload_serial_file(serial_file)
+                client.upload_serial_file(
+                    serial_file, on_progress=upload_progress("Uploading serial file", update)
+                )
 
                 update("Importing basic configuration...")
-                _restore_basic_configuration(client, ip_type)
+                _restore_basic_configuration(client, ip_type, on_status=update)
 
                 if (major, minor) >= (20, 18):
                     update("Configuring controller network settings...")
@@ -207,13 +212,18 @@ def _import_controller_templates(client: ManagerClient, ip_type: str) -> str:
         (feature_dir / ip_type).glob("*.json")
     )
 
-    id_map: dict[str, str] = {}
-    for path in template_files:
-        raw = json.loads(path.read_text())
-        old_id: str = raw["templateId"]
-        new_id = client.create_feature_template(_template_post_body(raw))
-        id_map[old_id] = new_id
-        log.debug("Feature template created: %s -> %s", path.stem, new_id)
+    # a previous run may have failed after creating some of them
+    existing = {t["templateName"]: t["templateId"] for t in client.get_feature_templates()}
+    raws = [json.loads(path.read_text()) for path in template_files]
+    id_map = {r["templateId"]: existing[r["templateName"]] for r in raws
+              if r["templateName"] in existing}
+    if id_map:
+        log.info("Reusing %d existing feature template(s)", len(id_map))
+    new = [r for r in raws if r["templateName"] not in existing]
+    created = client.create_feature_templates([_template_post_body(r) for r in new])
+    for raw, new_id in zip(new, created):
+        id_map[raw["templateId"]] = new_id
+        log.debug("Feature template created: %s -> %s", raw["templateName"], new_id)
 
     device_raw = json.loads((CONTROLLER_TEMPLATES_DIR / "device_template.json").read_text())
     remapped_text = _UUID_RE.sub(lambda m: id_map.get(m.group(), m.group()), json.dumps(device_raw))
@@ -264,12 +274,17 @@ def _attach_controller_template(
     log.info("Controller template attached to %d controller(s)", len(devices))
 
 
-def _restore_basic_configuration(client: ManagerClient, ip_type: str) -> None:
+def _restore_basic_configuration(
+    client: ManagerClient, ip_type: str, on_status: Callable[[str], None] = lambda _: None
+) -> None:
     existing = {g.get("name") for g in client.get_config_groups()}
     if "edge_basic" in existing and "sdrouting_basic" in existing:
         log.debug("Basic configuration already imported — skipping")
         return
-    task_id = client.import_configuration(basic_configuration_path(ip_type))
+    task_id = client.import_configuration(
+        basic_configuration_path(ip_type),
+        on_progress=upload_progress("Uploading basic configuration", on_status),
+    )
     client.wait_for_task(task_id)
     log.info("Basic configuration imported")
 
@@ -288,11 +303,10 @@ def _check_images(cml: ClientLibrary, version: str) -> _Images:
 
 
 def _find_lab(cml: ClientLibrary, manager_ip: str, manager_port: int) -> None:
-    needle = f"manager_external_ip = {manager_ip}:{manager_port}"
-    for lab in cml.all_labs(show_all=True):
-        if lab.notes and needle in lab.notes:
-            log.info("Found existing lab: %s", lab.title)
-            return
+    labs = lab_index.labs_by_manager(cml, manager_ip, manager_port)
+    if labs:
+        log.info("Found existing lab: %s", labs[0].title)
+        return
     log.error(
         "Retry flag set but no lab found with Manager IP %s:%s.", manager_ip, manager_port
     )
@@ -316,8 +330,7 @@ def _create_lab(
     ip_type: str,
     patty: bool,
 ) -> Any:
-    existing = [lab.title for lab in cml.all_labs(show_all=True)]
-    if lab_name in existing:
+    if lab_index.labs_by_title(cml, lab_name):
         log.error(
             "Lab '%s' already exists. Use a different name or --retry to resume.", lab_name
         )
@@ -358,6 +371,7 @@ def _create_lab(
 
     log.info("Importing lab '%s' to CML...", lab_name)
     lab = cml.import_lab(topology, lab_name)
+    lab_index.invalidate(cml)
     log.info("Starting lab nodes...")
     lab.start()
     return lab
@@ -10,7 +10,10 @@ from typing import Any, Callable, Literal
 import typer
 import yaml
 from rich.markup import escape
+from virl2_client.models.node import Node
 
+from catalyst_sdwan_lab import lab_index
+from catalyst_sdwan_lab.cml_events import CmlEvents, cml_events
 from catalyst_sdwan_lab.manager_client import ManagerAPIError, ManagerClient
 from catalyst_sdwan_lab.ssh_client import fix_sdrouting_default_route
 
@@ -37,6 +40,8 @@ from .utils import (
     task_progress,
     topology_nodes,
     trigger_rediscovery,
+    upload_progress,
+    wait_all_converged,
     wait_for_edges_onboarded,
     wait_for_manager,
 )
@@ -106,7 +111,7 @@ def run(
             _delete_lab(cml_host, cml_user, cml_password, lab_name, force=True)
 
         if not retry and not delete_existing:
-            if any(lab.title == lab_name for lab in cml.all_labs(show_all=True)):
+            if lab_index.labs_by_title(cml, lab_name):
                 log.error(
                     "Lab '%s' already exists. Use --retry to resume, "
                     "--delete-existing to replace, or choose a different name.",
@@ -128,6 +133,7 @@ def run(
                 topology_yaml = dump_topology(topology)
                 update("Importing lab into CML...")
                 lab = cml.import_lab(topology_yaml)
+                lab_index.invalidate(cml)
 
             update("Starting control plane...")
             _start_control_plane(lab)
@@ -160,7 +166,9 @@ def run(
                 )
 
                 update("Uploading serial file...")
-                client.upload_serial_file(serial_file)
+                client.upload_serial_file(
+                    serial_file, on_progress=upload_progress("Uploading serial file", update)
+                )
 
                 update("Patching Sastre controller UUIDs...")
                 _patch_sastre_controller_uuids(manager_configs_dir, client)
@@ -184,30 +192,38 @@ def run(
                     update("Restoring network hierarchy...")
                     _restore_mrf(client, json.loads(mrf_path.read_text()))
 
-                client = _restore_cluster(
-                    client, lab, certs, pki,
-                    manager_ip, manager_port, manager_user, manager_password, version,
-                    on_status=update,
-                )
+                with cml_events(cml) as events:
+                    client = _restore_cluster(
+                        client, lab, certs, pki,
+                        manager_ip, manager_port, manager_user, manager_password, version,
+                        on_status=update, events=events,
+                    )
 
                 update("Starting edge nodes...")
                 edge_uuids = _inject_otps_and_start_edges(
                     lab, client, ca_chain=certs.chain if pki == "enterprise" else ""
                 )
 
-                for node in lab.nodes():
-                    if node.node_definition != "cat-sdwan-edge":
-                        continue
-                    if "SD-Routing : true" not in (node.configuration or ""):
-                        continue
+                def check_default_route(node: Node) -> None:
                     update(f"Checking default route on {node.label}...")
-                    node.wait_until_converged()
                     if fix_sdrouting_default_route(
                         cml_host, cml_user, cml_password, lab.title or lab_name, node.label,
                         console=console,
                     ):
                         node.wait_until_converged()
 
+                sdrouting_nodes = [
+                    node for node in lab.nodes()
+                    if node.node_definition == "cat-sdwan-edge"
+                    and "SD-Routing : true" in (node.configuration or "")
+                ]
+                if sdrouting_nodes:
+                    update("Waiting for SD-Routing edges to boot...")
+                    with cml_events(cml) as events:
+                        wait_all_converged(
+                            sdrouting_nodes, on_ready=check_default_route, events=events
+                        )
+
                 if edge_uuids:
                     total_edges = len(edge_uuids)
                     update(f"Waiting for edges to onboard... (0/{total_edges})")
@@ -291,14 +307,11 @@ def _check_images(
 
 
 def _find_lab_by_manager(cml: Any, manager_ip: str, manager_port: int, patty: bool) -> Any:
-    marker = f"{manager_ip}:{manager_port}" if patty else manager_ip
-    lab = next(
-        (lab for lab in cml.all_labs(show_all=True) if lab.notes and marker in lab.notes), None
-    )
-    if not lab:
+    labs = lab_index.labs_by_manager(cml, manager_ip, manager_port if patty else None)
+    if not labs:
         log.error("Cannot find lab with Manager IP %s:%s in notes.", manager_ip, manager_port)
         raise typer.Exit(1)
-    return lab
+    return labs[0]
 
 
 def _patch_topology(
@@ -424,6 +437,7 @@ def _restore_cluster(
     manager_password: str,
     version: str,
     on_status: Callable[[str], None],
+    events: CmlEvents | None = None,
 ) -> ManagerClient:
     manager_nodes = [n for n in lab.nodes() if n.node_definition == "cat-sdwan-manager"]
     if len(manager_nodes) <= 1:
@@ -440,8 +454,13 @@ def _restore_cluster(
     client = wait_for_manager(manager_host, manager_port, manager_user, manager_password, version)
 
     on_status("Waiting for secondary managers to boot...")
-    for node in secondary_managers:
-        node.wait_until_converged()
+    wait_all_converged(
+        secondary_managers,
+        on_progress=lambda done, total: on_status(
+            f"Waiting for secondary managers to boot ({done}/{total})..."
+        ),
+        events=events,
+    )
 
     for node in secondary_managers:
         m = re.search(r"<system-ip>100\.0\.0\.(\d+)</system-ip>", node.configuration or "")
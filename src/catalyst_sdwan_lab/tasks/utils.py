@@ -1,6 +1,7 @@
 import datetime
 import gzip
 import hashlib
+import itertools
 import json
 import logging
 import os
@@ -9,7 +10,7 @@ import tarfile
 import time
 import webbrowser
 from collections.abc import Callable, Iterator
-from concurrent.futures import ThreadPoolExecutor
+from concurrent import futures
 from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
@@ -27,8 +28,20 @@ from rich.progress import Progress, SpinnerColumn, TaskID, TextColumn
 from virl2_client import ClientLibrary
 from virl2_client.exceptions import APIError
 from virl2_client.models.lab import Lab
-
-from catalyst_sdwan_lab.manager_client import ManagerAPIError, ManagerClient
+from virl2_client.models.node import Node
+
+from catalyst_sdwan_lab import api_stats
+from catalyst_sdwan_lab.cml_events import CmlEvents
+from catalyst_sdwan_lab.device_watcher import DeviceStateWatcher
+from catalyst_sdwan_lab.lab_index import MANAGER_NOTE_RE, labs_by_title
+from catalyst_sdwan_lab.lab_snapshot import LabSnapshot
+from catalyst_sdwan_lab.manager_client import (
+    INVENTORY_CACHE_TTLS,
+    ManagerAPIError,
+    ManagerClient,
+    fan_out,
+)
+from catalyst_sdwan_lab.polling import Backoff, poll
 
 console = Console()
 log = logging.getLogger(__name__)
@@ -71,7 +84,7 @@ def connect_cml(cml_host: str, cml_user: str, cml_password: str) -> ClientLibrar
 
 
 def connect_manager(host: str, port: int, username: str, password: str) -> ManagerClient:
-    client = ManagerClient(host, port, username, password)
+    client = ManagerClient(host, port, username, password, cache_ttls=INVENTORY_CACHE_TTLS)
     try:
         client.login()
     except ManagerAPIError as e:
@@ -84,7 +97,21 @@ def basic_configuration_path(ip_type: str) -> Path:
     return MANAGER_CONFIGS_DIR / f"basic_configuration_{ip_type}.tar.gz"
 
 
-_MANAGER_NOTE_RE = re.compile(r"manager_external_ip\s*=\s*(.+):(\d+)")
+def upload_progress(
+    message: str, on_status: Callable[[str], None]
+) -> Callable[[int, int], None]:
+    # an on_progress callback for ManagerClient uploads showing message with a percentage
+    last = -1
+
+    def report(sent: int, total: int) -> None:
+        nonlocal last
+        percent = sent * 100 // total if total else 100
+        if percent != last:
+            last = percent
+            on_status(f"{message} ({percent}%)...")
+
+    return report
+
 
 _CRYPT64 = "./0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
 _SHA512_TRANSPOSE = (
@@ -219,18 +246,33 @@ def sign_device_cert(
     device_ip: str,
     *,
     pki: Literal["enterprise", "cisco"] = "enterprise",
+    watcher: DeviceStateWatcher | None = None,
+) -> None:
+    # called from executor threads — keep off the shared requests.Session
+    with client.worker_session():
+        _sign_device_cert(client, certs, device_ip, pki=pki, watcher=watcher)
+
+
+def _sign_device_cert(
+    client: ManagerClient,
+    certs: Certs,
+    device_ip: str,
+    *,
+    pki: Literal["enterprise", "cisco"],
+    watcher: DeviceStateWatcher | None,
 ) -> None:
     try:
         csr, uuid = client.generate_csr(device_ip)
         if pki == "cisco":
-            deadline = time.time() + 300
-            while time.time() < deadline:
-                for ctrl in client.get_controllers():
-                    if ctrl.get("uuid") == uuid and ctrl.get("certInstallStatus") == "Installed":
-                        log.info("Certificate installed for %s", device_ip)
-                        return
-                time.sleep(10)
-            raise ManagerAPIError(f"Certificate not installed for {device_ip} within 300s")
+            if (watcher or DeviceStateWatcher(client)).wait_all(
+                "controllers", [uuid], lambda c: c.get("certInstallStatus") == "Installed",
+                timeout=CERT_INSTALL_TIMEOUT, label="Cisco PKI certificate",
+            ):
+                raise ManagerAPIError(
+                    f"Certificate not installed for {device_ip} within {CERT_INSTALL_TIMEOUT}s"
+                )
+            log.info("Certificate installed for %s", device_ip)
+            return
         cert = sign_csr(certs.cert, certs.key, csr)
         task_id = client.install_signed_cert(cert)
         client.wait_for_task(task_id)
@@ -266,11 +308,8 @@ def verify_cml_version(cml: ClientLibrary) -> None:
         raise typer.Exit(1)
 
 
-def detect_ip_type(lab: Lab) -> str:
-    ctrl = next(
-        (n for n in lab.nodes() if n.node_definition == "cat-sdwan-controller"),
-        None,
-    )
+def detect_ip_type(snapshot: LabSnapshot) -> str:
+    ctrl = next(iter(snapshot.nodes("cat-sdwan-controller")), None)
     if ctrl is None:
         return "v4"
     cfg = ctrl.configuration or ""
@@ -284,7 +323,7 @@ def detect_ip_type(lab: Lab) -> str:
 
 
 def find_lab(cml: ClientLibrary, lab_name: str) -> tuple[Lab, str, int]:
-    labs = cml.find_labs_by_title(lab_name)
+    labs = labs_by_title(cml, lab_name)
     if not labs:
         log.error("No lab found with name '%s'.", lab_name)
         raise typer.Exit(1)
@@ -295,7 +334,7 @@ def find_lab(cml: ClientLibrary, lab_name: str) -> tuple[Lab, str, int]:
     if not lab.notes:
         log.error("Lab '%s' has no notes — was it created by this tool?", lab_name)
         raise typer.Exit(1)
-    m = _MANAGER_NOTE_RE.search(lab.notes)
+    m = MANAGER_NOTE_RE.search(lab.notes)
     if not m:
         log.error("Cannot find Manager IP in lab notes — was this lab created by this tool?")
         raise typer.Exit(1)
@@ -344,38 +383,129 @@ def check_serial_file_match(topology: dict[str, Any], serial_file: Path) -> None
         raise typer.Exit(1)
 
 
+# vedgeCertificateState of an onboarded edge
+_ONBOARDED_STATE = "certinstalled"
+
+
+def _edge_onboarded(v: dict[str, Any]) -> bool:
+    return v.get("certInstallStatus") == "Installed" and v.get("reachability") == "reachable"
+
+
 def wait_for_edges_onboarded(
     client: ManagerClient,
     uuids: list[str],
     *,
     timeout: int = 600,
     on_progress: Callable[[int, int], None] | None = None,
+    watcher: DeviceStateWatcher | None = None,
 ) -> None:
-    pending = set(uuids)
     total = len(uuids)
-    deadline = time.time() + timeout
-    while pending and time.time() < deadline:
-        for v in client.get_vedges():
-            uuid = v.get("uuid", "")
-            if (
-                uuid in pending
-                and v.get("certInstallStatus") == "Installed"
-                and v.get("reachability") == "reachable"
-            ):
-                pending.discard(uuid)
-                log.info("Edge %s onboarded", uuid)
-                if on_progress:
-                    on_progress(total - len(pending), total)
-        if pending:
-            time.sleep(10)
+    onboarded = 0
+
+    def ready(uuid: str, _: dict[str, Any]) -> None:
+        nonlocal onboarded
+        onboarded += 1
+        log.info("Edge %s onboarded", uuid)
+        if on_progress:
+            on_progress(onboarded, total)
+
+    pending = (watcher or DeviceStateWatcher(client)).wait_all(
+        "vedges",
+        uuids,
+        _edge_onboarded,
+        timeout=timeout,
+        label="Edge onboarding",
+        on_ready=ready,
+        states={_ONBOARDED_STATE},
+    )
     if pending:
         log.error("Timed out waiting for edges to onboard: %s", ", ".join(sorted(pending)))
         raise typer.Exit(1)
 
+
+# virl2_client's own default: 500 convergence checks 5 s apart
+NODE_CONVERGE_TIMEOUT = 2500
+_CONVERGE_BACKOFF = Backoff(floor=2, ceiling=5)
+# with the CML event feed, nodes are only polled when no event arrived for this long
+_CONVERGE_EVENT_FALLBACK = 30
+
+
+def wait_all_converged(
+    nodes: list[Node],
+    *,
+    timeout: float = NODE_CONVERGE_TIMEOUT,
+    on_progress: Callable[[int, int], None] | None = None,
+    on_ready: Callable[[Node], None] | None = None,
+    events: CmlEvents | None = None,
+) -> None:
+    # on_ready runs per node as it converges; with events, CML is asked only now and then
+    pending = list(nodes)
+    total = len(pending)
+    booted = {node: events.booted(node) for node in pending} if events else {}
+    waited = 0.0
+    attempt = 0
+    # the first round always asks CML: a node may have booted before the listener started
+    ask = True
+    while pending:
+        started = time.monotonic()
+        ready = [
+            node for node in pending
+            if (node in booted and booted[node].done()) or (ask and node.has_converged())
+        ]
+        waited += time.monotonic() - started
+        for node in ready:
+            pending.remove(node)
+            log.info("Node %s converged", node.label)
+            if on_progress:
+                on_progress(total - len(pending), total)
+            if on_ready:
+                on_ready(node)
+        if not pending:
+            return
+        if waited >= timeout:
+            log.error(
+                "Timed out waiting for nodes to boot: %s",
+                ", ".join(sorted(node.label for node in pending)),
+            )
+            raise typer.Exit(1)
+        if booted:
+            started = time.monotonic()
+            done, _ = futures.wait(
+                [booted[node] for node in pending],
+                timeout=min(_CONVERGE_EVENT_FALLBACK, timeout - waited),
+                return_when=futures.FIRST_COMPLETED,
+            )
+            waited += time.monotonic() - started
+            ask = not done
+        else:
+            delay = min(_CONVERGE_BACKOFF.interval(attempt), timeout - waited)
+            attempt = 0 if ready else attempt + 1
+            time.sleep(delay)
+            waited += delay
+
+
 VALIDATOR_FQDN = "validator.sdwan.local"
 
-MANAGER_BOOT_RETRIES = 120
+MANAGER_BOOT_TIMEOUT = 3600
 MANAGER_BOOT_INTERVAL = 30
+# with the boot diagnostic, probes come at a quarter of the estimated time left, within
+# these bounds; logins are only tried once every service is up
+_BOOT_MIN_INTERVAL = 2
+_BOOT_READY_INTERVAL = 5
+
+# the NMS restart after a cluster change usually takes 2-5 minutes, much longer on a
+# loaded host
+MANAGER_RESTART_TIMEOUT = 1800
+# a restart not seen starting by then is assumed to have been over before the first probe
+_RESTART_START_TIMEOUT = 120
+_RESTART_PROBE_BACKOFF = Backoff(floor=2, ceiling=10)
+
+CERT_INSTALL_TIMEOUT = 300
+SIGN_WORKERS = 4
+
+_CLUSTER_READY_BACKOFF = Backoff(floor=2, ceiling=10)
+# device code flow: Cisco's token endpoint expects the advertised fixed interval
+_DEVICE_CODE_BACKOFF = Backoff(floor=5, ceiling=5, jitter=0)
 
 
 def extract_org_name(path: Path) -> str:
@@ -405,30 +535,94 @@ def wait_for_manager(
     on_status: Callable[[str], None] = lambda _: None,
 ) -> ManagerClient:
     use_diagnostic = int(version.split(".")[0]) >= 26
-    client = ManagerClient(manager_ip, manager_port, manager_user, manager_password)
-    for _ in range(MANAGER_BOOT_RETRIES):
+    client = ManagerClient(
+        manager_ip, manager_port, manager_user, manager_password,
+        cache_ttls=INVENTORY_CACHE_TTLS,
+    )
+
+    base_url = f"https://{manager_ip}:{manager_port}"
+    progress = _BootProgress()
+
+    def logged_in() -> bool:
         if use_diagnostic:
-            boot = _query_boot_diagnostic(manager_ip, manager_port)
+            boot = _query_boot_diagnostic(base_url)
             if boot:
-                active, total = boot
-                on_status(f"SD-WAN Manager booting ({active}/{total} services)...")
-        try:
-            client.login()
-            log.info("SD-WAN Manager login successful")
-            return client
-        except (ManagerAPIError, requests.exceptions.RequestException):
-            pass
-        time.sleep(MANAGER_BOOT_INTERVAL)
+                progress.update(*boot)
+                on_status(f"SD-WAN Manager booting ({progress.describe()})...")
+                if not progress.ready:
+                    return False
+        client.login()
+        return True
+
+    if poll(
+        logged_in,
+        timeout=MANAGER_BOOT_TIMEOUT,
+        backoff=progress.interval,
+        label="Manager boot",
+        retry_on=(ManagerAPIError, requests.exceptions.RequestException),
+    ):
+        log.info("SD-WAN Manager login successful")
+        return client
     log.error("SD-WAN Manager did not become available within 60 minutes.")
     raise typer.Exit(1)
 
 
-def _query_boot_diagnostic(ip: str, port: int) -> tuple[int, int] | None:
+# service activation seen through the boot diagnostic, for pacing probes and an ETA
+class _BootProgress:
+    _BACKOFF = Backoff(floor=5, ceiling=MANAGER_BOOT_INTERVAL)
+
+    def __init__(self) -> None:
+        self.active = self.total = 0
+        self._first: tuple[float, int] | None = None
+        self._last: tuple[float, int] | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.total > 0 and self.active >= self.total
+
+    def update(self, active: int, total: int) -> None:
+        now = time.monotonic()
+        # services can drop out while the NMS restarts itself mid-boot; measure afresh
+        if self._first is None or active < self._first[1]:
+            self._first = (now, active)
+        self._last = (now, active)
+        self.active, self.total = active, total
+
+    def eta(self) -> float | None:
+        # seconds until every service is active at the rate seen so far
+        if self._first is None or self._last is None:
+            return None
+        (t0, a0), (t1, a1) = self._first, self._last
+        if a1 <= a0:
+            return None
+        return (self.total - a1) * (t1 - t0) / (a1 - a0)
+
+    def interval(self, attempt: int) -> float:
+        if not self.total:
+            # no diagnostic: login attempts back off as they always did
+            return self._BACKOFF.interval(attempt)
+        if self.ready:
+            return _BOOT_READY_INTERVAL
+        eta = self.eta()
+        if eta is None:
+            return self._BACKOFF.interval(attempt)
+        return min(max(eta / 4, _BOOT_MIN_INTERVAL), MANAGER_BOOT_INTERVAL)
+
+    def describe(self) -> str:
+        text = f"{self.active}/{self.total} services"
+        eta = self.eta()
+        if eta is not None and not self.ready:
+            text += f", ~{max(1, round(eta / 60))} min left"
+        return text
+
+
+def _query_boot_diagnostic(base_url: str) -> tuple[int, int] | None:
     try:
         response = requests.get(
-            f"https://{ip}:{port}/diagnostic/api/v1/boot",
+            f"{base_url}/diagnostic/api/v1/boot",
             verify=False,
             timeout=5,
+            hooks={"response": api_stats.recorder.record_response},
         )
         if response.status_code == 200:
             data = response.json()
@@ -438,6 +632,51 @@ def _query_boot_diagnostic(ip: str, port: int) -> tuple[int, int] | None:
     return None
 
 
+def wait_for_manager_restart(
+    base_url: str,
+    *,
+    timeout: float = MANAGER_RESTART_TIMEOUT,
+    on_status: Callable[[str], None] = lambda _: None,
+) -> None:
+    # wait out an NMS restart: the Manager stops serving, then serves again
+    if not poll(
+        lambda: not _manager_serving(base_url, on_status),
+        timeout=_RESTART_START_TIMEOUT,
+        backoff=_RESTART_PROBE_BACKOFF,
+        label="Manager restart start",
+    ):
+        log.info("SD-WAN Manager restart not observed — assuming it already completed")
+        return
+    if poll(
+        lambda: _manager_serving(base_url, on_status),
+        timeout=timeout,
+        backoff=_RESTART_PROBE_BACKOFF,
+        label="Manager restart",
+    ):
+        log.info("SD-WAN Manager is back after restart")
+        return
+    log.error("SD-WAN Manager did not come back within %d minutes.", timeout // 60)
+    raise typer.Exit(1)
+
+
+def _manager_serving(base_url: str, on_status: Callable[[str], None]) -> bool:
+    # all boot services active (where the diagnostic API exists) and the login page up
+    boot = _query_boot_diagnostic(base_url)
+    if boot:
+        active, total = boot
+        if active < total:
+            on_status(f"SD-WAN Manager restarting ({active}/{total} services)...")
+            return False
+    try:
+        response = requests.get(
+            f"{base_url}/", verify=False, timeout=5, allow_redirects=False,
+            hooks={"response": api_stats.recorder.record_response},
+        )
+    except requests.exceptions.RequestException:
+        return False
+    return response.status_code < 500
+
+
 def _cisco_services_registered(services: list[dict[str, Any]]) -> bool:
     return any(s.get("user_id", "—") not in ("—", "", None) for s in services)
 
@@ -477,12 +716,10 @@ def _ensure_cisco_services(
     if on_status:
         on_status(f"Waiting for Cisco account registration — open {url}")
 
-    deadline = time.time() + expires_in
-    while time.time() < deadline:
-        if client.poll_cisco_account_token(user_code):
-            break
-        time.sleep(5)
-    else:
+    if not poll(
+        lambda: client.poll_cisco_account_token(user_code),
+        timeout=expires_in, backoff=_DEVICE_CODE_BACKOFF, label="Cisco account registration",
+    ):
         raise ManagerAPIError("Cisco account registration timed out")
 
     if on_status:
@@ -590,15 +827,22 @@ def onboard_control_components(
     pki: Literal["enterprise", "cisco"] = "enterprise",
 ) -> None:
     total = len(components)
-    for i, (ip, personality) in enumerate(components, 1):
-        on_status(f"Adding control components ({i}/{total})...")
+    added = itertools.count(1)
+
+    def add(component: tuple[str, str]) -> None:
+        ip, personality = component
         try:
             client.add_controller(ip, personality, "admin", "admin")
         except ManagerAPIError as e:
-            if "already exists" in str(e):
-                log.debug("%s (%s) already exists — skipping", personality, ip)
-            else:
+            if "already exists" not in str(e):
                 raise
+            log.debug("%s (%s) already exists — skipping", personality, ip)
+
+    on_status(f"Adding control components (0/{total})...")
+    fan_out(
+        client, add, components, key=lambda c: f"{c[1]} {c[0]}",
+        on_done=lambda _: on_status(f"Adding control components ({next(added)}/{total})..."),
+    )
 
     controllers = client.get_controllers()
     on_status("Signing certificates for control components...")
@@ -607,10 +851,13 @@ def onboard_control_components(
         for d in controllers
         if d.get("serialNumber") == "No certificate installed" and d.get("deviceIP")
     ]
-    with ThreadPoolExecutor() as pool:
-        futures = [pool.submit(sign_device_cert, client, certs, ip, pki=pki) for ip in pending]
-        for f in futures:
-            f.result()
+    watcher = DeviceStateWatcher(client)
+    # CSR generation is capped at two in flight by the request budget anyway
+    fan_out(
+        client,
+        lambda ip: sign_device_cert(client, certs, ip, pki=pki, watcher=watcher),
+        pending, workers=SIGN_WORKERS,
+    )
 
 
 def trigger_rediscovery(client: ManagerClient) -> None:
@@ -679,8 +926,7 @@ def configure_controller_network_settings(
     if not uuids:
         log.debug("No controllers to configure — skipping")
         return
-    for uuid in uuids:
-        client.convert_control_component_to_settings(uuid)
+    fan_out(client, client.convert_control_component_to_settings, uuids)
     client.configure_control_component_network_settings(CONTROLLER_NETWORK_SETTINGS)
     task_id = client.deploy_control_component_settings(uuids)
     client.wait_for_task(task_id)
@@ -693,6 +939,7 @@ def ensure_cluster_ip_configured(
     manager_password: str,
     on_status: Callable[[str], None] = lambda _: None,
     persona: str = "COMPUTE_AND_DATA",
+    restart_timeout: float = MANAGER_RESTART_TIMEOUT,
 ) -> None:
     cluster_list = client.get_cluster_management_list()
     entry = cluster_list[0] if cluster_list else {}
@@ -708,7 +955,7 @@ def ensure_cluster_ip_configured(
     client.setup_cluster_ip(cluster_ip, persona, manager_user, manager_password)
     log.info("Cluster IP configured: %s — waiting for NMS restart.", cluster_ip)
     on_status("Waiting for Manager to restart after cluster IP setup...")
-    time.sleep(120)
+    wait_for_manager_restart(client.base_url, timeout=restart_timeout, on_status=on_status)
 
 
 def enroll_cluster_manager(
@@ -724,6 +971,7 @@ def enroll_cluster_manager(
     pki: Literal["enterprise", "cisco"],
     label: str,
     on_status: Callable[[str], None] = lambda _: None,
+    restart_timeout: float = MANAGER_RESTART_TIMEOUT,
 ) -> ManagerClient:
     # cluster IPs are 172.16.254.N and VPN0 IPs are 172.16.0.N
     # — same last octet by deploy convention
@@ -732,25 +980,22 @@ def enroll_cluster_manager(
     client.add_cluster_node(cluster_ip, persona, manager_user, manager_password)
     client.logout()
     on_status(f"Waiting for Manager to restart after adding {label}...")
-    time.sleep(120)
+    wait_for_manager_restart(client.base_url, timeout=restart_timeout, on_status=on_status)
     client = wait_for_manager(manager_host, manager_port, manager_user, manager_password, version)
     on_status(f"Waiting for {label} to be ready in cluster...")
 
-    uuid: str | None = None
-    deadline = time.time() + 600
-    while time.time() < deadline:
-        try:
-            entries = client.get_cluster_management_list()
-            for n in (entries[0].get("data", []) if entries else []):
-                cfg = n.get("configJson", {})
-                if cfg.get("deviceIP") == cluster_ip and cfg.get("state", "").lower() == "ready":
-                    uuid = cfg.get("uuid")
-                    break
-            if uuid:
-                break
-        except ManagerAPIError:
-            pass
-        time.sleep(10)
+    def ready_uuid() -> str | None:
+        entries = client.get_cluster_management_list()
+        for n in (entries[0].get("data", []) if entries else []):
+            cfg = n.get("configJson", {})
+            if cfg.get("deviceIP") == cluster_ip and cfg.get("state", "").lower() == "ready":
+                return cfg.get("uuid")
+        return None
+
+    uuid = poll(
+        ready_uuid, timeout=600, backoff=_CLUSTER_READY_BACKOFF, label="Cluster node ready",
+        retry_on=(ManagerAPIError,),
+    )
     if not uuid:
         raise ManagerAPIError(f"Cluster node {cluster_ip} did not reach Ready state.")
 
@@ -793,6 +1038,7 @@ def run_sastre_task(
         username=manager_user,
         password=manager_password,
     ) as api:
+        api.session.hooks["response"].append(api_stats.recorder.record_response)
         output = task.runner(task_args, api)
         if output:
             for entry in output:
@@ -0,0 +1,22 @@
+from collections.abc import Callable
+from unittest.mock import MagicMock
+
+import pytest
+
+from catalyst_sdwan_lab import lab_index
+
+
+@pytest.fixture
+def cml_with_labs(monkeypatch: pytest.MonkeyPatch) -> Callable[..., MagicMock]:
+    """Factory for a CML client whose lab listing holds labs, all with the same title."""
+
+    def make(labs: list[MagicMock], title: str = "lab") -> MagicMock:
+        cml = MagicMock()
+        monkeypatch.setattr(lab_index, "_lab_tiles", lambda _cml: {
+            f"lab{i}": {"lab_title": title, "lab_notes": lab.notes} for i, lab in enumerate(labs)
+        })
+        cml.join_existing_lab.side_effect = lambda lab_id: labs[int(lab_id[3:])]
+        lab_index.invalidate(cml)
+        return cml
+
+    return make
@@ -1,9 +1,13 @@
+from collections.abc import Callable, Iterator
 from unittest.mock import MagicMock, patch
 
 import pytest
 from typer import Exit
+from virl2_client.exceptions import InterfaceNotFound
 
+from catalyst_sdwan_lab.lab_snapshot import LabSnapshot
 from catalyst_sdwan_lab.manager_client import ManagerAPIError, ManagerClient
+from catalyst_sdwan_lab.polling import Backoff
 from catalyst_sdwan_lab.tasks.add import (
     _CTRL_NUM_RE,
     _EDGE_NUM_RE,
@@ -11,10 +15,14 @@ from catalyst_sdwan_lab.tasks.add import (
     _VLDTR_NUM_RE,
     _add_sdwan_node,
     _add_to_manager_retrying,
-    _add_wan_edge_node,
+    _add_wan_edge_nodes,
+    _config_group_schema,
     _drop_unsupported_variables,
+    _filter_device_variables,
     _next_device_num,
     _next_system_ip_num,
+    _scan_vedges,
+    _sync_until_interfaces,
     _wait_for_controllers_ready,
     _wait_for_csrs,
 )
@@ -36,56 +44,67 @@ def _make_lab(nodes: list[MagicMock], notes: str = "") -> MagicMock:
     return lab
 
 
+def _found_interfaces(lab: MagicMock, wanted: list, **kwargs: object) -> dict:
+    return {w: MagicMock() for w in wanted}
+
+
+def _snapshot(nodes: list[MagicMock]) -> LabSnapshot:
+    return LabSnapshot(_make_lab(nodes))
+
+
 class TestFindLab:
-    def test_exits_if_no_lab(self) -> None:
-        cml = MagicMock()
-        cml.find_labs_by_title.return_value = []
+    def test_exits_if_no_lab(self, cml_with_labs: Callable[..., MagicMock]) -> None:
+        cml = cml_with_labs([], "mylab")
         with pytest.raises(Exit):
             find_lab(cml, "mylab")
 
-    def test_exits_if_multiple_labs(self) -> None:
-        cml = MagicMock()
-        cml.find_labs_by_title.return_value = [MagicMock(), MagicMock()]
+    def test_exits_if_multiple_labs(self, cml_with_labs: Callable[..., MagicMock]) -> None:
+        cml = cml_with_labs([MagicMock(), MagicMock()], "mylab")
         with pytest.raises(Exit):
             find_lab(cml, "mylab")
 
-    def test_exits_if_no_notes(self) -> None:
-        cml = MagicMock()
+    def test_exits_if_no_notes(self, cml_with_labs: Callable[..., MagicMock]) -> None:
         lab = MagicMock()
         lab.notes = None
-        cml.find_labs_by_title.return_value = [lab]
+        cml = cml_with_labs([lab], "mylab")
         with pytest.raises(Exit):
             find_lab(cml, "mylab")
 
-    def test_exits_if_notes_missing_manager_ip(self) -> None:
-        cml = MagicMock()
+    def test_exits_if_notes_missing_manager_ip(
+        self, cml_with_labs: Callable[..., MagicMock]
+    ) -> None:
         lab = _make_lab([], notes="no manager info here")
-        cml.find_labs_by_title.return_value = [lab]
+        cml = cml_with_labs([lab], "mylab")
         with pytest.raises(Exit):
             find_lab(cml, "mylab")
 
-    def test_returns_lab_ip_port(self) -> None:
-        cml = MagicMock()
+    def test_returns_lab_ip_port(self, cml_with_labs: Callable[..., MagicMock]) -> None:
         lab = _make_lab([], notes="manager_external_ip = 10.0.0.1:8443\n")
-        cml.find_labs_by_title.return_value = [lab]
+        cml = cml_with_labs([lab], "mylab")
         result_lab, ip, port = find_lab(cml, "mylab")
         assert result_lab is lab
         assert ip == "10.0.0.1"
         assert port == 8443
 
+    def test_other_titles_ignored(self, cml_with_labs: Callable[..., MagicMock]) -> None:
+        cml = cml_with_labs([_make_lab([])], "otherlab")
+        with pytest.raises(Exit):
+            find_lab(cml, "mylab")
+        cml.join_existing_lab.assert_not_called()
+
 
 class TestDetectIpType:
     def test_no_controller_node_defaults_to_v4(self) -> None:
-        lab = _make_lab([_make_node("Manager"), _make_node("Gateway")])
-        assert detect_ip_type(lab) == "v4"
+        snapshot = _snapshot([_make_node("Manager"), _make_node("Gateway")])
+        assert detect_ip_type(snapshot) == "v4"
 
     def test_v4_config(self) -> None:
         node = _make_node("ctrl", configuration="ip address 172.16.0.101/24", node_definition="cat-sdwan-controller")
-        assert detect_ip_type(_make_lab([node])) == "v4"
+        assert detect_ip_type(_snapshot([node])) == "v4"
 
     def test_v6_config(self) -> None:
         node = _make_node("ctrl", configuration="ipv6 address fc00:172:16::101/64", node_definition="cat-sdwan-controller")
-        assert detect_ip_type(_make_lab([node])) == "v6"
+        assert detect_ip_type(_snapshot([node])) == "v6"
 
     def test_dual_config(self) -> None:
         node = _make_node(
@@ -93,74 +112,109 @@ class TestDetectIpType:
             configuration="172.16.0.101/24\nfc00:172:16::101/64",
             node_definition="cat-sdwan-controller",
         )
-        assert detect_ip_type(_make_lab([node])) == "dual"
+        assert detect_ip_type(_snapshot([node])) == "dual"
 
     def test_validator_node_not_used_as_reference(self) -> None:
         node = _make_node("vldtr", configuration="fc00:172:16::201/64", node_definition="cat-sdwan-validator")
-        assert detect_ip_type(_make_lab([node])) == "v4"
+        assert detect_ip_type(_snapshot([node])) == "v4"
 
     def test_none_configuration_treated_as_v4(self) -> None:
         node = _make_node("ctrl", configuration=None, node_definition="cat-sdwan-controller")  # type: ignore[arg-type]
-        assert detect_ip_type(_make_lab([node])) == "v4"
+        assert detect_ip_type(_snapshot([node])) == "v4"
 
 
 class TestNextDeviceNum:
     def test_no_existing_returns_01(self) -> None:
-        lab = _make_lab([_make_node("Manager"), _make_node("Gateway")])
-        assert _next_device_num(lab, _CTRL_NUM_RE) == "01"
+        snapshot = _snapshot([_make_node("Manager"), _make_node("Gateway")])
+        assert _next_device_num(snapshot, _CTRL_NUM_RE) == "01"
 
     def test_increments_from_highest(self) -> None:
-        lab = _make_lab([_make_node("Controller01"), _make_node("Controller03")])
-        assert _next_device_num(lab, _CTRL_NUM_RE) == "04"
+        snapshot = _snapshot([_make_node("Controller01"), _make_node("Controller03")])
+        assert _next_device_num(snapshot, _CTRL_NUM_RE) == "04"
 
     def test_zero_pads_single_digit(self) -> None:
-        lab = _make_lab([_make_node("Controller08")])
-        assert _next_device_num(lab, _CTRL_NUM_RE) == "09"
+        snapshot = _snapshot([_make_node("Controller08")])
+        assert _next_device_num(snapshot, _CTRL_NUM_RE) == "09"
 
     def test_validator_regex_ignores_controllers(self) -> None:
-        lab = _make_lab([_make_node("Controller01"), _make_node("Validator02")])
-        assert _next_device_num(lab, _VLDTR_NUM_RE) == "03"
+        snapshot = _snapshot([_make_node("Controller01"), _make_node("Validator02")])
+        assert _next_device_num(snapshot, _VLDTR_NUM_RE) == "03"
 
     def test_edge_regex_ignores_controllers_and_validators(self) -> None:
-        lab = _make_lab([_make_node("Controller01"), _make_node("Validator01"), _make_node("Edge03")])
-        assert _next_device_num(lab, _EDGE_NUM_RE) == "04"
+        snapshot = _snapshot([_make_node("Controller01"), _make_node("Validator01"), _make_node("Edge03")])
+        assert _next_device_num(snapshot, _EDGE_NUM_RE) == "04"
 
     def test_sdrouting_regex_ignores_edges(self) -> None:
-        lab = _make_lab([_make_node("Edge01"), _make_node("SD-Edge02")])
-        assert _next_device_num(lab, _SDROUTING_NUM_RE) == "03"
+        snapshot = _snapshot([_make_node("Edge01"), _make_node("SD-Edge02")])
+        assert _next_device_num(snapshot, _SDROUTING_NUM_RE) == "03"
+
+
+class TestScanVedges:
+    def test_free_and_addressed_filtered_by_the_manager(self) -> None:
+        client = MagicMock()
+        unclaimed = [
+            {"uuid": "a", "certInstallStatus": None},
+            {"uuid": "d", "system-ip": "10.0.0.4"},
+        ]
+        claimed = [
+            {"uuid": "c", "certInstallStatus": "Installed", "system-ip": "10.0.0.3"},
+            {"uuid": "d", "system-ip": "10.0.0.4"},
+        ]
+        client.iter_vedges.side_effect = [iter(unclaimed), iter(claimed)]
+        free, addressed = _scan_vedges(client, "vedge-C8000V", 5)
+        assert free == ["a", "d"]
+        assert [v["uuid"] for v in addressed] == ["c", "d"]
+        assert client.iter_vedges.call_args_list[0].kwargs == {
+            "model": "vedge-C8000V", "states": ("tokengenerated", "bootstrapconfiggenerated"),
+        }
+        assert "certinstalled" in client.iter_vedges.call_args_list[1].kwargs["states"]
+
+    def test_stops_reading_free_uuids_at_count(self) -> None:
+        client = MagicMock()
+        read: list[str] = []
+
+        def unclaimed() -> Iterator[dict]:
+            for uuid in ("a", "b", "c"):
+                read.append(uuid)
+                yield {"uuid": uuid}
+
+        client.iter_vedges.side_effect = [unclaimed(), iter([])]
+        free, _ = _scan_vedges(client, "vedge-C8000V", 2)
+        assert free == ["a", "b"]
+        assert read == ["a", "b"]
 
 
 class TestNextSystemIpNum:
     def test_no_devices_returns_1(self) -> None:
-        lab = _make_lab([])
-        assert _next_system_ip_num(lab, []) == 1
+        snapshot = _snapshot([])
+        assert _next_system_ip_num(snapshot, []) == 1
 
     def test_uses_manager_system_ip(self) -> None:
-        lab = _make_lab([])
+        snapshot = _snapshot([])
         vedges = [{"system-ip": "10.0.0.3"}]
-        assert _next_system_ip_num(lab, vedges) == 4
+        assert _next_system_ip_num(snapshot, vedges) == 4
 
     def test_uses_cml_edge_label(self) -> None:
-        lab = _make_lab([_make_node("Edge05")])
-        assert _next_system_ip_num(lab, []) == 6
+        snapshot = _snapshot([_make_node("Edge05")])
+        assert _next_system_ip_num(snapshot, []) == 6
 
     def test_uses_cml_sdrouting_label(self) -> None:
-        lab = _make_lab([_make_node("SD-Edge03")])
-        assert _next_system_ip_num(lab, []) == 4
+        snapshot = _snapshot([_make_node("SD-Edge03")])
+        assert _next_system_ip_num(snapshot, []) == 4
 
     def test_takes_max_of_manager_and_cml(self) -> None:
-        lab = _make_lab([_make_node("Edge02")])
+        snapshot = _snapshot([_make_node("Edge02")])
         vedges = [{"system-ip": "10.0.0.5"}]
-        assert _next_system_ip_num(lab, vedges) == 6
+        assert _next_system_ip_num(snapshot, vedges) == 6
 
     def test_ignores_malformed_system_ip(self) -> None:
-        lab = _make_lab([])
+        snapshot = _snapshot([])
         vedges = [{"system-ip": ""}, {"system-ip": "not-an-ip"}, {"system-ip": "10.0.0.2"}]
-        assert _next_system_ip_num(lab, vedges) == 3
+        assert _next_system_ip_num(snapshot, vedges) == 3
 
     def test_both_edge_and_sdrouting_labels_considered(self) -> None:
-        lab = _make_lab([_make_node("Edge03"), _make_node("SD-Edge05")])
-        assert _next_system_ip_num(lab, []) == 6
+        snapshot = _snapshot([_make_node("Edge03"), _make_node("SD-Edge05")])
+        assert _next_system_ip_num(snapshot, []) == 6
 
 
 class TestAddSdwanNode:
@@ -186,7 +240,9 @@ class TestAddSdwanNode:
     def test_first_node_placed_at_120_0(self, mock_sync: MagicMock) -> None:
         mock_sync.return_value = MagicMock()
         lab = self._make_lab([self._make_vpn0()])
-        _add_sdwan_node(lab, "Controller01", "cat-sdwan-controller", "img", "cfg", "eth1")
+        _add_sdwan_node(
+            LabSnapshot(lab), "Controller01", "cat-sdwan-controller", "img", "cfg", "eth1"
+        )
         kwargs = lab.create_node.call_args[1]
         assert kwargs["x"] == 120  # 0 + 120
         assert kwargs["y"] == 0
@@ -195,7 +251,9 @@ class TestAddSdwanNode:
     def test_extends_from_rightmost_sdwan_node(self, mock_sync: MagicMock) -> None:
         mock_sync.return_value = MagicMock()
         lab = self._make_lab([self._make_sdwan_node(300, 0), self._make_vpn0()])
-        _add_sdwan_node(lab, "Controller02", "cat-sdwan-controller", "img", "cfg", "eth1")
+        _add_sdwan_node(
+            LabSnapshot(lab), "Controller02", "cat-sdwan-controller", "img", "cfg", "eth1"
+        )
         assert lab.create_node.call_args[1]["x"] == 420  # 300 + 120
 
     @patch("catalyst_sdwan_lab.tasks.add._sync_until_interface")
@@ -203,7 +261,9 @@ class TestAddSdwanNode:
         mock_sync.return_value = MagicMock()
         lab = self._make_lab([])
         with pytest.raises(Exit):
-            _add_sdwan_node(lab, "Controller01", "cat-sdwan-controller", "img", "cfg", "eth1")
+            _add_sdwan_node(
+                LabSnapshot(lab), "Controller01", "cat-sdwan-controller", "img", "cfg", "eth1"
+            )
 
     @patch("catalyst_sdwan_lab.tasks.add._sync_until_interface")
     def test_exits_if_vpn0_has_no_free_ports(self, mock_sync: MagicMock) -> None:
@@ -212,7 +272,9 @@ class TestAddSdwanNode:
         vpn0.next_available_interface.return_value = None
         lab = self._make_lab([vpn0])
         with pytest.raises(Exit):
-            _add_sdwan_node(lab, "Controller01", "cat-sdwan-controller", "img", "cfg", "eth1")
+            _add_sdwan_node(
+                LabSnapshot(lab), "Controller01", "cat-sdwan-controller", "img", "cfg", "eth1"
+            )
 
 
 class TestAddEdgeNode:
@@ -235,57 +297,78 @@ class TestAddEdgeNode:
         lab.create_node.return_value = MagicMock()
         return lab
 
-    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interface")
+    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interfaces")
     def test_first_edge_placed_at_y400_x_minus280(self, mock_sync: MagicMock) -> None:
-        mock_sync.return_value = MagicMock()
+        mock_sync.side_effect = _found_interfaces
         lab = self._make_lab([self._make_switch("INET"), self._make_switch("MPLS")])
-        _add_wan_edge_node(lab, "Edge01", "img", "cfg", connect_mpls=True)
+        _add_wan_edge_nodes(LabSnapshot(lab), [("Edge01", "cfg")], "img", connect_mpls=True)
         kwargs = lab.create_node.call_args[1]
         assert kwargs["y"] == 400
         assert kwargs["x"] == -280  # -400 + 120
 
-    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interface")
+    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interfaces")
     def test_extends_from_rightmost_y400_node(self, mock_sync: MagicMock) -> None:
-        mock_sync.return_value = MagicMock()
+        mock_sync.side_effect = _found_interfaces
         lab = self._make_lab([
             self._make_edge_node(200),
             self._make_switch("INET"),
             self._make_switch("MPLS"),
         ])
-        _add_wan_edge_node(lab, "Edge02", "img", "cfg", connect_mpls=True)
+        _add_wan_edge_nodes(LabSnapshot(lab), [("Edge02", "cfg")], "img", connect_mpls=True)
         assert lab.create_node.call_args[1]["x"] == 320  # 200 + 120
 
-    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interface")
+    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interfaces")
+    def test_batch_placed_left_to_right_with_one_interface_sync(self, mock_sync: MagicMock) -> None:
+        mock_sync.side_effect = _found_interfaces
+        lab = self._make_lab([self._make_switch("INET"), self._make_switch("MPLS")])
+        nodes = _add_wan_edge_nodes(
+            LabSnapshot(lab), [("Edge01", "cfg1"), ("Edge02", "cfg2")], "img", connect_mpls=True
+        )
+        assert len(nodes) == 2
+        assert [c[1]["x"] for c in lab.create_node.call_args_list] == [-280, -160]
+        mock_sync.assert_called_once()
+        assert len(mock_sync.call_args[0][1]) == 4
+        assert lab.create_link.call_count == 4
+        lab.nodes.assert_called_once()
+
+    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interfaces")
+    def test_missing_switch_fails_before_creating_nodes(self, mock_sync: MagicMock) -> None:
+        lab = self._make_lab([self._make_switch("INET")])
+        with pytest.raises(Exit):
+            _add_wan_edge_nodes(LabSnapshot(lab), [("Edge01", "cfg")], "img", connect_mpls=True)
+        lab.create_node.assert_not_called()
+
+    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interfaces")
     def test_exits_if_inet_not_found(self, mock_sync: MagicMock) -> None:
-        mock_sync.return_value = MagicMock()
+        mock_sync.side_effect = _found_interfaces
         lab = self._make_lab([self._make_switch("MPLS")])
         with pytest.raises(Exit):
-            _add_wan_edge_node(lab, "Edge01", "img", "cfg", connect_mpls=True)
+            _add_wan_edge_nodes(LabSnapshot(lab), [("Edge01", "cfg")], "img", connect_mpls=True)
 
-    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interface")
+    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interfaces")
     def test_exits_if_mpls_not_found(self, mock_sync: MagicMock) -> None:
-        mock_sync.return_value = MagicMock()
+        mock_sync.side_effect = _found_interfaces
         lab = self._make_lab([self._make_switch("INET")])
         with pytest.raises(Exit):
-            _add_wan_edge_node(lab, "Edge01", "img", "cfg", connect_mpls=True)
+            _add_wan_edge_nodes(LabSnapshot(lab), [("Edge01", "cfg")], "img", connect_mpls=True)
 
-    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interface")
+    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interfaces")
     def test_exits_if_inet_has_no_free_ports(self, mock_sync: MagicMock) -> None:
-        mock_sync.return_value = MagicMock()
+        mock_sync.side_effect = _found_interfaces
         inet = self._make_switch("INET")
         inet.next_available_interface.return_value = None
         lab = self._make_lab([inet, self._make_switch("MPLS")])
         with pytest.raises(Exit):
-            _add_wan_edge_node(lab, "Edge01", "img", "cfg", connect_mpls=True)
+            _add_wan_edge_nodes(LabSnapshot(lab), [("Edge01", "cfg")], "img", connect_mpls=True)
 
-    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interface")
+    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interfaces")
     def test_exits_if_mpls_has_no_free_ports(self, mock_sync: MagicMock) -> None:
-        mock_sync.return_value = MagicMock()
+        mock_sync.side_effect = _found_interfaces
         mpls = self._make_switch("MPLS")
         mpls.next_available_interface.return_value = None
         lab = self._make_lab([self._make_switch("INET"), mpls])
         with pytest.raises(Exit):
-            _add_wan_edge_node(lab, "Edge01", "img", "cfg", connect_mpls=True)
+            _add_wan_edge_nodes(LabSnapshot(lab), [("Edge01", "cfg")], "img", connect_mpls=True)
 
 
 class TestAddSdroutingNode:
@@ -301,37 +384,62 @@ class TestAddSdroutingNode:
         lab.create_node.return_value = MagicMock()
         return lab
 
-    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interface")
+    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interfaces")
     def test_connects_only_inet_not_mpls(self, mock_sync: MagicMock) -> None:
-        mock_sync.return_value = MagicMock()
+        mock_sync.side_effect = _found_interfaces
         lab = self._make_lab([self._make_switch("INET")])
-        _add_wan_edge_node(lab, "SD-Edge1", "img", "cfg", connect_mpls=False)
+        _add_wan_edge_nodes(LabSnapshot(lab), [("SD-Edge1", "cfg")], "img", connect_mpls=False)
         assert lab.create_link.call_count == 1
 
-    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interface")
+    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interfaces")
     def test_exits_if_inet_not_found(self, mock_sync: MagicMock) -> None:
-        mock_sync.return_value = MagicMock()
+        mock_sync.side_effect = _found_interfaces
         lab = self._make_lab([])
         with pytest.raises(Exit):
-            _add_wan_edge_node(lab, "SD-Edge1", "img", "cfg", connect_mpls=False)
+            _add_wan_edge_nodes(LabSnapshot(lab), [("SD-Edge1", "cfg")], "img", connect_mpls=False)
 
-    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interface")
+    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interfaces")
     def test_exits_if_inet_has_no_free_ports(self, mock_sync: MagicMock) -> None:
-        mock_sync.return_value = MagicMock()
+        mock_sync.side_effect = _found_interfaces
         inet = self._make_switch("INET")
         inet.next_available_interface.return_value = None
         lab = self._make_lab([inet])
         with pytest.raises(Exit):
-            _add_wan_edge_node(lab, "SD-Edge1", "img", "cfg", connect_mpls=False)
+            _add_wan_edge_nodes(LabSnapshot(lab), [("SD-Edge1", "cfg")], "img", connect_mpls=False)
 
-    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interface")
+    @patch("catalyst_sdwan_lab.tasks.add._sync_until_interfaces")
     def test_placed_at_y400(self, mock_sync: MagicMock) -> None:
-        mock_sync.return_value = MagicMock()
+        mock_sync.side_effect = _found_interfaces
         lab = self._make_lab([self._make_switch("INET")])
-        _add_wan_edge_node(lab, "SD-Edge1", "img", "cfg", connect_mpls=False)
+        _add_wan_edge_nodes(LabSnapshot(lab), [("SD-Edge1", "cfg")], "img", connect_mpls=False)
         assert lab.create_node.call_args[1]["y"] == 400
 
 
+class TestSyncUntilInterfaces:
+    def test_one_sync_per_attempt_for_all_nodes(self) -> None:
+        lab = MagicMock()
+        nodes = [MagicMock(), MagicMock()]
+        found = _sync_until_interfaces(lab, [(n, "GigabitEthernet1") for n in nodes])
+        assert lab.sync.call_count == 1
+        assert found[(nodes[1], "GigabitEthernet1")] is nodes[1].get_interface_by_label.return_value
+
+    @patch("catalyst_sdwan_lab.tasks.add._INTERFACE_BACKOFF", Backoff(floor=0, ceiling=0))
+    def test_retries_until_late_interface_appears(self) -> None:
+        lab = MagicMock()
+        ready, late = MagicMock(), MagicMock()
+        late.get_interface_by_label.side_effect = [InterfaceNotFound("gi1"), MagicMock()]
+        _sync_until_interfaces(lab, [(ready, "gi1"), (late, "gi1")])
+        assert lab.sync.call_count == 2
+        ready.get_interface_by_label.assert_called_once()
+
+    @patch("catalyst_sdwan_lab.tasks.add._INTERFACE_BACKOFF", Backoff(floor=0, ceiling=0))
+    def test_exits_when_interface_never_appears(self) -> None:
+        node = MagicMock()
+        node.get_interface_by_label.side_effect = InterfaceNotFound("gi1")
+        with pytest.raises(Exit):
+            _sync_until_interfaces(MagicMock(), [(node, "gi1")], timeout=0)
+
+
 class TestWaitForCsrs:
     def _make_client(self, controllers: list[dict]) -> MagicMock:
         client = MagicMock()
@@ -410,7 +518,7 @@ class TestAddToManagerRetrying:
 class TestWaitForEdgesOnboarded:
     def _make_client(self, vedges: list[dict]) -> MagicMock:
         client = MagicMock()
-        client.get_vedges.return_value = vedges
+        client.iter_vedges.return_value = vedges
         return client
 
     def test_resolves_when_all_onboarded(self) -> None:
@@ -418,7 +526,7 @@ class TestWaitForEdgesOnboarded:
             {"uuid": "uuid-1", "certInstallStatus": "Installed", "reachability": "reachable"},
         ])
         wait_for_edges_onboarded(client, ["uuid-1"], timeout=10)
-        client.get_vedges.assert_called_once()
+        client.iter_vedges.assert_called_once_with(uuids={"uuid-1"}, states={"certinstalled"})
 
     def test_requires_both_installed_and_reachable(self) -> None:
         client = self._make_client([
@@ -433,7 +541,7 @@ class TestWaitForEdgesOnboarded:
             {"uuid": "uuid-2", "certInstallStatus": None, "reachability": "unreachable"},
         ])
         wait_for_edges_onboarded(client, ["uuid-1"], timeout=10)
-        client.get_vedges.assert_called_once()
+        client.iter_vedges.assert_called_once_with(uuids={"uuid-1"}, states={"certinstalled"})
 
     def test_exits_on_timeout(self) -> None:
         client = self._make_client([])
@@ -468,7 +576,7 @@ class TestWaitForTask:
             {"summary": {"status": "in_progress"}},
         ])
         with patch("catalyst_sdwan_lab.manager_client.time.sleep"):
-            with patch("catalyst_sdwan_lab.manager_client.time.time", side_effect=[0, 0, 999]):
+            with patch("catalyst_sdwan_lab.polling.time.monotonic", side_effect=[0, 999]):
                 with pytest.raises(ManagerAPIError, match="timed out"):
                     client.wait_for_task("task-1", timeout=1)
 
@@ -482,6 +590,55 @@ class TestWaitForTask:
         assert mock_get.call_count == 2
 
 
+class TestConfigGroupSchema:
+    def _client(self, cg: dict) -> MagicMock:
+        client = MagicMock()
+        client.base_url = "https://manager:443"
+        client.get_config_groups.return_value = [cg]
+        client.get_config_group_variable_names.return_value = {"system_ip"}
+        return client
+
+    def test_schema_fetched_once_per_revision(self, tmp_path) -> None:
+        from catalyst_sdwan_lab.schema_cache import SchemaCache
+
+        cg = {"id": "cg-1", "name": "edge_basic", "version": 3, "lastUpdatedOn": 100}
+        client = self._client(cg)
+        cache = SchemaCache(tmp_path)
+        assert _config_group_schema(client, "edge_basic", cache) == ("cg-1", {"system_ip"})
+        assert _config_group_schema(client, "edge_basic", cache) == ("cg-1", {"system_ip"})
+        client.get_config_group_variable_names.assert_called_once_with("cg-1")
+        cg["version"] = 4
+        _config_group_schema(client, "edge_basic", cache)
+        assert client.get_config_group_variable_names.call_count == 2
+
+    def test_group_without_revision_is_not_cached(self, tmp_path) -> None:
+        from catalyst_sdwan_lab.schema_cache import SchemaCache
+
+        client = self._client({"id": "cg-1", "name": "edge_basic"})
+        cache = SchemaCache(tmp_path)
+        _config_group_schema(client, "edge_basic", cache)
+        _config_group_schema(client, "edge_basic", cache)
+        assert client.get_config_group_variable_names.call_count == 2
+
+    def test_missing_group_exits(self) -> None:
+        client = self._client({"id": "cg-1", "name": "other"})
+        with pytest.raises(Exit):
+            _config_group_schema(client, "edge_basic")
+
+
+class TestFilterDeviceVariables:
+    def test_filters_every_device(self) -> None:
+        devices = [
+            {"device-id": u, "variables": [{"name": "system_ip", "value": 1},
+                                           {"name": "legacy", "value": 2}]}
+            for u in ("a", "b")
+        ]
+        assert _filter_device_variables(devices, frozenset({"system_ip"})) == [
+            {"device-id": u, "variables": [{"name": "system_ip", "value": 1}]}
+            for u in ("a", "b")
+        ]
+
+
 class TestDropUnsupportedVariables:
     def test_keeps_all_when_allowed(self) -> None:
         variables = [
@@ -0,0 +1,134 @@
+import datetime
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from catalyst_sdwan_lab.api_stats import ApiStats, normalize_path
+from catalyst_sdwan_lab.manager_client import ManagerClient
+
+UUID = "3f1c2d4e-5a6b-4c7d-8e9f-0a1b2c3d4e5f"
+
+
+def _response(
+    method: str, url: str, status: int, body: bytes, sent: bytes = b""
+) -> requests.Response:
+    request = requests.Request(method, url, data=sent or None).prepare()
+    response = requests.Response()
+    response.request = request
+    response.url = url
+    response.status_code = status
+    response._content = body
+    response.elapsed = datetime.timedelta(milliseconds=250)
+    return response
+
+
+class TestNormalizePath:
+    @pytest.mark.parametrize(
+        ("url", "expected"),
+        [
+            (
+                f"https://10.0.0.1:443/dataservice/system/device/bootstrap/device/{UUID}"
+                "?configtype=cloudinit&wanif=ge1",
+                "/dataservice/system/device/bootstrap/device/{id}?configtype&wanif",
+            ),
+            (
+                f"/dataservice/device/action/status/push_feature_template-{UUID}",
+                "/dataservice/device/action/status/{id}",
+            ),
+            (
+                "/dataservice/device/interface?vpn-id=0&deviceId=100.0.0.1",
+                "/dataservice/device/interface?deviceId&vpn-id",
+            ),
+            ("/dataservice/system/device/172.16.0.101", "/dataservice/system/device/{id}"),
+            ("/dataservice/system/device/controllers", "/dataservice/system/device/controllers"),
+        ],
+    )
+    def test_strips_ids(self, url: str, expected: str) -> None:
+        assert normalize_path(url) == expected
+
+
+class TestApiStats:
+    def test_disabled_records_nothing(self) -> None:
+        stats = ApiStats()
+        stats.record("GET", "/dataservice/x", 200, 0.1)
+        assert stats.snapshot() == []
+
+    def test_aggregates_per_endpoint_template(self) -> None:
+        stats = ApiStats()
+        stats.enable()
+        stats.record("GET", f"/dataservice/template/device/object/{UUID}", 200, 0.5, 0, 100)
+        stats.record("get", "/dataservice/template/device/object/1234", 500, 1.5, 0, 20)
+        stats.record("GET", "/dataservice/system/device/vedges", 200, 0.1)
+        stats.record_retry("GET", "/dataservice/template/device/object/99")
+        slowest, fastest = stats.snapshot()
+        assert (slowest.method, slowest.path) == ("GET", "/dataservice/template/device/object/{id}")
+        assert (slowest.calls, slowest.errors, slowest.retries) == (2, 1, 1)
+        assert slowest.total_s == pytest.approx(2.0)
+        assert slowest.max_s == pytest.approx(1.5)
+        assert slowest.mean_s == pytest.approx(1.0)
+        assert slowest.received_bytes == 120
+        assert fastest.path == "/dataservice/system/device/vedges"
+
+    def test_connection_failure_counts_as_error(self) -> None:
+        stats = ApiStats()
+        stats.enable()
+        stats.record("POST", "/dataservice/system/device", 0, 30.0)
+        assert stats.snapshot()[0].errors == 1
+
+    def test_response_hook_records_sizes_and_latency(self) -> None:
+        stats = ApiStats()
+        stats.enable()
+        stats.record_response(
+            _response("POST", "https://m/dataservice/system/device", 200, b"{}", b"payload")
+        )
+        (entry,) = stats.snapshot()
+        assert (entry.method, entry.path, entry.last_status) == (
+            "POST", "/dataservice/system/device", 200
+        )
+        assert (entry.sent_bytes, entry.received_bytes) == (7, 2)
+        assert entry.total_s == pytest.approx(0.25)
+
+    def test_write_json(self, tmp_path: Path) -> None:
+        stats = ApiStats()
+        stats.enable()
+        stats.record("GET", "/dataservice/system/device/vedges", 200, 0.2)
+        out = tmp_path / "stats.json"
+        stats.write_json(out)
+        (row,) = json.loads(out.read_text())
+        assert row["path"] == "/dataservice/system/device/vedges"
+        assert row["calls"] == 1
+        assert row["mean_s"] == pytest.approx(0.2)
+
+
+class TestManagerClientRecording:
+    def test_session_replay_counted_as_retry(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        stats = ApiStats()
+        stats.enable()
+        monkeypatch.setattr("catalyst_sdwan_lab.api_stats.recorder", stats)
+        client = ManagerClient("10.0.0.1", 443, "admin", "secret")
+        client._session = MagicMock()
+        client._session.request.side_effect = [
+            _response("GET", "https://10.0.0.1/dataservice/system/device/vedges", 401, b""),
+            _response("GET", "https://10.0.0.1/dataservice/system/device/vedges", 200, b"{}"),
+        ]
+        client.login = MagicMock()  # type: ignore[method-assign]
+        client.get_vedges()
+        (entry,) = stats.snapshot()
+        assert entry.retries == 1
+
+    def test_transport_error_recorded(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        stats = ApiStats()
+        stats.enable()
+        monkeypatch.setattr("catalyst_sdwan_lab.api_stats.recorder", stats)
+        client = ManagerClient("10.0.0.1", 443, "admin", "secret")
+        client._session = MagicMock()
+        client._session.request.side_effect = requests.exceptions.ConnectTimeout()
+        with pytest.raises(requests.exceptions.ConnectTimeout):
+            client.get_vedges()
+        (entry,) = stats.snapshot()
+        assert (entry.path, entry.errors, entry.last_status) == (
+            "/dataservice/system/device/vedges", 1, 0
+        )
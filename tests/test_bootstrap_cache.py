@@ -0,0 +1,45 @@
+import stat
+
+from catalyst_sdwan_lab._cache_files import cache_dir
+from catalyst_sdwan_lab.bootstrap_cache import BootstrapCache
+
+
+class TestBootstrapCache:
+    def test_round_trip(self, tmp_path) -> None:
+        cache = BootstrapCache(tmp_path)
+        cache.put("uuid-1", None, "v1", "#cloud-config")
+        assert cache.get("uuid-1", None, "v1") == "#cloud-config"
+
+    def test_key_includes_wanif_and_version(self, tmp_path) -> None:
+        cache = BootstrapCache(tmp_path)
+        cache.put("uuid-1", None, "v1", "#cloud-config")
+        assert cache.get("uuid-1", "GigabitEthernet1", "v1") is None
+        assert cache.get("uuid-1", None, "v2") is None
+
+    def test_expired_entries_are_ignored(self, tmp_path) -> None:
+        cache = BootstrapCache(tmp_path, max_age=-1)
+        cache.put("uuid-1", None, "v1", "#cloud-config")
+        assert cache.get("uuid-1", None, "v1") is None
+
+    def test_files_are_private(self, tmp_path) -> None:
+        cache = BootstrapCache(tmp_path / "bootstrap")
+        cache.put("uuid-1", None, "v1", "#cloud-config")
+        (entry,) = (tmp_path / "bootstrap").iterdir()
+        assert stat.S_IMODE(entry.stat().st_mode) == 0o600
+        assert stat.S_IMODE((tmp_path / "bootstrap").stat().st_mode) == 0o700
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path) -> None:
+        cache = BootstrapCache(tmp_path)
+        cache.put("uuid-1", None, "v1", "#cloud-config")
+        (entry,) = tmp_path.iterdir()
+        entry.write_text("{not json")
+        assert cache.get("uuid-1", None, "v1") is None
+
+    def test_unwritable_directory_is_ignored(self, tmp_path) -> None:
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        BootstrapCache(blocker / "bootstrap").put("uuid-1", None, "v1", "#cloud-config")
+
+    def test_default_dir_follows_xdg(self, tmp_path, monkeypatch) -> None:
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert cache_dir("bootstrap") == tmp_path / "catalyst-sdwan-lab" / "bootstrap"
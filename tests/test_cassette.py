@@ -0,0 +1,106 @@
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import httpx
+import pytest
+import requests
+
+from catalyst_sdwan_lab.cassette import CASSETTE_FILE, Cassette
+from catalyst_sdwan_lab.fake_manager import FakeManager
+from catalyst_sdwan_lab.manager_client import ManagerClient
+
+pytestmark = pytest.mark.filterwarnings("ignore::urllib3.exceptions.InsecureRequestWarning")
+
+
+@pytest.fixture(autouse=True)
+def _no_ca_bundle(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("REQUESTS_CA_BUNDLE", raising=False)
+    monkeypatch.delenv("CURL_CA_BUNDLE", raising=False)
+
+
+@pytest.fixture
+def fake() -> Iterator[FakeManager]:
+    with FakeManager(edge_count=3) as fake:
+        yield fake
+
+
+def _manager_session(fake: FakeManager, port: int) -> list[dict]:
+    client = ManagerClient("127.0.0.1", port, fake.username, fake.password)
+    client.login()
+    client.add_controller("172.16.0.101", "vsmart", "admin", "admin")
+    controllers = client.get_controllers()
+    client.logout()
+    return controllers
+
+
+class TestCassette:
+    def test_replays_manager_session_offline(self, fake: FakeManager, tmp_path: Path) -> None:
+        port = fake.port
+        with Cassette(tmp_path, "record"):
+            recorded = _manager_session(fake, port)
+        fake.stop()
+
+        with Cassette(tmp_path, "replay", speed=0):
+            assert _manager_session(fake, port) == recorded
+
+    def test_records_and_replays_httpx(self, fake: FakeManager, tmp_path: Path) -> None:
+        url = f"https://127.0.0.1:{fake.port}/diagnostic/api/v1/boot"
+        with Cassette(tmp_path, "record"):
+            with httpx.Client(verify=False) as cml:
+                recorded = cml.get(url).json()
+        fake.stop()
+
+        with Cassette(tmp_path, "replay", speed=0):
+            with httpx.Client(verify=False) as cml:
+                assert cml.get(url).json() == recorded
+
+    def test_strips_host_and_content_length(self, fake: FakeManager, tmp_path: Path) -> None:
+        with Cassette(tmp_path, "record"):
+            requests.get(f"https://127.0.0.1:{fake.port}/diagnostic/api/v1/boot", verify=False)
+        (line,) = (tmp_path / CASSETTE_FILE).read_text().splitlines()
+        entry = json.loads(line)
+        assert entry["url"] == "/diagnostic/api/v1/boot"
+        assert "content-length" not in {k.lower() for k, _ in entry["headers"]}
+
+    def test_recording_is_private(self, tmp_path: Path) -> None:
+        directory = tmp_path / "run"
+        with Cassette(directory, "record"):
+            pass
+        assert directory.stat().st_mode & 0o777 == 0o700
+        assert (directory / CASSETTE_FILE).stat().st_mode & 0o777 == 0o600
+
+    def test_last_response_repeats(self, tmp_path: Path) -> None:
+        _write(tmp_path, [("GET", "/status", "first"), ("GET", "/status", "second")])
+        with Cassette(tmp_path, "replay", speed=0):
+            bodies = [requests.get("https://m/status").text for _ in range(3)]
+        assert bodies == ["first", "second", "second"]
+
+    def test_prefers_exact_query_match(self, tmp_path: Path) -> None:
+        _write(tmp_path, [("GET", "/workflow?type=a", "a"), ("GET", "/workflow?type=b", "b")])
+        with Cassette(tmp_path, "replay", speed=0):
+            assert requests.get("https://m/workflow?type=b").text == "b"
+            assert requests.get("https://m/workflow?type=c").text == "a"
+
+    def test_unrecorded_request_fails_like_unreachable_host(self, tmp_path: Path) -> None:
+        _write(tmp_path, [("GET", "/status", "ok")])
+        with Cassette(tmp_path, "replay", speed=0):
+            with pytest.raises(requests.exceptions.ConnectionError, match="No recorded response"):
+                requests.post("https://m/status")
+
+    def test_uninstall_restores_transports(self, tmp_path: Path) -> None:
+        send = requests.adapters.HTTPAdapter.send
+        handle = httpx.HTTPTransport.handle_request
+        _write(tmp_path, [])
+        with Cassette(tmp_path, "replay"):
+            assert requests.adapters.HTTPAdapter.send is not send
+        assert requests.adapters.HTTPAdapter.send is send
+        assert httpx.HTTPTransport.handle_request is handle
+
+
+def _write(directory: Path, exchanges: list[tuple[str, str, str]]) -> None:
+    (directory / CASSETTE_FILE).write_text("".join(
+        json.dumps({"method": m, "url": u, "status": 200, "headers": [], "body": b,
+                    "base64": False, "elapsed": 0.0}) + "\n"
+        for m, u, b in exchanges
+    ))
@@ -0,0 +1,78 @@
+from unittest.mock import MagicMock, patch
+
+from virl2_client.event_handling import Event
+
+from catalyst_sdwan_lab.cml_events import CmlEvents, _NodeStateHandler, cml_events
+
+
+def _node(node_id: str) -> MagicMock:
+    node = MagicMock()
+    node.id = node_id
+    return node
+
+
+class TestCmlEvents:
+    def test_booted_resolves_on_booted_state(self) -> None:
+        events = CmlEvents()
+        future = events.booted(_node("n1"))
+        events.node_state("n1", "STARTED")
+        assert not future.done()
+        events.node_state("n1", "BOOTED")
+        assert future.done()
+
+    def test_event_before_booted_call_is_kept(self) -> None:
+        events = CmlEvents()
+        events.node_state("n1", "BOOTED")
+        assert events.booted(_node("n1")).done()
+
+    def test_repeated_booted_events_are_harmless(self) -> None:
+        events = CmlEvents()
+        events.node_state("n1", "BOOTED")
+        events.node_state("n1", "BOOTED")
+        assert events.booted(_node("n1")).done()
+
+
+class TestNodeStateHandler:
+    def _event(self, element_type: str, state: str) -> Event:
+        return Event({
+            "event_type": "state_change",
+            "event": state,
+            "element_type": element_type,
+            "lab_id": "lab1",
+            "element_id": "n1",
+        })
+
+    def test_node_state_change_resolves_future(self) -> None:
+        events = CmlEvents()
+        future = events.booted(_node("n1"))
+        _NodeStateHandler(MagicMock(), events).handle_event(self._event("node", "BOOTED"))
+        assert future.done()
+
+    def test_link_state_change_ignored(self) -> None:
+        events = CmlEvents()
+        future = events.booted(_node("n1"))
+        _NodeStateHandler(MagicMock(), events).handle_event(self._event("link", "BOOTED"))
+        assert not future.done()
+
+    def test_failing_event_does_not_raise(self) -> None:
+        cml = MagicMock()
+        cml.get_local_lab.side_effect = RuntimeError("boom")
+        _NodeStateHandler(cml, CmlEvents()).handle_event(self._event("node", "BOOTED"))
+
+
+def test_listener_installed_on_the_client() -> None:
+    cml = MagicMock()
+    with patch("catalyst_sdwan_lab.cml_events._NodeStateListener") as listener, \
+            cml_events(cml) as events:
+        assert events is not None
+        assert cml.event_listener is listener.return_value
+        cml.start_event_listening.assert_called_once()
+    cml.stop_event_listening.assert_called_once()
+
+
+def test_no_events_when_listener_cannot_start() -> None:
+    cml = MagicMock()
+    cml.start_event_listening.side_effect = OSError("websocket refused")
+    with patch("catalyst_sdwan_lab.cml_events._NodeStateListener"), cml_events(cml) as events:
+        assert events is None
+    cml.stop_event_listening.assert_not_called()
@@ -2,6 +2,7 @@ import gzip
 import io
 import json
 import tarfile
+from collections.abc import Callable
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -256,6 +257,20 @@ class TestOnboardControlComponents:
         with pytest.raises(ManagerAPIError):
             onboard_control_components(client, MagicMock(), self._V4_COMPONENTS, on_status=MagicMock())
 
+    def test_one_failure_does_not_stop_the_other_components(self) -> None:
+        client = self._make_client()
+
+        def add_controller(ip: str, *_: str) -> None:
+            if ip == "172.16.0.201":
+                raise ManagerAPIError("refused")
+
+        client.add_controller.side_effect = add_controller
+        with pytest.raises(ManagerAPIError, match="vbond 172.16.0.201: refused"):
+            onboard_control_components(
+                client, MagicMock(), self._V4_COMPONENTS, on_status=MagicMock()
+            )
+        assert client.add_controller.call_count == 2
+
     def test_always_fetches_controllers_for_signing(self) -> None:
         client = self._make_client()
         onboard_control_components(client, MagicMock(), self._V4_COMPONENTS, on_status=MagicMock())
@@ -312,27 +327,60 @@ class TestImportControllerTemplates:
         assert _import_controller_templates(client, "v4") == "existing-id"
         client.create_feature_template.assert_not_called()
 
-    def test_creates_templates_and_returns_id(self, tmp_path: Path) -> None:
-        client = MagicMock()
-        client.get_device_templates.return_value = []
-        client.create_feature_template.return_value = "new-feat-id"
-        client.create_device_template.return_value = "new-dev-id"
-
+    def _template_dir(self, tmp_path: Path) -> Path:
         common = tmp_path / "feature" / "common"
         common.mkdir(parents=True)
         (tmp_path / "feature" / "v4").mkdir(parents=True)
-        feat = {"templateId": "old-feat-id", "templateName": "feat"}
-        (common / "feat.json").write_text(json.dumps(feat))
+        old_ids = {"feat": "00000000-0000-0000-0000-00000000000a",
+                   "other": "00000000-0000-0000-0000-00000000000b"}
+        for name, old_id in old_ids.items():
+            feat = {"templateId": old_id, "templateName": name}
+            (common / f"{name}.json").write_text(json.dumps(feat))
         device = {"templateId": "old-dev-id", "templateName": "controller_basic",
-                  "subTemplates": [{"templateId": "old-feat-id"}]}
+                  "subTemplates": [{"templateId": i} for i in old_ids.values()]}
         (tmp_path / "device_template.json").write_text(json.dumps(device))
+        return tmp_path
 
-        with patch("catalyst_sdwan_lab.tasks.deploy.CONTROLLER_TEMPLATES_DIR", tmp_path):
+    def test_creates_templates_and_returns_id(self, tmp_path: Path) -> None:
+        client = MagicMock()
+        client.get_device_templates.return_value = []
+        client.get_feature_templates.return_value = []
+        client.create_feature_templates.side_effect = lambda bodies: [
+            f"new-{b['templateName']}-id" for b in bodies
+        ]
+        client.create_device_template.return_value = "new-dev-id"
+
+        with patch("catalyst_sdwan_lab.tasks.deploy.CONTROLLER_TEMPLATES_DIR",
+                   self._template_dir(tmp_path)):
             result = _import_controller_templates(client, "v4")
 
         assert result == "new-dev-id"
-        client.create_feature_template.assert_called_once()
-        client.create_device_template.assert_called_once()
+        client.create_feature_templates.assert_called_once()
+        (device_body,) = client.create_device_template.call_args.args
+        assert [t["templateId"] for t in device_body["subTemplates"]] == [
+            "new-feat-id", "new-other-id"
+        ]
+
+    def test_reuses_feature_templates_left_by_failed_run(self, tmp_path: Path) -> None:
+        client = MagicMock()
+        client.get_device_templates.return_value = []
+        client.get_feature_templates.return_value = [
+            {"templateName": "feat", "templateId": "kept-id"}
+        ]
+        client.create_feature_templates.side_effect = lambda bodies: [
+            f"new-{b['templateName']}-id" for b in bodies
+        ]
+
+        with patch("catalyst_sdwan_lab.tasks.deploy.CONTROLLER_TEMPLATES_DIR",
+                   self._template_dir(tmp_path)):
+            _import_controller_templates(client, "v4")
+
+        (bodies,) = client.create_feature_templates.call_args.args
+        assert [b["templateName"] for b in bodies] == ["other"]
+        (device_body,) = client.create_device_template.call_args.args
+        assert {t["templateId"] for t in device_body["subTemplates"]} == {
+            "kept-id", "new-other-id"
+        }
 
 
 class TestAttachControllerTemplate:
@@ -463,26 +511,26 @@ class TestLoadCerts:
 
 
 class TestFindLab:
-    def test_finds_matching_lab(self) -> None:
-        cml = MagicMock()
+    def test_finds_matching_lab(self, cml_with_labs: Callable[..., MagicMock]) -> None:
         lab = MagicMock()
         lab.notes = "manager_external_ip = 10.0.0.1:8443\nother"
-        cml.all_labs.return_value = [lab]
-        _find_lab(cml, "10.0.0.1", 8443)
+        _find_lab(cml_with_labs([lab]), "10.0.0.1", 8443)
 
-    def test_exits_if_ip_does_not_match(self) -> None:
-        cml = MagicMock()
+    def test_exits_if_ip_does_not_match(self, cml_with_labs: Callable[..., MagicMock]) -> None:
         lab = MagicMock()
         lab.notes = "manager_external_ip = 10.0.0.2:8443"
-        cml.all_labs.return_value = [lab]
         with pytest.raises(Exit):
-            _find_lab(cml, "10.0.0.1", 8443)
+            _find_lab(cml_with_labs([lab]), "10.0.0.1", 8443)
 
-    def test_exits_if_no_labs(self) -> None:
-        cml = MagicMock()
-        cml.all_labs.return_value = []
+    def test_exits_if_port_does_not_match(self, cml_with_labs: Callable[..., MagicMock]) -> None:
+        lab = MagicMock()
+        lab.notes = "manager_external_ip = 10.0.0.1:443"
+        with pytest.raises(Exit):
+            _find_lab(cml_with_labs([lab]), "10.0.0.1", 8443)
+
+    def test_exits_if_no_labs(self, cml_with_labs: Callable[..., MagicMock]) -> None:
         with pytest.raises(Exit):
-            _find_lab(cml, "10.0.0.1", 8443)
+            _find_lab(cml_with_labs([]), "10.0.0.1", 8443)
 
 
 class TestSignDeviceCert:
@@ -514,7 +562,7 @@ class TestSignDeviceCert:
         client.get_controllers.return_value = [
             {"uuid": "uuid-101", "certInstallStatus": "Pending"}
         ]
-        with patch("time.sleep"), patch("time.time", side_effect=[0, 0, 301]):
+        with patch("catalyst_sdwan_lab.tasks.utils.CERT_INSTALL_TIMEOUT", 0):
             with pytest.raises(ManagerAPIError, match="Certificate not installed"):
                 sign_device_cert(client, MagicMock(), "172.16.0.101", pki="cisco")
 
@@ -0,0 +1,187 @@
+import threading
+from contextlib import nullcontext
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from catalyst_sdwan_lab.device_watcher import _WATCH_BACKOFF, DeviceStateWatcher, _Subscription
+from catalyst_sdwan_lab.manager_client import INVENTORY_CACHE_TTLS, ManagerAPIError, ManagerClient
+from catalyst_sdwan_lab.polling import Backoff
+
+_FAST = Backoff(floor=0.01, ceiling=0.01, jitter=0)
+_SLOW = Backoff(floor=0.01, ceiling=30, factor=1000, jitter=0)
+_NO_CERT = "No certificate installed"
+
+
+def _has_cert(d: dict) -> bool:
+    return d.get("serialNumber") not in (None, _NO_CERT)
+
+
+def _controllers(*serials: str) -> list[dict]:
+    return [
+        {"uuid": f"uuid-{i}", "deviceIP": f"172.16.0.10{i}", "serialNumber": sn}
+        for i, sn in enumerate(serials, 1)
+    ]
+
+
+class TestDeviceStateWatcher:
+    def test_resolves_on_first_poll(self) -> None:
+        client = MagicMock()
+        client.get_controllers.return_value = _controllers("SN1")
+        watcher = DeviceStateWatcher(client, backoff=_FAST)
+        assert watcher.wait_all("controllers", ["uuid-1"], _has_cert, timeout=5, label="t") == set()
+        client.get_controllers.assert_called_once()
+
+    def test_matches_by_device_ip(self) -> None:
+        client = MagicMock()
+        client.get_controllers.return_value = _controllers("SN1")
+        watcher = DeviceStateWatcher(client, backoff=_FAST)
+        ready = MagicMock()
+        watcher.wait_all(
+            "controllers", ["172.16.0.101"], _has_cert, timeout=5, label="t", on_ready=ready
+        )
+        ready.assert_called_once_with("172.16.0.101", client.get_controllers.return_value[0])
+
+    def test_edge_poll_filters_to_subscribed_uuids(self) -> None:
+        client = MagicMock()
+        client.iter_vedges.return_value = iter(_controllers("SN1"))
+        watcher = DeviceStateWatcher(client, backoff=_FAST)
+        watcher.wait_all("vedges", ["uuid-1"], _has_cert, timeout=5, label="t")
+        client.iter_vedges.assert_called_once_with(uuids={"uuid-1"}, states=None)
+
+    def test_edge_poll_asks_for_the_union_of_waiter_states(self) -> None:
+        client = MagicMock()
+        client.iter_vedges.return_value = []
+        watcher = DeviceStateWatcher(client)
+        subs = [
+            _Subscription("uuid-1", _has_cert, frozenset({"certinstalled"})),
+            _Subscription("uuid-2", _has_cert, frozenset({"csrgenerated"})),
+        ]
+        watcher._fetch("vedges", subs)
+        client.iter_vedges.assert_called_once_with(
+            uuids={"uuid-1", "uuid-2"}, states={"certinstalled", "csrgenerated"}
+        )
+        watcher._fetch("vedges", [*subs, _Subscription("uuid-3", _has_cert, None)])
+        assert client.iter_vedges.call_args.kwargs["states"] is None
+
+    def test_concurrent_waiters_share_one_poller(self) -> None:
+        client = MagicMock()
+        client.get_controllers.side_effect = (
+            [_controllers(_NO_CERT, _NO_CERT)] * 5 + [_controllers("SN1", "SN2")] * 100
+        )
+        watcher = DeviceStateWatcher(client, backoff=_FAST)
+        results: list[set[str]] = []
+        threads = [
+            threading.Thread(target=lambda k=k: results.append(
+                watcher.wait_all("controllers", [k], _has_cert, timeout=5, label="t")
+            ))
+            for k in ("uuid-1", "uuid-2")
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == [set(), set()]
+        # one poller for both waiters, not one per waiter
+        assert client.get_controllers.call_count <= 8
+
+    def test_only_changed_devices_are_re_evaluated(self) -> None:
+        client = MagicMock()
+        client.get_controllers.side_effect = (
+            [_controllers(_NO_CERT, _NO_CERT)] * 4 + [_controllers(_NO_CERT, "SN2")] * 100
+        )
+        predicate = MagicMock(side_effect=_has_cert)
+        watcher = DeviceStateWatcher(client, backoff=_FAST)
+        watcher.wait_all("controllers", ["uuid-2"], predicate, timeout=5, label="t")
+        assert predicate.call_count == 2
+
+    def test_returns_pending_keys_on_timeout_after_one_check(self) -> None:
+        client = MagicMock()
+        client.get_controllers.return_value = _controllers(_NO_CERT, "SN2")
+        watcher = DeviceStateWatcher(client, backoff=_FAST)
+        pending = watcher.wait_all(
+            "controllers", ["uuid-1", "uuid-2", "uuid-9"], _has_cert, timeout=-1, label="t"
+        )
+        assert pending == {"uuid-1", "uuid-9"}
+        assert client.get_controllers.called
+
+    def test_api_errors_count_as_not_ready(self) -> None:
+        client = MagicMock()
+        client.get_controllers.side_effect = [ManagerAPIError("down"), _controllers("SN1")]
+        watcher = DeviceStateWatcher(client, backoff=_FAST)
+        assert watcher.wait_all("controllers", ["uuid-1"], _has_cert, timeout=5, label="t") == set()
+        assert client.get_controllers.call_count == 2
+
+    def test_unexpected_poll_error_fails_waiters(self) -> None:
+        client = MagicMock()
+        client.get_controllers.side_effect = [RuntimeError("boom"), _controllers("SN1")]
+        watcher = DeviceStateWatcher(client, backoff=_FAST)
+        with pytest.raises(ManagerAPIError, match="boom"):
+            watcher.wait_all("controllers", ["uuid-1"], _has_cert, timeout=5, label="t")
+        assert "controllers" not in watcher._threads
+        # the next waiter starts a new poller instead of waiting on the dead one
+        assert watcher.wait_all("controllers", ["uuid-1"], _has_cert, timeout=5, label="t") == set()
+
+    def test_late_check_wait_is_bounded(self) -> None:
+        client = MagicMock()
+        release = threading.Event()
+        client.get_controllers.side_effect = lambda **_: release.wait(5) and []
+        watcher = DeviceStateWatcher(client, backoff=_FAST)
+        with patch("catalyst_sdwan_lab.device_watcher._LATE_CHECK_GRACE", 0.05):
+            pending = watcher.wait_all("controllers", ["uuid-1"], _has_cert, timeout=0, label="t")
+        release.set()
+        assert pending == {"uuid-1"}
+
+    def test_predicate_errors_propagate(self) -> None:
+        client = MagicMock()
+        client.get_controllers.return_value = _controllers("SN1")
+        watcher = DeviceStateWatcher(client, backoff=_FAST)
+        with pytest.raises(KeyError):
+            watcher.wait_all(
+                "controllers", ["uuid-1"], lambda d: d["missing"], timeout=5, label="t"
+            )
+
+    def test_poller_stops_when_nobody_waits(self) -> None:
+        client = MagicMock()
+        client.get_controllers.return_value = _controllers(_NO_CERT)
+        watcher = DeviceStateWatcher(client, backoff=_FAST)
+        watcher.wait_all("controllers", ["uuid-1"], _has_cert, timeout=0.05, label="t")
+        thread = watcher._threads.get("controllers")
+        if thread is not None:
+            thread.join(timeout=1)
+        assert "controllers" not in watcher._threads
+
+    def test_event_cuts_inventory_wait_short(self) -> None:
+        client = MagicMock()
+        client.get_controllers.side_effect = [_controllers(_NO_CERT), _controllers("SN1")]
+        # first feed poll positions the cursor, the second reports an event
+        client.get_events.side_effect = [[], [{"id": "e1", "entry_time": 0}]] + [[]] * 1000
+        watcher = DeviceStateWatcher(client, backoff=_SLOW)
+        assert watcher.wait_all("controllers", ["uuid-1"], _has_cert, timeout=5, label="t") == set()
+        assert client.get_controllers.call_count == 2
+
+    def test_event_re_read_skips_inventory_cache(self) -> None:
+        client = ManagerClient("10.0.0.1", 443, "admin", "secret", cache_ttls=INVENTORY_CACHE_TTLS)
+        client.worker_session = MagicMock(return_value=nullcontext())  # type: ignore[method-assign]
+        client._fetch = MagicMock(  # type: ignore[method-assign]
+            side_effect=[{"data": _controllers(_NO_CERT)}, {"data": _controllers("SN1")}]
+        )
+        client.get_events = MagicMock(  # type: ignore[method-assign]
+            side_effect=[[], [{"id": "e1", "entry_time": 0}]] + [[]] * 1000
+        )
+        watcher = DeviceStateWatcher(client, backoff=_SLOW)
+        # the first read is still cached when the event arrives
+        assert watcher.wait_all("controllers", ["uuid-1"], _has_cert, timeout=2, label="t") == set()
+        assert client._fetch.call_count == 2
+
+    def test_poll_rounds_outlast_inventory_cache(self) -> None:
+        for path in ("/dataservice/system/device/controllers", "/dataservice/system/device/vedges"):
+            assert INVENTORY_CACHE_TTLS[path] < _WATCH_BACKOFF.floor
+
+    def test_unavailable_feed_falls_back_to_polling(self) -> None:
+        client = MagicMock()
+        client.get_controllers.side_effect = [_controllers(_NO_CERT)] * 3 + [_controllers("SN1")]
+        client.get_events.side_effect = ManagerAPIError("404")
+        watcher = DeviceStateWatcher(client, backoff=_FAST)
+        assert watcher.wait_all("controllers", ["uuid-1"], _has_cert, timeout=5, label="t") == set()
+        client.get_events.assert_called_once()
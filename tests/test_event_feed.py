@@ -0,0 +1,49 @@
+import time
+from unittest.mock import MagicMock
+
+import requests
+
+from catalyst_sdwan_lab.event_feed import EventFeed
+from catalyst_sdwan_lab.manager_client import ManagerAPIError
+
+
+def _event(event_id: str, entry_time_s: float) -> dict:
+    return {"id": event_id, "eventname": "control-connection-state-change",
+            "entry_time": int(entry_time_s * 1000)}
+
+
+class TestEventFeed:
+    def test_first_poll_only_positions_cursor(self) -> None:
+        now = time.time()
+        client = MagicMock()
+        client.get_events.return_value = [_event("old", now)]
+        feed = EventFeed(client)
+        assert feed.poll() == []
+        client.get_events.return_value = [_event("old", now), _event("new", now)]
+        assert [e["id"] for e in feed.poll()] == ["new"]
+
+    def test_cursor_follows_newest_event(self) -> None:
+        client = MagicMock()
+        client.get_events.return_value = [_event("a", 2_000_000_000)]
+        feed = EventFeed(client)
+        feed.poll()
+        feed.poll()
+        since, names = client.get_events.call_args.args
+        assert since == 2_000_000_000 - 1
+        assert "control-connection-state-change" in names
+
+    def test_api_error_disables_feed(self) -> None:
+        client = MagicMock()
+        client.get_events.side_effect = ManagerAPIError("404")
+        feed = EventFeed(client)
+        assert feed.poll() == []
+        assert not feed.available
+        feed.poll()
+        client.get_events.assert_called_once()
+
+    def test_connection_error_keeps_feed(self) -> None:
+        client = MagicMock()
+        client.get_events.side_effect = requests.exceptions.ConnectionError()
+        feed = EventFeed(client)
+        assert feed.poll() == []
+        assert feed.available
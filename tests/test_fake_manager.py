@@ -0,0 +1,147 @@
+import time
+from collections.abc import Iterator
+from unittest.mock import patch
+
+import pytest
+
+from catalyst_sdwan_lab.fake_manager import FakeManager
+from catalyst_sdwan_lab.manager_client import ManagerAPIError, ManagerClient
+from catalyst_sdwan_lab.tasks.utils import (
+    basic_configuration_path,
+    ensure_cluster_ip_configured,
+    load_certs,
+    onboard_control_components,
+    wait_for_edges_onboarded,
+)
+
+pytestmark = pytest.mark.filterwarnings("ignore::urllib3.exceptions.InsecureRequestWarning")
+
+
+@pytest.fixture(autouse=True)
+def _no_ca_bundle(monkeypatch: pytest.MonkeyPatch) -> None:
+    # requests lets these override Session.verify = False
+    monkeypatch.delenv("REQUESTS_CA_BUNDLE", raising=False)
+    monkeypatch.delenv("CURL_CA_BUNDLE", raising=False)
+
+
+@pytest.fixture
+def fake() -> Iterator[FakeManager]:
+    with FakeManager(edge_count=5) as fake:
+        yield fake
+
+
+@pytest.fixture
+def client(fake: FakeManager) -> Iterator[ManagerClient]:
+    client = ManagerClient("127.0.0.1", fake.port, fake.username, fake.password)
+    client.login()
+    yield client
+    client.logout()
+
+
+class TestFakeManager:
+    def test_rejects_bad_credentials(self, fake: FakeManager) -> None:
+        client = ManagerClient("127.0.0.1", fake.port, "admin", "wrong")
+        with pytest.raises(ManagerAPIError, match="invalid credentials"):
+            client.login()
+
+    def test_settings_round_trip(self, client: ManagerClient) -> None:
+        assert client.get_organization() is None
+        client.settings_organization("lab-org")
+        assert client.get_organization() == "lab-org"
+        assert client.get_certificate_signing() == "enterprise"
+
+    def test_onboards_control_components(self, client: ManagerClient) -> None:
+        onboard_control_components(
+            client, load_certs(), [("172.16.0.201", "vbond"), ("172.16.0.101", "vsmart")],
+            on_status=lambda _: None,
+        )
+        controllers = {c["deviceIP"]: c for c in client.get_controllers()}
+        for ip in ("172.16.0.1", "172.16.0.201", "172.16.0.101"):
+            assert controllers[ip]["certInstallStatus"] == "Installed"
+            assert controllers[ip]["reachability"] == "reachable"
+            assert controllers[ip]["serialNumber"] != "No certificate installed"
+
+    def test_cisco_pki_signers_leave_a_session_for_the_watcher(self, fake: FakeManager) -> None:
+        fake.settings["certificate"]["certificateSigning"] = "cisco"
+        client = ManagerClient("127.0.0.1", fake.port, fake.username, fake.password,
+                               max_worker_sessions=3)
+        client.login()
+        components = [(f"172.16.0.10{i}", "vsmart") for i in range(1, 4)]
+        with patch("catalyst_sdwan_lab.tasks.utils.CERT_INSTALL_TIMEOUT", 15):
+            onboard_control_components(
+                client, load_certs(), components, on_status=lambda _: None, pki="cisco"
+            )
+        client.logout()
+        controllers = {c["deviceIP"]: c for c in fake.controllers}
+        for ip, _ in components:
+            assert controllers[ip]["certInstallStatus"] == "Installed"
+
+    def test_duplicate_controller_rejected(self, client: ManagerClient) -> None:
+        client.add_controller("172.16.0.101", "vsmart", "admin", "admin")
+        with pytest.raises(ManagerAPIError, match="already exists"):
+            client.add_controller("172.16.0.101", "vsmart", "admin", "admin")
+
+    def test_edges_onboard_after_bootstrap(self, client: ManagerClient) -> None:
+        uuids = [v["uuid"] for v in client.get_vedges()][:3]
+        for uuid in uuids:
+            assert client.get_bootstrap_config(uuid).startswith("#cloud-config")
+        wait_for_edges_onboarded(client, uuids, timeout=5)
+
+    def test_vedge_inventory_filters_by_state(self, client: ManagerClient) -> None:
+        uuid = next(client.iter_vedges())["uuid"]
+        client.get_bootstrap_config(uuid)
+        claimed = list(client.iter_vedges(states=["bootstrapconfiggenerated", "certinstalled"]))
+        assert [v["uuid"] for v in claimed] == [uuid]
+        assert len(list(client.iter_vedges(states=["tokengenerated"]))) == 4
+
+    def test_onboarding_is_logged_as_events(self, client: ManagerClient) -> None:
+        since = time.time() - 5
+        uuid = client.get_vedges()[0]["uuid"]
+        client.get_bootstrap_config(uuid)
+        events = client.get_events(since, {"control-connection-state-change"})
+        assert [e["host_name"] for e in events] == [uuid]
+        assert client.get_events(time.time() + 5, {"control-connection-state-change"}) == []
+
+    def test_import_creates_config_groups(self, client: ManagerClient) -> None:
+        client.wait_for_task(client.import_configuration(basic_configuration_path("v4")))
+        assert {g["name"] for g in client.get_config_groups()} == {"edge_basic", "sdrouting_basic"}
+
+    def test_task_stays_in_progress_for_duration(
+        self, fake: FakeManager, client: ManagerClient
+    ) -> None:
+        fake.task_duration = 30
+        task_id = client.deploy_control_component_settings([])
+        status = client._get(f"/dataservice/device/action/status/{task_id}")
+        assert status["summary"]["status"] == "in_progress"
+
+    def test_expired_session_is_renewed(self, fake: FakeManager, client: ManagerClient) -> None:
+        fake.expire_sessions()
+        client.settings_organization("after-expiry")
+        assert client.get_organization() == "after-expiry"
+
+    def test_per_endpoint_latency(self, fake: FakeManager, client: ManagerClient) -> None:
+        fake.latency = {"GET /dataservice/system/device/vedges": 0.2}
+        started = time.monotonic()
+        client.get_controllers()
+        assert time.monotonic() - started < 0.2
+        started = time.monotonic()
+        client.get_vedges()
+        assert time.monotonic() - started >= 0.2
+
+    def test_cluster_node_becomes_ready(self, client: ManagerClient) -> None:
+        client.setup_cluster_ip("172.16.254.1", "COMPUTE_AND_DATA", "admin", "x")
+        client.add_cluster_node("172.16.254.2", "COMPUTE_AND_DATA", "admin", "x")
+        (cluster,) = client.get_cluster_management_list()
+        assert cluster["isIPConfigured"]
+        states = {n["configJson"]["deviceIP"]: n["configJson"]["state"] for n in cluster["data"]}
+        assert states == {"172.16.254.1": "ready", "172.16.254.2": "ready"}
+
+    def test_cluster_ip_setup_waits_out_restart(
+        self, fake: FakeManager, client: ManagerClient
+    ) -> None:
+        fake.restart_duration = 1.0
+        started = time.monotonic()
+        ensure_cluster_ip_configured(client, "admin", "x")
+        assert 1.0 <= time.monotonic() - started < 10
+        client.login()
+        assert client.get_cluster_management_list()[0]["isIPConfigured"]
@@ -0,0 +1,93 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from virl2_client.exceptions import LabNotFound
+
+from catalyst_sdwan_lab import lab_index
+from catalyst_sdwan_lab.lab_index import LabIndex, _lab_tiles, labs_by_manager, labs_by_title
+
+
+@pytest.fixture
+def lab_tiles(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    tiles = MagicMock()
+    monkeypatch.setattr(lab_index, "_lab_tiles", tiles)
+    return tiles
+
+
+def _cml(lab_tiles: MagicMock, *listings: dict) -> MagicMock:
+    lab_tiles.side_effect = list(listings)
+    cml = MagicMock()
+    cml.join_existing_lab.side_effect = lambda lab_id: f"joined-{lab_id}"
+    lab_index.invalidate(cml)
+    return cml
+
+
+def _tile(title: str, notes: str | None = "") -> dict:
+    return {"lab_title": title, "lab_notes": notes}
+
+
+class TestLabIndex:
+    def test_titles_and_managers_from_one_listing(self, lab_tiles: MagicMock) -> None:
+        cml = _cml(lab_tiles, {
+            "a": _tile("lab1", "manager_external_ip = 10.0.0.1:8443\n"),
+            "b": _tile("lab2", "manager_external_ip = 10.0.0.1:443\n"),
+            "c": _tile("lab1"),
+        })
+        index = LabIndex.load(cml)
+        assert index.ids_by_title("lab1") == ["a", "c"]
+        assert index.ids_by_manager("10.0.0.1", 443) == ["b"]
+        assert index.ids_by_manager("10.0.0.1") == ["a", "b"]
+        assert index.ids_by_manager("10.0.0.10") == []
+        cml.join_existing_lab.assert_not_called()
+
+    def test_listing_read_in_one_request(self) -> None:
+        cml = MagicMock()
+        cml._session.get.return_value.json.return_value = {"lab_tiles": {"a": _tile("lab1")}}
+        assert _lab_tiles(cml) == {"a": _tile("lab1")}
+        cml._url_for.assert_called_once_with("populate_lab_tiles")
+
+    def test_pre_2_1_listing_without_wrapper(self) -> None:
+        cml = MagicMock()
+        cml._session.get.return_value.json.return_value = {"a": _tile("lab1")}
+        assert _lab_tiles(cml) == {"a": _tile("lab1")}
+
+    def test_notes_fetched_when_listing_lacks_them(self, lab_tiles: MagicMock) -> None:
+        cml = _cml(lab_tiles, {"a": {"lab_title": "lab1"}})
+        lab = MagicMock()
+        lab.notes = "manager_external_ip = 10.0.0.1:443"
+        cml.join_existing_lab.side_effect = None
+        cml.join_existing_lab.return_value = lab
+        assert LabIndex.load(cml).ids_by_manager("10.0.0.1", 443) == ["a"]
+
+
+class TestLookups:
+    def test_lookups_share_a_cached_listing(self, lab_tiles: MagicMock) -> None:
+        cml = _cml(lab_tiles, {"a": _tile("lab1", "manager_external_ip = 10.0.0.1:443")})
+        assert labs_by_title(cml, "lab1") == ["joined-a"]
+        assert labs_by_manager(cml, "10.0.0.1", 443) == ["joined-a"]
+        assert lab_tiles.call_count == 1
+
+    def test_miss_on_cached_listing_reloads(self, lab_tiles: MagicMock) -> None:
+        cml = _cml(lab_tiles, {}, {"a": _tile("lab1")})
+        assert labs_by_title(cml, "other") == []
+        assert labs_by_title(cml, "lab1") == ["joined-a"]
+        assert lab_tiles.call_count == 2
+
+    def test_removed_lab_on_cached_listing_reloads(self, lab_tiles: MagicMock) -> None:
+        cml = _cml(lab_tiles, {"a": _tile("lab1")}, {"b": _tile("lab1")})
+        labs_by_title(cml, "lab1")
+
+        def join(lab_id: str) -> str:
+            if lab_id == "a":
+                raise LabNotFound(lab_id)
+            return f"joined-{lab_id}"
+
+        cml.join_existing_lab.side_effect = join
+        assert labs_by_title(cml, "lab1") == ["joined-b"]
+
+    def test_expired_listing_reloaded(self, lab_tiles: MagicMock) -> None:
+        cml = _cml(lab_tiles, {"a": _tile("lab1")}, {"a": _tile("lab1")})
+        labs_by_title(cml, "lab1")
+        with patch("catalyst_sdwan_lab.lab_index.MAX_AGE", -1):
+            labs_by_title(cml, "lab1")
+        assert lab_tiles.call_count == 2
@@ -0,0 +1,76 @@
+from unittest.mock import MagicMock
+
+from catalyst_sdwan_lab.lab_snapshot import LabSnapshot
+from catalyst_sdwan_lab.tasks.add import _CTRL_NUM_RE, _EDGE_NUM_RE
+
+
+def _make_node(label: str, node_definition: str = "", x: int = 0, y: int = 0) -> MagicMock:
+    node = MagicMock()
+    node.label = label
+    node.node_definition = node_definition
+    node.x = x
+    node.y = y
+    return node
+
+
+def _make_lab(nodes: list[MagicMock]) -> MagicMock:
+    lab = MagicMock()
+    lab.nodes.return_value = nodes
+    return lab
+
+
+class TestLabSnapshot:
+    def test_reads_lab_nodes_once(self) -> None:
+        lab = _make_lab([_make_node("VPN0", "unmanaged_switch"), _make_node("Edge01")])
+        snapshot = LabSnapshot(lab)
+        snapshot.node("VPN0")
+        snapshot.nodes("unmanaged_switch")
+        snapshot.row_end(0)
+        snapshot.max_num(_EDGE_NUM_RE)
+        lab.nodes.assert_called_once()
+
+    def test_node_by_label_and_definition(self) -> None:
+        vpn0 = _make_node("VPN0", "unmanaged_switch")
+        snapshot = LabSnapshot(_make_lab([vpn0]))
+        assert snapshot.node("VPN0") is vpn0
+        assert snapshot.node("VPN0", "unmanaged_switch") is vpn0
+        assert snapshot.node("VPN0", "iosv") is None
+        assert snapshot.node("INET") is None
+
+    def test_first_node_with_a_label_wins(self) -> None:
+        first = _make_node("VPN0")
+        snapshot = LabSnapshot(_make_lab([first, _make_node("VPN0")]))
+        assert snapshot.node("VPN0") is first
+
+    def test_nodes_and_positions_by_definition(self) -> None:
+        ctrl = _make_node("Controller01", "cat-sdwan-controller", x=120, y=0)
+        vldtr = _make_node("Validator01", "cat-sdwan-validator", x=240, y=0)
+        snapshot = LabSnapshot(_make_lab([ctrl, vldtr, _make_node("Gateway", "iosv")]))
+        assert snapshot.nodes("cat-sdwan-controller", "cat-sdwan-validator") == [ctrl, vldtr]
+        assert snapshot.positions("cat-sdwan-validator") == [(240, 0)]
+
+    def test_row_end(self) -> None:
+        snapshot = LabSnapshot(_make_lab([
+            _make_node("Edge01", x=-280, y=400), _make_node("Edge02", x=-160, y=400),
+            _make_node("INET", x=500, y=0),
+        ]))
+        assert snapshot.row_end(400) == -160
+        assert snapshot.row_end(800) is None
+
+    def test_max_num(self) -> None:
+        snapshot = LabSnapshot(_make_lab([_make_node("Controller02"), _make_node("Edge07")]))
+        assert snapshot.max_num(_CTRL_NUM_RE) == 2
+        assert snapshot.max_num(_EDGE_NUM_RE) == 7
+
+    def test_add_updates_indexes(self) -> None:
+        lab = _make_lab([_make_node("Edge01", x=-280, y=400)])
+        snapshot = LabSnapshot(lab)
+        assert snapshot.row_end(400) == -280
+        assert snapshot.max_num(_EDGE_NUM_RE) == 1
+        edge = _make_node("Edge02", "cat-sdwan-edge")
+        snapshot.add(edge, x=-160, y=400)
+        assert snapshot.row_end(400) == -160
+        assert snapshot.max_num(_EDGE_NUM_RE) == 2
+        assert snapshot.node("Edge02", "cat-sdwan-edge") is edge
+        assert snapshot.positions("cat-sdwan-edge") == [(-160, 400)]
+        lab.nodes.assert_called_once()
@@ -0,0 +1,621 @@
+import email
+import json
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from catalyst_sdwan_lab.manager_client import (
+    INVENTORY_CACHE_TTLS,
+    FanOutError,
+    ManagerAPIError,
+    ManagerClient,
+    fan_out,
+)
+from catalyst_sdwan_lab.session_cache import SessionCache
+
+
+def _response(status: int = 200, body: object = None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status
+    response.ok = status < 400
+    response.text = json.dumps(body) if body is not None else ""
+    response.json.return_value = body
+    return response
+
+
+def _make_client(**kwargs: object) -> ManagerClient:
+    client = ManagerClient("10.0.0.1", 443, "admin", "secret", **kwargs)  # type: ignore[arg-type]
+    client._session = MagicMock()
+    return client
+
+
+def _serve(client: ManagerClient, **by_method: object) -> None:
+    """Answer session requests per HTTP method with a response or a list of responses."""
+    queues = {m.upper(): r if isinstance(r, list) else None for m, r in by_method.items()}
+
+    def request(method: str, url: str, **_: object) -> object:
+        if queues[method] is not None:
+            return queues[method].pop(0)
+        return by_method[method.lower()]
+
+    client._session.request.side_effect = request
+
+
+def _calls(client: ManagerClient, method: str) -> int:
+    return sum(1 for c in client._session.request.call_args_list if c.args[0] == method)
+
+
+class TestInventoryCache:
+    def test_disabled_by_default(self) -> None:
+        client = _make_client()
+        _serve(client, get=_response(body={"data": []}))
+        client.get_controllers()
+        client.get_controllers()
+        assert _calls(client, "GET") == 2
+
+    def test_reuses_response_within_ttl(self) -> None:
+        client = _make_client(cache_ttls=INVENTORY_CACHE_TTLS)
+        _serve(client, get=_response(body={"data": [{"uuid": "u1"}]}))
+        assert client.get_controllers() == client.get_controllers() == [{"uuid": "u1"}]
+        assert _calls(client, "GET") == 1
+
+    def test_fresh_read_skips_cache(self) -> None:
+        client = _make_client(cache_ttls=INVENTORY_CACHE_TTLS)
+        _serve(client, get=[
+            _response(body={"data": []}), _response(body={"data": [{"uuid": "u1"}]})
+        ])
+        client.get_controllers()
+        assert client.get_controllers(fresh=True) == [{"uuid": "u1"}]
+
+    def test_expired_entry_is_refetched(self) -> None:
+        client = _make_client(cache_ttls={"/dataservice/system/device/vedges": 0})
+        _serve(client, get=_response(body={"data": []}))
+        client.get_vedges()
+        client.get_vedges()
+        assert _calls(client, "GET") == 2
+
+    def test_uncached_endpoint_always_fetched(self) -> None:
+        client = _make_client(cache_ttls=INVENTORY_CACHE_TTLS)
+        _serve(client, get=_response(body={"data": []}))
+        client.get_sync_status()
+        client.get_sync_status()
+        assert _calls(client, "GET") == 2
+
+    def test_add_controller_invalidates_controllers(self) -> None:
+        client = _make_client(cache_ttls=INVENTORY_CACHE_TTLS)
+        _serve(client, get=_response(body={"data": []}), post=_response())
+        client.get_controllers()
+        client.add_controller("172.16.0.101", "vsmart", "admin", "admin")
+        client.get_controllers()
+        assert _calls(client, "GET") == 2
+
+    def test_unrelated_write_keeps_config_groups(self) -> None:
+        client = _make_client(cache_ttls=INVENTORY_CACHE_TTLS)
+        _serve(client, get=_response(body=[]), post=_response())
+        client.get_config_groups()
+        client.add_controller("172.16.0.101", "vsmart", "admin", "admin")
+        client.get_config_groups()
+        assert _calls(client, "GET") == 1
+
+    def test_concurrent_callers_share_one_request(self) -> None:
+        client = _make_client(cache_ttls=INVENTORY_CACHE_TTLS)
+        release = threading.Event()
+
+        def slow_request(*_: object, **__: object) -> MagicMock:
+            release.wait(5)
+            return _response(body={"data": [{"uuid": "u1"}]})
+
+        client._session.request.side_effect = slow_request
+        results: list[object] = []
+        threads = [
+            threading.Thread(target=lambda: results.append(client.get_controllers()))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join()
+        assert results == [[{"uuid": "u1"}]] * 5
+        client._session.request.assert_called_once()
+
+    def test_error_not_cached(self) -> None:
+        client = _make_client(cache_ttls=INVENTORY_CACHE_TTLS)
+        _serve(client, get=[_response(500, {"error": "boom"}), _response(body={"data": []})])
+        with pytest.raises(ManagerAPIError):
+            client.get_controllers()
+        assert client.get_controllers() == []
+
+
+class TestSessionRenewal:
+    @pytest.fixture
+    def client(self) -> ManagerClient:
+        client = _make_client()
+        client.login = MagicMock(  # type: ignore[method-assign]
+            side_effect=lambda: setattr(client, "_session_epoch", client._session_epoch + 1)
+        )
+        return client
+
+    def test_relogs_in_and_replays_on_401(self, client: ManagerClient) -> None:
+        _serve(client, get=[_response(401), _response(body={"data": [{"uuid": "u1"}]})])
+        assert client.get_controllers() == [{"uuid": "u1"}]
+        client.login.assert_called_once()  # type: ignore[attr-defined]
+        assert _calls(client, "GET") == 2
+
+    def test_relogs_in_on_html_login_page(self, client: ManagerClient) -> None:
+        login_page = _response()
+        login_page.text = "<html><head><title>Cisco SD-WAN</title></head></html>"
+        _serve(client, put=[login_page, _response()])
+        client.settings_organization("org")
+        client.login.assert_called_once()  # type: ignore[attr-defined]
+        assert _calls(client, "PUT") == 2
+
+    def test_replays_only_once(self, client: ManagerClient) -> None:
+        _serve(client, get=[_response(403), _response(403)])
+        with pytest.raises(ManagerAPIError, match="HTTP 403"):
+            client.get_vedges()
+        client.login.assert_called_once()  # type: ignore[attr-defined]
+
+    def test_healthy_session_not_renewed(self, client: ManagerClient) -> None:
+        _serve(client, get=_response(body={"data": []}))
+        client.get_vedges()
+        client.login.assert_not_called()  # type: ignore[attr-defined]
+
+    def test_concurrent_expiry_logs_in_once(self, client: ManagerClient) -> None:
+        expired = threading.Barrier(3)
+
+        def request(method: str, url: str, **_: object) -> MagicMock:
+            if client._session_epoch == 0:
+                expired.wait(5)
+                return _response(401)
+            return _response(body={"data": []})
+
+        client._session.request.side_effect = request
+        threads = [threading.Thread(target=client.get_vedges) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        client.login.assert_called_once()  # type: ignore[attr-defined]
+
+    def test_upload_resends_file_on_replay(
+        self, client: ManagerClient, tmp_path: Path
+    ) -> None:
+        serial = tmp_path / "serial.viptela"
+        serial.write_bytes(b"serials")
+        sent: list[bytes] = []
+
+        def request(method: str, url: str, **kwargs: object) -> MagicMock:
+            sent.append(b"".join(kwargs["data"]))  # type: ignore[arg-type]
+            return _response(401) if len(sent) == 1 else _response()
+
+        client._session.request.side_effect = request
+        client.upload_serial_file(serial)
+        assert len(sent) == 2
+        assert b"\r\n\r\nserials\r\n" in sent[1]
+        assert sent[0].split(b"\r\n", 1)[1] == sent[1].split(b"\r\n", 1)[1]
+
+
+class TestUploads:
+    def _sent(self, client: ManagerClient) -> dict:
+        return client._session.request.call_args.kwargs  # type: ignore[attr-defined]
+
+    def test_serial_file_is_streamed_as_multipart(self, tmp_path: Path) -> None:
+        client = _make_client()
+        client._session.request.return_value = _response()  # type: ignore[attr-defined]
+        serial = tmp_path / "serial.viptela"
+        serial.write_bytes(b"x" * 1000)
+        client.upload_serial_file(serial)
+        kwargs = self._sent(client)
+        message = email.message_from_bytes(
+            f"Content-Type: {kwargs['headers']['Content-Type']}\r\n\r\n".encode()
+            + b"".join(kwargs["data"])
+        )
+        parts = {p.get_param("name", header="content-disposition"): p for p in message.walk()
+                 if not p.is_multipart()}
+        assert parts["validity"].get_payload() == "valid"
+        assert parts["file"].get_filename() == "serial.viptela"
+        assert parts["file"].get_payload(decode=True) == b"x" * 1000
+        assert len(kwargs["data"]) == len(b"".join(kwargs["data"]))
+
+    def test_import_reports_progress(self, tmp_path: Path) -> None:
+        client = _make_client()
+        client._session.request.return_value = _response(body={"taskId": "t1"})  # type: ignore[attr-defined]
+        package = tmp_path / "basic.tar.gz"
+        package.write_bytes(b"x" * (600 * 1024))
+        progress: list[tuple[int, int]] = []
+        assert client.import_configuration(
+            package, on_progress=lambda *a: progress.append(a)
+        ) == "t1"
+        # the mocked session doesn't send, so drain the body as requests would
+        b"".join(self._sent(client)["data"])
+        assert progress[-1] == (600 * 1024, 600 * 1024)
+        assert len(progress) == 3
+
+    def test_read_timeout_grows_with_file_size(self, tmp_path: Path) -> None:
+        client = _make_client()
+        client._session.request.return_value = _response()  # type: ignore[attr-defined]
+        small, large = tmp_path / "small", tmp_path / "large"
+        small.write_bytes(b"x")
+        with open(large, "wb") as f:
+            f.truncate(64 * 1024 * 1024)
+        client.upload_serial_file(small)
+        assert self._sent(client)["timeout"][1] == 60
+        client.upload_serial_file(large)
+        assert self._sent(client)["timeout"][1] == 256
+
+
+class TestWorkerSessions:
+    @pytest.fixture
+    def client(self) -> ManagerClient:
+        client = ManagerClient("10.0.0.1", 443, "admin", "secret", max_worker_sessions=2)
+        client._session.cookies.set("JSESSIONID", "abc")
+        client._session.headers["x-xsrf-token"] = "token-1"
+        client._session_epoch = 1
+        return client
+
+    def test_main_thread_uses_login_session(self, client: ManagerClient) -> None:
+        assert client._thread_session() is client._session
+
+    def test_worker_clones_cookies_and_token(self, client: ManagerClient) -> None:
+        with client.worker_session():
+            session = client._thread_session()
+        assert session is not client._session
+        assert session.cookies.get("JSESSIONID") == "abc"
+        assert session.headers["x-xsrf-token"] == "token-1"
+
+    def test_threads_get_distinct_sessions(self, client: ManagerClient) -> None:
+        both_checked_out = threading.Barrier(2)
+        seen: list[object] = []
+
+        def work() -> None:
+            with client.worker_session():
+                seen.append(client._thread_session())
+                both_checked_out.wait(5)
+
+        threads = [threading.Thread(target=work) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len({id(s) for s in seen}) == 2
+
+    def test_pool_is_bounded(self, client: ManagerClient) -> None:
+        release = threading.Event()
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def work() -> None:
+            nonlocal active, peak
+            with client.worker_session():
+                with lock:
+                    active += 1
+                    peak = max(peak, active)
+                release.wait(5)
+                with lock:
+                    active -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join()
+        assert peak == 2
+
+    def test_idle_worker_frees_its_slot(self, client: ManagerClient) -> None:
+        waiters_idle = threading.Barrier(3)
+        done = threading.Event()
+        kept: list[bool] = []
+
+        def wait() -> None:
+            with client.worker_session():
+                session = client._thread_session()
+                with client.idle_worker():
+                    waiters_idle.wait(5)
+                    done.wait(5)
+                kept.append(client._thread_session() is session)
+
+        threads = [threading.Thread(target=wait) for _ in range(2)]
+        for t in threads:
+            t.start()
+        waiters_idle.wait(5)
+        # both slots are held by idle waiters, yet a third thread still gets one
+        with client.worker_session():
+            done.set()
+        for t in threads:
+            t.join()
+        assert kept == [True, True]
+
+    def test_sessions_are_reused(self, client: ManagerClient) -> None:
+        with client.worker_session():
+            first = client._thread_session()
+        with client.worker_session():
+            assert client._thread_session() is first
+
+    def test_worker_picks_up_new_login(self, client: ManagerClient) -> None:
+        with client.worker_session():
+            session = client._thread_session()
+            client._session.cookies.set("JSESSIONID", "def")
+            client._session.headers["x-xsrf-token"] = "token-2"
+            client._session_epoch += 1
+            assert client._thread_session() is session
+        assert session.cookies.get("JSESSIONID") == "def"
+        assert session.headers["x-xsrf-token"] == "token-2"
+
+
+def _stream_response(body: object, chunk: int = 7, status: int = 200) -> MagicMock:
+    raw = json.dumps(body).encode()
+    response = _response(status, body)
+    response.headers = {"Content-Type": "application/json"}
+    response.iter_content.side_effect = lambda size: (
+        raw[i:i + chunk] for i in range(0, len(raw), chunk)
+    )
+    response.__enter__.return_value = response
+    return response
+
+
+class TestStreamedInventory:
+    _VEDGES = [
+        {"uuid": "C8K-1", "deviceModel": "vedge-C8000V", "system-ip": "10.0.0.1"},
+        {"uuid": "C8K-2", "deviceModel": "vedge-C8000V"},
+        {"uuid": "SDR-1", "deviceModel": "vedge-C8000V-SD-ROUTING"},
+    ]
+
+    def test_parses_data_across_chunks(self) -> None:
+        client = _make_client()
+        body = {"header": {"columns": [{"property": "data"}]}, "data": self._VEDGES}
+        _serve(client, get=_stream_response(body, chunk=3))
+        assert list(client.iter_vedges()) == self._VEDGES
+        assert client._session.request.call_args.kwargs["stream"] is True
+
+    def test_model_filter_sent_to_manager_and_applied_locally(self) -> None:
+        client = _make_client()
+        # a Manager that ignores the parameter still gets filtered client-side
+        _serve(client, get=_stream_response({"data": self._VEDGES}))
+        assert [v["uuid"] for v in client.iter_vedges(model="vedge-C8000V")] == ["C8K-1", "C8K-2"]
+        assert client._session.request.call_args.kwargs["params"] == {"model": "vedge-C8000V"}
+
+    def test_uuid_set_filtered_from_one_listing(self) -> None:
+        client = _make_client()
+        _serve(client, get=_stream_response({"data": self._VEDGES}))
+        assert [v["uuid"] for v in client.iter_vedges(uuids=["SDR-1", "C8K-1"])] == [
+            "C8K-1", "SDR-1"
+        ]
+        assert _calls(client, "GET") == 1
+        assert client._session.request.call_args.kwargs["params"] == {}
+
+    def test_state_filter_sent_to_manager_and_applied_locally(self) -> None:
+        client = _make_client()
+        vedges = [
+            {"uuid": "C8K-1", "vedgeCertificateState": "certinstalled"},
+            {"uuid": "C8K-2", "vedgeCertificateState": "csrgenerated"},
+            {"uuid": "C8K-3", "vedgeCertificateState": "tokengenerated"},
+        ]
+        _serve(client, get=_stream_response({"data": vedges}))
+        states = ["tokengenerated", "certinstalled"]
+        assert [v["uuid"] for v in client.iter_vedges(states=states)] == ["C8K-1", "C8K-3"]
+        params = client._session.request.call_args.kwargs["params"]
+        assert params == {"state": ["certinstalled", "tokengenerated"]}
+
+    def test_malformed_body_raises(self) -> None:
+        client = _make_client()
+        response = _stream_response({})
+        response.iter_content.side_effect = lambda size: iter([b'{"data": [{"uuid": '])
+        _serve(client, get=response)
+        with pytest.raises(ManagerAPIError, match="Malformed JSON"):
+            list(client.iter_vedges())
+
+    def test_expired_session_detected_from_content_type(self) -> None:
+        client = _make_client()
+        login_page = _stream_response({})
+        login_page.headers = {"Content-Type": "text/html;charset=UTF-8"}
+        _serve(client, get=[login_page, _stream_response({"data": self._VEDGES[:1]})])
+        client.login = MagicMock()  # type: ignore[method-assign]
+        assert len(list(client.iter_vedges())) == 1
+        client.login.assert_called_once()
+        login_page.close.assert_called_once()
+        login_page.iter_content.assert_not_called()
+
+
+class TestBootstrapConfigs:
+    def _bootstrap(self, uuid: str) -> MagicMock:
+        return _response(200, {"bootstrapConfig": f"cfg-{uuid}"})
+
+    def _make_client(self) -> ManagerClient:
+        client = _make_client()
+        # route worker threads to the mocked session too
+        client._thread_session = lambda: client._session  # type: ignore[method-assign]
+        return client
+
+    def test_fetches_each_device_in_order(self) -> None:
+        client = self._make_client()
+
+        def request(method: str, url: str, **_: object) -> MagicMock:
+            return self._bootstrap(url.split("?")[0].rsplit("/", 1)[1])
+
+        client._session.request.side_effect = request
+        assert client.get_bootstrap_configs(["a", "b", "c"]) == {
+            "a": "cfg-a", "b": "cfg-b", "c": "cfg-c"
+        }
+
+    def test_retries_failed_device(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr("catalyst_sdwan_lab.manager_client.time.sleep", lambda s: None)
+        client = self._make_client()
+        _serve(client, get=[_response(500, {"error": "busy"}), self._bootstrap("a")])
+        assert client.get_bootstrap_configs(["a"]) == {"a": "cfg-a"}
+        assert _calls(client, "GET") == 2
+
+    def test_gives_up_after_retries(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr("catalyst_sdwan_lab.manager_client.time.sleep", lambda s: None)
+        client = self._make_client()
+        _serve(client, get=_response(500, {"error": "busy"}))
+        with pytest.raises(ManagerAPIError, match="Bootstrap config for a failed"):
+            client.get_bootstrap_configs(["a"])
+        assert _calls(client, "GET") == 3
+
+    def test_cache_hits_skip_the_manager(self, tmp_path: Path) -> None:
+        from catalyst_sdwan_lab.bootstrap_cache import BootstrapCache
+
+        cache = BootstrapCache(tmp_path)
+        cache.put("a", "GigabitEthernet1", "v1", "cached-a")
+        client = self._make_client()
+        _serve(client, get=self._bootstrap("b"))
+        configs = client.get_bootstrap_configs(
+            ["a", "b"], wanif="GigabitEthernet1", cache=cache, version="v1"
+        )
+        assert configs == {"a": "cached-a", "b": "cfg-b"}
+        assert _calls(client, "GET") == 1
+        assert cache.get("b", "GigabitEthernet1", "v1") == "cfg-b"
+
+
+class TestFanOut:
+    def test_results_keep_input_order(self) -> None:
+        client = _make_client()
+        done: list[int] = []
+        assert fan_out(client, lambda n: n * 2, [3, 1, 2], on_done=done.append) == [6, 2, 4]
+        assert sorted(done) == [1, 2, 3]
+
+    def test_every_item_runs_and_errors_are_aggregated(self) -> None:
+        client = _make_client()
+        ran: list[str] = []
+
+        def call(ip: str) -> None:
+            ran.append(ip)
+            if ip != "b":
+                raise ManagerAPIError(f"{ip} refused")
+
+        with pytest.raises(FanOutError, match="2 of 3 failed") as e:
+            fan_out(client, call, ["a", "b", "c"])
+        assert sorted(ran) == ["a", "b", "c"]
+        assert set(e.value.errors) == {"a", "c"}
+
+    def test_programming_errors_propagate_unwrapped(self) -> None:
+        client = _make_client()
+        with pytest.raises(KeyError):
+            fan_out(client, lambda d: d["missing"], [{}])
+
+
+class TestFeatureTemplates:
+    def test_creates_concurrently_and_keeps_order(self) -> None:
+        client = TestBootstrapConfigs()._make_client()
+        in_flight = peak = 0
+        lock = threading.Lock()
+
+        def request(method: str, url: str, **kwargs: object) -> MagicMock:
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+            name = kwargs["json"]["templateName"]  # type: ignore[index]
+            return _response(200, {"templateId": f"id-{name}"})
+
+        client._session.request.side_effect = request
+        names = [f"t{i}" for i in range(8)]
+        assert client.create_feature_templates([{"templateName": n} for n in names]) == [
+            f"id-{n}" for n in names
+        ]
+        assert 1 < peak <= 4
+
+    def test_error_propagates(self) -> None:
+        client = TestBootstrapConfigs()._make_client()
+        _serve(client, post=_response(400, {"error": {"message": "bad template"}}))
+        with pytest.raises(ManagerAPIError):
+            client.create_feature_templates([{"templateName": "a"}])
+
+
+class TestSessionCache:
+    @pytest.fixture
+    def store(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> SessionCache:
+        store = SessionCache(tmp_path)
+        store.enable()
+        monkeypatch.setattr("catalyst_sdwan_lab.session_cache.store", store)
+        return store
+
+    def _make_client(self) -> ManagerClient:
+        client = ManagerClient("10.0.0.1", 443, "admin", "secret")
+        client._session.get = MagicMock()  # type: ignore[method-assign]
+        client._session.post = MagicMock()  # type: ignore[method-assign]
+        return client
+
+    def _full_login(self, client: ManagerClient) -> None:
+        def post(url: str, **_: object) -> MagicMock:
+            client._session.cookies.set("JSESSIONID", "fresh")
+            return _response(200)
+
+        client._session.post.side_effect = post
+
+    def test_resumes_cached_session_with_one_call(self, store: SessionCache) -> None:
+        store.save("10.0.0.1", 443, "admin", {"JSESSIONID": "abc"}, "old-token")
+        client = self._make_client()
+        client._session.get.return_value = MagicMock(status_code=200, text="token-2")
+        client.login()
+        client._session.post.assert_not_called()
+        client._session.get.assert_called_once()
+        assert client._session.cookies.get("JSESSIONID") == "abc"
+        assert client._session.headers["x-xsrf-token"] == "token-2"
+
+    def test_rejected_session_falls_back_to_login(self, store: SessionCache) -> None:
+        store.save("10.0.0.1", 443, "admin", {"JSESSIONID": "stale"}, "old-token")
+        client = self._make_client()
+        self._full_login(client)
+        client._session.get.side_effect = [
+            MagicMock(status_code=200, text="<html><body>login</body></html>"),
+            MagicMock(status_code=200, text="token-3"),
+        ]
+        client.login()
+        client._session.post.assert_called_once()
+        entry = store.load("10.0.0.1", 443, "admin")
+        assert entry is not None
+        assert (entry.cookies, entry.token) == ({"JSESSIONID": "fresh"}, "token-3")
+
+    def test_logout_keeps_cached_session_open(self, store: SessionCache) -> None:
+        client = self._make_client()
+        self._full_login(client)
+        client._session.get.return_value = MagicMock(status_code=200, text="token-4")
+        client.login()
+        client.logout()
+        assert all("/logout" not in c.args[0] for c in client._session.get.call_args_list)
+        assert store.load("10.0.0.1", 443, "admin") is not None
+
+    def test_logout_without_cache_ends_session(self) -> None:
+        client = self._make_client()
+        client.logout()
+        assert client._session.get.call_args.args[0].endswith("/logout")
+
+
+class TestOverloadRetry:
+    def _busy(self, retry_after: str = "0") -> MagicMock:
+        response = _response(503, {"error": "busy"})
+        response.headers = {"Retry-After": retry_after}
+        return response
+
+    def test_replays_after_503(self) -> None:
+        client = _make_client()
+        _serve(client, get=[self._busy(), _response(body={"data": [{"uuid": "a"}]})])
+        assert client.get_vedges() == [{"uuid": "a"}]
+        assert _calls(client, "GET") == 2
+
+    def test_gives_up_after_retries(self) -> None:
+        client = _make_client()
+        _serve(client, get=self._busy())
+        with pytest.raises(ManagerAPIError, match="503"):
+            client.get_vedges()
+        assert _calls(client, "GET") == 4
+
+    def test_retry_after_pauses_budget(self) -> None:
+        client = _make_client()
+        _serve(client, get=[self._busy("1"), _response(body={"data": []})])
+        started = time.monotonic()
+        client.get_vedges()
+        assert time.monotonic() - started >= 0.9
+        assert client._governor.budgets["default"].limit < 8
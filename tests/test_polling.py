@@ -0,0 +1,93 @@
+import itertools
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from catalyst_sdwan_lab import polling
+from catalyst_sdwan_lab.polling import Backoff, poll
+
+
+@pytest.fixture(autouse=True)
+def _reset_recorder():
+    polling.recorder.reset()
+    yield
+    polling.recorder.reset()
+
+
+class TestBackoff:
+    def test_grows_from_floor_to_ceiling(self) -> None:
+        backoff = Backoff(floor=1, ceiling=5, factor=2, jitter=0)
+        assert [backoff.interval(n) for n in range(5)] == [1, 2, 4, 5, 5]
+
+    def test_jitter_stays_within_bounds(self) -> None:
+        backoff = Backoff(floor=10, ceiling=10, jitter=0.2)
+        for _ in range(100):
+            assert 8 <= backoff.interval(0) <= 12
+
+
+class TestPoll:
+    def test_returns_first_truthy_result_without_sleeping(self) -> None:
+        with patch("catalyst_sdwan_lab.polling.time.sleep") as sleep:
+            assert poll(lambda: "ready", timeout=10, backoff=Backoff(1, 5), label="t") == "ready"
+        sleep.assert_not_called()
+
+    def test_polls_until_ready(self) -> None:
+        check = MagicMock(side_effect=[None, False, "uuid-1"])
+        with patch("catalyst_sdwan_lab.polling.time.sleep") as sleep:
+            result = poll(check, timeout=60, backoff=Backoff(1, 5, jitter=0), label="t")
+        assert result == "uuid-1"
+        assert [c.args[0] for c in sleep.call_args_list] == [1, 1.5]
+
+    def test_backoff_can_be_a_function_of_the_attempt(self) -> None:
+        check = MagicMock(side_effect=[None, None, True])
+        with patch("catalyst_sdwan_lab.polling.time.sleep") as sleep:
+            poll(check, timeout=60, backoff=lambda attempt: 10 - attempt, label="t")
+        assert [c.args[0] for c in sleep.call_args_list] == [10, 9]
+
+    def test_returns_none_on_timeout(self) -> None:
+        clock = itertools.count(0, 4)
+        with patch("catalyst_sdwan_lab.polling.time.sleep"), \
+                patch("catalyst_sdwan_lab.polling.time.monotonic", side_effect=clock):
+            assert poll(lambda: False, timeout=10, backoff=Backoff(1, 5), label="t") is None
+        [stats] = polling.recorder.snapshot()
+        assert not stats.ready
+        assert stats.polls == 3
+
+    def test_sleep_never_overruns_deadline(self) -> None:
+        with patch("catalyst_sdwan_lab.polling.time.sleep") as sleep, \
+                patch("catalyst_sdwan_lab.polling.time.monotonic", side_effect=[0, 8, 10]):
+            poll(lambda: False, timeout=10, backoff=Backoff(5, 5, jitter=0), label="t")
+        sleep.assert_called_once_with(2)
+
+    def test_retry_on_treats_exception_as_not_ready(self) -> None:
+        check = MagicMock(side_effect=[ConnectionError("down"), True])
+        with patch("catalyst_sdwan_lab.polling.time.sleep"):
+            assert poll(
+                check, timeout=60, backoff=Backoff(1, 5), label="t", retry_on=(ConnectionError,)
+            )
+        assert check.call_count == 2
+
+    def test_other_exceptions_propagate(self) -> None:
+        check = MagicMock(side_effect=ValueError("bad"))
+        with pytest.raises(ValueError):
+            poll(check, timeout=60, backoff=Backoff(1, 5), label="t", retry_on=(ConnectionError,))
+
+    def test_records_overshoot_since_last_miss(self) -> None:
+        check = MagicMock(side_effect=[None, True])
+        with patch("catalyst_sdwan_lab.polling.time.sleep"), \
+                patch("catalyst_sdwan_lab.polling.time.monotonic", side_effect=[0, 1, 4]):
+            poll(check, timeout=60, backoff=Backoff(1, 5), label="CSR")
+        [stats] = polling.recorder.snapshot()
+        assert stats.label == "CSR"
+        assert stats.ready
+        assert stats.polls == 2
+        assert stats.waited_s == 4
+        assert stats.overshoot_s == 3
+
+    def test_render_groups_by_label(self) -> None:
+        for _ in range(2):
+            poll(lambda: True, timeout=1, backoff=Backoff(1, 5), label="CSR")
+        console = MagicMock()
+        polling.recorder.render(console)
+        table = console.print.call_args.args[0]
+        assert table.row_count == 1
@@ -0,0 +1,106 @@
+import threading
+import time
+
+from catalyst_sdwan_lab.rate_limit import Budget, Limits, RequestGovernor
+
+
+class TestBudget:
+    def test_caps_requests_in_flight(self) -> None:
+        budget = Budget("t", Limits(max_in_flight=2, rate=1000, burst=1000))
+        lock = threading.Lock()
+        active = peak = 0
+
+        def work() -> None:
+            nonlocal active, peak
+            budget.acquire()
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+            budget.release(200, 0.02)
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert peak == 2
+
+    def test_rate_limits_after_burst(self) -> None:
+        budget = Budget("t", Limits(max_in_flight=10, rate=50, burst=2))
+        started = time.monotonic()
+        for _ in range(7):
+            budget.acquire()
+            budget.release(200, 0.0)
+        # 2 from the burst, the other 5 at 50/s
+        assert time.monotonic() - started >= 0.09
+
+    def test_overload_halves_limit_and_success_grows_it_back(self) -> None:
+        budget = Budget("t", Limits(max_in_flight=8, rate=1000, burst=1000))
+        budget.acquire()
+        budget.release(503, 0.1)
+        assert budget.limit == 4
+        for _ in range(4):
+            budget.acquire()
+            budget.release(200, 0.1)
+        assert 4.9 < budget.limit < 5.1
+
+    def test_one_decrease_per_interval(self) -> None:
+        budget = Budget("t", Limits(max_in_flight=8, rate=1000, burst=1000))
+        for _ in range(3):
+            budget.acquire()
+        for _ in range(3):
+            budget.release(429, 0.1)
+        assert budget.limit == 4
+
+    def test_latency_spike_counts_as_congestion(self) -> None:
+        budget = Budget("t", Limits(max_in_flight=8, rate=1000, burst=1000))
+        budget.acquire()
+        budget.release(200, 0.5)
+        budget.acquire()
+        budget.release(200, 5.0)
+        assert budget.limit == 4
+
+    def test_latency_is_judged_per_route(self) -> None:
+        budget = Budget("t", Limits(max_in_flight=8, rate=1000, burst=1000))
+        budget.acquire()
+        budget.release(200, 0.5, "/dataservice/system/device/controllers")
+        budget.acquire()
+        budget.release(200, 20.0, "/dataservice/system/device/bootstrap/device/{id}")
+        assert budget.limit == 8
+
+    def test_pause_holds_back_new_requests(self) -> None:
+        budget = Budget("t", Limits(max_in_flight=8, rate=1000, burst=1000))
+        budget.pause(0.1)
+        started = time.monotonic()
+        budget.acquire()
+        assert time.monotonic() - started >= 0.09
+
+
+class TestRequestGovernor:
+    def test_heavy_endpoint_draws_from_both_budgets(self) -> None:
+        governor = RequestGovernor()
+        budgets = governor.budgets_for("/dataservice/certificate/generate/csr")
+        assert [b.name for b in budgets] == ["csr", "default"]
+        deploy = governor.budgets_for("/dataservice/v1/config-group/cg-1/device/deploy")
+        assert [b.name for b in deploy] == ["deploy", "default"]
+
+    def test_other_endpoints_use_default_budget(self) -> None:
+        governor = RequestGovernor()
+        budgets = governor.budgets_for("/dataservice/system/device/vedges")
+        assert [b.name for b in budgets] == ["default"]
+
+    def test_missing_budgets_are_skipped(self) -> None:
+        governor = RequestGovernor({"default": Limits(1, 1)})
+        budgets = governor.budgets_for("/dataservice/certificate/generate/csr")
+        assert [b.name for b in budgets] == ["default"]
+
+    def test_uploads_do_not_count_as_slow_replies(self) -> None:
+        governor = RequestGovernor()
+        path = "/dataservice/system/device/fileupload"
+        for elapsed in (0.5, 60.0):
+            budgets = governor.acquire(path)
+            governor.release(budgets, path, 200, elapsed)
+        assert governor.budgets["default"].limit == 8
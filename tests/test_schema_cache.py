@@ -0,0 +1,26 @@
+from catalyst_sdwan_lab.schema_cache import SchemaCache
+
+
+class TestSchemaCache:
+    def test_round_trip(self, tmp_path) -> None:
+        cache = SchemaCache(tmp_path)
+        cache.put("https://m:443", "cg-1", "3@100", {"system_ip", "host_name"})
+        assert cache.get("https://m:443", "cg-1", "3@100") == {"system_ip", "host_name"}
+
+    def test_key_includes_manager_and_revision(self, tmp_path) -> None:
+        cache = SchemaCache(tmp_path)
+        cache.put("https://m:443", "cg-1", "3@100", {"system_ip"})
+        assert cache.get("https://other:443", "cg-1", "3@100") is None
+        assert cache.get("https://m:443", "cg-1", "4@200") is None
+
+    def test_expired_entries_are_ignored(self, tmp_path) -> None:
+        cache = SchemaCache(tmp_path, max_age=-1)
+        cache.put("https://m:443", "cg-1", "3@100", {"system_ip"})
+        assert cache.get("https://m:443", "cg-1", "3@100") is None
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path) -> None:
+        cache = SchemaCache(tmp_path)
+        cache.put("https://m:443", "cg-1", "3@100", {"system_ip"})
+        (entry,) = tmp_path.iterdir()
+        entry.write_text("{not json")
+        assert cache.get("https://m:443", "cg-1", "3@100") is None
@@ -0,0 +1,52 @@
+import stat
+import time
+
+from catalyst_sdwan_lab.session_cache import SessionCache
+
+
+def _enabled(tmp_path, **kwargs) -> SessionCache:
+    cache = SessionCache(tmp_path, **kwargs)
+    cache.enable()
+    return cache
+
+
+class TestSessionCache:
+    def test_disabled_cache_stores_nothing(self, tmp_path) -> None:
+        cache = SessionCache(tmp_path)
+        cache.save("10.0.0.1", 443, "admin", {"JSESSIONID": "abc"}, "tok")
+        assert cache.load("10.0.0.1", 443, "admin") is None
+        assert not any(tmp_path.iterdir())
+
+    def test_round_trip(self, tmp_path) -> None:
+        cache = _enabled(tmp_path)
+        cache.save("10.0.0.1", 443, "admin", {"JSESSIONID": "abc"}, "tok")
+        entry = cache.load("10.0.0.1", 443, "admin")
+        assert entry is not None
+        assert (entry.cookies, entry.token) == ({"JSESSIONID": "abc"}, "tok")
+
+    def test_keyed_by_host_port_and_user(self, tmp_path) -> None:
+        cache = _enabled(tmp_path)
+        cache.save("10.0.0.1", 443, "admin", {"JSESSIONID": "abc"}, "tok")
+        assert cache.load("10.0.0.2", 443, "admin") is None
+        assert cache.load("10.0.0.1", 8443, "admin") is None
+        assert cache.load("10.0.0.1", 443, "operator") is None
+
+    def test_stale_entries_are_ignored(self, tmp_path, monkeypatch) -> None:
+        cache = _enabled(tmp_path, max_age=60)
+        cache.save("10.0.0.1", 443, "admin", {"JSESSIONID": "abc"}, "tok")
+        monkeypatch.setattr(time, "time", lambda: 10**12)
+        assert cache.load("10.0.0.1", 443, "admin") is None
+
+    def test_files_are_private(self, tmp_path) -> None:
+        cache = _enabled(tmp_path / "sessions")
+        cache.save("10.0.0.1", 443, "admin", {"JSESSIONID": "abc"}, "tok")
+        (entry,) = (tmp_path / "sessions").iterdir()
+        assert stat.S_IMODE(entry.stat().st_mode) == 0o600
+        assert stat.S_IMODE((tmp_path / "sessions").stat().st_mode) == 0o700
+
+    def test_discard(self, tmp_path) -> None:
+        cache = _enabled(tmp_path)
+        cache.save("10.0.0.1", 443, "admin", {"JSESSIONID": "abc"}, "tok")
+        cache.discard("10.0.0.1", 443, "admin")
+        cache.discard("10.0.0.1", 443, "admin")
+        assert cache.load("10.0.0.1", 443, "admin") is None
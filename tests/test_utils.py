@@ -1,6 +1,18 @@
+from unittest.mock import MagicMock, patch
+
 import pytest
+import typer
 
-from catalyst_sdwan_lab.tasks.utils import _normalize_version, node_config_text
+from catalyst_sdwan_lab.cml_events import CmlEvents
+from catalyst_sdwan_lab.tasks.utils import (
+    _BootProgress,
+    _normalize_version,
+    node_config_text,
+    upload_progress,
+    wait_all_converged,
+    wait_for_manager,
+    wait_for_manager_restart,
+)
 
 
 @pytest.mark.parametrize(
@@ -33,3 +45,108 @@ def test_node_config_text_empty_list() -> None:
 
 def test_node_config_text_missing() -> None:
     assert node_config_text({}) == ""
+
+
+def test_restart_wait_returns_once_manager_is_back() -> None:
+    with patch("catalyst_sdwan_lab.tasks.utils._manager_serving",
+               side_effect=[True, False, False, True]) as serving, \
+            patch("catalyst_sdwan_lab.polling.time.sleep"):
+        wait_for_manager_restart("https://manager:443")
+    assert serving.call_count == 4
+
+
+def test_restart_wait_gives_up_when_restart_never_starts() -> None:
+    with patch("catalyst_sdwan_lab.tasks.utils._manager_serving", return_value=True), \
+            patch("catalyst_sdwan_lab.tasks.utils._RESTART_START_TIMEOUT", 0):
+        wait_for_manager_restart("https://manager:443")
+
+
+def test_restart_wait_exits_when_manager_stays_down() -> None:
+    with patch("catalyst_sdwan_lab.tasks.utils._manager_serving", return_value=False):
+        with pytest.raises(typer.Exit):
+            wait_for_manager_restart("https://manager:443", timeout=0)
+
+
+def test_upload_progress_reports_each_percent_once() -> None:
+    messages: list[str] = []
+    report = upload_progress("Uploading", messages.append)
+    for sent in (1, 2, 50, 100):
+        report(sent, 100)
+    assert messages == ["Uploading (1%)...", "Uploading (2%)...", "Uploading (50%)...",
+                        "Uploading (100%)..."]
+    report(100, 100)
+    assert len(messages) == 4
+
+
+def test_boot_progress_estimates_eta_from_activation_rate() -> None:
+    progress = _BootProgress()
+    with patch("catalyst_sdwan_lab.tasks.utils.time.monotonic", side_effect=[0.0, 60.0]):
+        progress.update(10, 40)
+        progress.update(20, 40)
+    assert progress.eta() == 120
+    assert progress.interval(0) == 30
+    assert progress.describe() == "20/40 services, ~2 min left"
+
+
+def test_boot_progress_polls_faster_near_the_end() -> None:
+    progress = _BootProgress()
+    with patch("catalyst_sdwan_lab.tasks.utils.time.monotonic", side_effect=[0.0, 60.0]):
+        progress.update(10, 40)
+        progress.update(38, 40)
+    assert progress.interval(5) == 2
+    progress.update(40, 40)
+    assert progress.ready
+
+
+def test_wait_for_manager_logs_in_only_once_services_are_up() -> None:
+    boots = [(10, 40), (30, 40), (40, 40)]
+    with patch("catalyst_sdwan_lab.tasks.utils.ManagerClient") as client_cls, \
+            patch("catalyst_sdwan_lab.tasks.utils._query_boot_diagnostic", side_effect=boots), \
+            patch("catalyst_sdwan_lab.polling.time.sleep"):
+        client = wait_for_manager("10.0.0.1", 443, "admin", "pw", "26.1.1")
+    assert client is client_cls.return_value
+    client.login.assert_called_once()
+
+
+def _node(label: str, converged: list[bool]) -> MagicMock:
+    node = MagicMock()
+    node.label = label
+    node.has_converged.side_effect = converged
+    return node
+
+
+def test_wait_all_converged_handles_each_node_as_it_converges() -> None:
+    slow = _node("Edge01", [False, False, True])
+    fast = _node("Edge02", [True])
+    events: list[tuple] = []
+    with patch("catalyst_sdwan_lab.tasks.utils.time.sleep"):
+        wait_all_converged(
+            [slow, fast],
+            on_progress=lambda done, total: events.append((done, total)),
+            on_ready=lambda node: events.append((node.label,)),
+        )
+    assert events == [(1, 2), ("Edge02",), (2, 2), ("Edge01",)]
+    assert fast.has_converged.call_count == 1
+
+
+def test_wait_all_converged_exits_naming_nodes_still_booting() -> None:
+    stuck = _node("Edge01", [False] * 10)
+    with patch("catalyst_sdwan_lab.tasks.utils.time.sleep"), pytest.raises(typer.Exit):
+        wait_all_converged([_node("Edge02", [True]), stuck], timeout=5)
+
+
+def test_wait_all_converged_uses_boot_events_instead_of_polling() -> None:
+    events = CmlEvents()
+    early = _node("Edge01", [True])
+    late = _node("Edge02", [False])
+    late.id = "n2"
+
+    def boot_event_arrives(fs: list, **kwargs: object) -> tuple[set, set]:
+        events.node_state("n2", "BOOTED")
+        return set(fs), set()
+
+    ready: list[str] = []
+    with patch("catalyst_sdwan_lab.tasks.utils.futures.wait", side_effect=boot_event_arrives):
+        wait_all_converged([early, late], on_ready=lambda n: ready.append(n.label), events=events)
+    assert ready == ["Edge01", "Edge02"]
+    assert late.has_converged.call_count == 1